@@ -0,0 +1,69 @@
+# benchmarks/bench_backtesting.py
+#
+# Mede o backtest walk-forward (src/backtesting.py) sobre o histórico completo:
+# - vazamento: em todos os períodos, a partida de treino mais recente é anterior à primeira de teste;
+# - tempo com e sem warm start (processos: os CPUs disponíveis) e tempo de ajuste somado por modelo;
+# - métricas médias com e sem warm start, que devem ficar próximas.
+# Sai com código 1 se houver vazamento ou se a acurácia média com warm start se afastar mais de 1 ponto
+# percentual da acurácia sem warm start.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_backtesting [--first-year 1975] [--window 20]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from src.backtesting import run_backtest, walk_forward_periods
+from src.config import BACKTEST_FIRST_YEAR
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.vocabulary import update_vocabulary
+
+def check_leakage(dates, periods):
+    leaks = [year for year, train_rows, test_rows in periods if dates[train_rows].max() >= dates[test_rows].min()]
+    print(f"Vazamento: {len(leaks)} de {len(periods)} períodos com partidas de treino posteriores ao teste")
+    return not leaks
+
+def run_benchmark(first_year, window_years):
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        df_raw = load_raw_data()
+        vocabulary = update_vocabulary(df_raw, os.path.join(work_dir, 'vocabulary.json'))
+        df = engineer_features(preprocess_data(df_raw, vocabulary=vocabulary))
+    dates = pd.to_datetime(df['date']).to_numpy()
+    no_leak = check_leakage(dates, walk_forward_periods(pd.DatetimeIndex(dates).year, first_year, window_years))
+
+    results = {}
+    for warm_start in (True, False):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            metrics = run_backtest(df, first_year=first_year, window_years=window_years, warm_start=warm_start,
+                                   path=None, vocabulary=vocabulary)
+        results[warm_start] = (metrics, time.perf_counter() - start)
+
+    print(f"{len(results[True][0]['period'].unique())} períodos, {os.cpu_count()} CPU(s)")
+    print(f"\n{'modelo':<20} {'warm start':<11} {'total (s)':>10} {'ajustes (s)':>12} {'acurácia':>9} {'log loss':>9}")
+    close = True
+    for name in results[True][0]['model'].unique():
+        for warm_start, (metrics, seconds) in results.items():
+            rows = metrics[metrics['model'] == name]
+            print(f"{name:<20} {'sim' if warm_start else 'não':<11} {seconds:>10.1f} {rows['fit_seconds'].sum():>12.1f} "
+                  f"{rows['accuracy'].mean():>9.4f} {rows['log_loss'].mean():>9.4f}")
+        accuracies = [metrics.loc[metrics['model'] == name, 'accuracy'].mean() for metrics, _ in results.values()]
+        close = close and abs(accuracies[0] - accuracies[1]) <= 0.01
+    print("\n(o tempo total de cada linha é o do backtest inteiro, com todos os modelos)")
+    return no_leak and close
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tempo e métricas do backtest walk-forward, com e sem warm start.")
+    parser.add_argument('--first-year', type=int, default=BACKTEST_FIRST_YEAR, help="Primeiro ano testado.")
+    parser.add_argument('--window', type=int, default=None, help="Janela deslizante de N anos (padrão: expansível).")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.first_year, args.window) else 1)
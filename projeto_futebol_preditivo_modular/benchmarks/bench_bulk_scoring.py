@@ -0,0 +1,79 @@
+# benchmarks/bench_bulk_scoring.py
+#
+# Mede o ganho de velocidade da pontuação em massa (src.bulk_scoring.score_file) com 1, 2, 4, ... processos,
+# até o número de CPUs, sobre um arquivo de partidas formado pelo histórico repetido --scale vezes.
+# Reporta tempo, vazão, ganho em relação a 1 processo e eficiência (ganho / processos), e verifica que
+# a saída tem as mesmas previsões do modelo aplicado diretamente ao arquivo inteiro.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_bulk_scoring [--scale 10] [--model random_forest] [--workers 1 2 4]
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.bulk_scoring import score_file
+from src.config import FEATURES, TARGET
+from src.data_ingestion import load_raw_data, save_data, load_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import fit_candidates, save_model, MODEL_CANDIDATES
+from src.scoring import load_scoring_model, predict
+
+MODELS = {'logistic_regression': 'Logistic Regression', 'random_forest': 'Random Forest'}
+
+def default_worker_counts():
+    counts = [1]
+    while counts[-1] * 2 <= os.cpu_count():
+        counts.append(counts[-1] * 2)
+    if counts[-1] != os.cpu_count():
+        counts.append(os.cpu_count())
+    return counts
+
+def run_benchmark(scale, model_key, worker_counts, chunk_size):
+    model_name = MODELS[model_key]
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            train = df.sample(min(20000, len(df)), random_state=42)
+            model = fit_candidates(train[FEATURES], train[TARGET], {model_name: MODEL_CANDIDATES[model_name]},
+                                   n_jobs=1)[model_name]
+            save_model(model, model_name, work_dir)
+            fixtures_path = os.path.join(work_dir, 'fixtures.parquet')
+            save_data(pd.concat([df[FEATURES + ['date']]] * scale, ignore_index=True), fixtures_path)
+        num_rows = len(df) * scale
+        print(f"Modelo: {model_name} | partidas: {num_rows} | blocos de {chunk_size} | CPUs: {os.cpu_count()}\n")
+
+        print(f"{'processos':>9} {'tempo (s)':>10} {'partidas/s':>12} {'ganho':>7} {'eficiência':>11}")
+        baseline = None
+        for num_workers in worker_counts:
+            output_path = os.path.join(work_dir, f'predictions_{num_workers}.parquet')
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = score_file(fixtures_path, output_path, work_dir, chunk_size, num_workers)
+            baseline = baseline or summary['seconds']
+            speedup = baseline / summary['seconds']
+            print(f"{num_workers:>9} {summary['seconds']:>10.2f} {num_rows / summary['seconds']:>12,.0f} "
+                  f"{speedup:>6.2f}x {speedup / num_workers:>10.0%}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = predict(load_scoring_model(work_dir), df[FEATURES])
+        scored = load_data(output_path)
+        same = (scored['prediction'].to_numpy() == np.tile(expected['prediction'].to_numpy(), scale)).mean()
+        print(f"\nPrevisões iguais às do modelo aplicado diretamente: {same:.2%}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ganho de velocidade da pontuação em massa por número de processos.")
+    parser.add_argument('--scale', type=int, default=10, help="Repetições do histórico no arquivo de partidas.")
+    parser.add_argument('--model', choices=sorted(MODELS), default='random_forest')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help="Números de processos (padrão: potências de 2 até o número de CPUs).")
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="Linhas por bloco.")
+    args = parser.parse_args()
+    run_benchmark(args.scale, args.model, args.workers or default_worker_counts(), args.chunk_size)
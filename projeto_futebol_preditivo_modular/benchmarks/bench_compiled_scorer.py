@@ -0,0 +1,93 @@
+# benchmarks/bench_compiled_scorer.py
+#
+# Compara o pontuador compilado (src.compiled_scorer) com o Pipeline do sklearn de onde ele foi exportado:
+# - paridade: mesmas classes previstas e probabilidades iguais (até a tolerância) no conjunto de teste,
+#   incluindo partidas com categorias não vistas no treino;
+# - latência: microssegundos por partida, para uma partida por vez e em lote.
+# Falha se a paridade não for atendida.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_compiled_scorer [--single 500] [--tolerance 1e-9]
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from src.config import FEATURES, TARGET
+from src.compiled_scorer import compile_pipeline
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import get_preprocessor
+
+def microseconds_per_match(func, items, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+def run_benchmark(single, tolerance):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+    X_train, X_test, y_train, y_test = train_test_split(df[FEATURES], df[TARGET], test_size=0.2,
+                                                        random_state=42, stratify=df[TARGET])
+    pipeline = Pipeline(steps=[('preprocessor', get_preprocessor()),
+                               ('classifier', LogisticRegression(max_iter=1000))])
+    pipeline.fit(X_train, y_train)
+    scorer = compile_pipeline(pipeline)
+
+    # Categorias não vistas no treino devem ser ignoradas, como no OneHotEncoder(handle_unknown='ignore')
+    X_unseen = X_test.head(100).astype({'home_team': 'object', 'city': 'object'})
+    X_unseen.loc[:, 'home_team'] = 'Time Inexistente'
+    X_unseen.loc[:, 'city'] = 'Cidade Inexistente'
+
+    failures = []
+    for label, X in [('teste', X_test), ('categorias não vistas', X_unseen)]:
+        proba_diff = np.abs(scorer.predict_proba(X) - pipeline.predict_proba(X)).max()
+        same = (scorer.predict(X) == pipeline.predict(X)).mean()
+        print(f"Paridade ({label}, {len(X)} partidas): previsões iguais {same:.2%}, "
+              f"maior diferença de probabilidade {proba_diff:.2e}")
+        if same < 1.0 or proba_diff > tolerance:
+            failures.append(label)
+
+    matches = X_test.head(single).to_dict(orient='records')
+    one_diff = max(np.abs(scorer.predict_proba_one(m) - scorer.predict_proba([m])[0]).max() for m in matches)
+    if one_diff > tolerance:
+        failures.append('partida única vs lote')
+
+    frames = [X_test.iloc[[i]] for i in range(len(matches))]
+    rows = [
+        ('sklearn Pipeline, 1 partida', microseconds_per_match(pipeline.predict_proba, frames)),
+        ('compilado, 1 partida (dict)', microseconds_per_match(scorer.predict_proba_one, matches)),
+    ]
+    for name, model in [('sklearn Pipeline', pipeline), ('compilado', scorer)]:
+        start = time.perf_counter()
+        model.predict_proba(X_test)
+        rows.append((f'{name}, lote de {len(X_test)}', (time.perf_counter() - start) / len(X_test) * 1e6))
+
+    print(f"\n{'caminho':<34} {'µs por partida':>15}")
+    for name, micros in rows:
+        print(f"{name:<34} {micros:>15.2f}")
+    print(f"\nGanho para uma partida: {rows[0][1] / rows[1][1]:.0f}x")
+
+    if failures:
+        print(f"\nFALHA de paridade: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\nOK: pontuador compilado equivalente ao Pipeline (tolerância {tolerance:g}).")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Paridade e latência do pontuador compilado.")
+    parser.add_argument('--single', type=int, default=500, help="Partidas pontuadas uma a uma.")
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="Diferença máxima de probabilidade.")
+    args = parser.parse_args()
+    run_benchmark(args.single, args.tolerance)
@@ -0,0 +1,94 @@
+# benchmarks/bench_dataflow_memory.py
+#
+# Teste de regressão de memória do fluxo de dados de run_dmaic_project (Measure -> Analyze -> seleção
+# das features do Improve). Mede o pico de RSS dos dados (DataFrame bruto + tudo o que os estágios alocam)
+# e falha se ele passar de --budget vezes o tamanho do dataset bruto em disco.
+# Também mede, para comparação, o fluxo antigo com cópias defensivas entre as fases.
+# Requer Linux (/proc/self/status e /proc/self/clear_refs para zerar o pico de RSS).
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_dataflow_memory [--scale 30] [--budget 1.5]
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from src.config import RAW_DATA_PATH
+
+PROBE_SCRIPT = """
+import contextlib, io, sys
+from src.config import FEATURES, TARGET
+from src.data_ingestion import read_raw_csv
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+
+def proc_status(key):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1]) * 1024
+
+df_raw = read_raw_csv(sys.argv[1])
+raw_frame_bytes = int(df_raw.memory_usage(deep=True).sum())
+rss_before = proc_status('VmRSS:')
+with open('/proc/self/clear_refs', 'w') as f:
+    f.write('5') # Zera o pico de RSS (VmHWM) para medir apenas o fluxo dos estágios
+
+with contextlib.redirect_stdout(io.StringIO()):
+    if sys.argv[2] == 'copy':
+        df_cleaned = preprocess_data(df_raw.copy())
+        df_analyzed = engineer_features(df_cleaned.copy())
+        df_for_eda = df_analyzed.copy()
+        df_for_training = df_analyzed.copy()
+        X, y = df_for_training[FEATURES].copy(), df_for_training[TARGET].copy()
+    else:
+        df_cleaned = preprocess_data(df_raw)
+        df_analyzed = engineer_features(df_cleaned)
+        X, y = df_analyzed[FEATURES], df_analyzed[TARGET]
+
+print(raw_frame_bytes + proc_status('VmHWM:') - rss_before)
+"""
+
+def build_scaled_csv(path, scale):
+    with open(RAW_DATA_PATH, 'rb') as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b'\n'):
+        body += b'\n'
+    with open(path, 'wb') as f:
+        f.write(header)
+        for _ in range(scale):
+            f.write(body)
+
+def measure_peak(raw_path, mode):
+    output = subprocess.run([sys.executable, '-c', PROBE_SCRIPT, raw_path, mode], check=True,
+                            capture_output=True, text=True).stdout
+    return int(output.strip().splitlines()[-1])
+
+def run_benchmark(scale, budget):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_path = os.path.join(tmp_dir, 'results.csv')
+        build_scaled_csv(raw_path, scale)
+        raw_size = os.path.getsize(raw_path)
+        print(f"Dataset bruto replicado {scale}x: {raw_size / 1024 ** 2:.1f} MB em disco")
+
+        ratios = {}
+        for mode, label in [('cow', 'Copy-on-Write (atual)'), ('copy', 'cópias entre fases (antigo)')]:
+            peak = measure_peak(raw_path, mode)
+            ratios[mode] = peak / raw_size
+            print(f"{label:<30} pico dos dados: {peak / 1024 ** 2:>8.1f} MB ({ratios[mode]:.2f}x o dataset bruto)")
+
+    if ratios['cow'] > budget:
+        print(f"\nFALHA: o pico de memória ({ratios['cow']:.2f}x) excede o orçamento de {budget:.2f}x.")
+        sys.exit(1)
+    print(f"\nOK: o pico de memória ({ratios['cow']:.2f}x) está dentro do orçamento de {budget:.2f}x.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Regressão de pico de memória do fluxo de dados entre as fases.")
+    parser.add_argument('--scale', type=int, default=30, help="Quantas vezes replicar o CSV bruto.")
+    parser.add_argument('--budget', type=float, default=1.5,
+                        help="Pico máximo permitido, em múltiplos do tamanho do dataset bruto em disco.")
+    args = parser.parse_args()
+    run_benchmark(args.scale, args.budget)
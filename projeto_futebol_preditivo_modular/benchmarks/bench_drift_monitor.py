@@ -0,0 +1,113 @@
+# benchmarks/bench_drift_monitor.py
+#
+# Mede o monitor de drift (src/drift_monitor.py). A referência é uma amostra aleatória de 70% das partidas,
+# com as previsões de uma Regressão Logística treinada nela; as demais partidas chegam em lotes:
+# - sem drift (mesma distribuição): nenhum alerta deve ser emitido;
+# - com drift injetado (elo_difference deslocado em +300): alerta de PSI/KS em elo_difference;
+# - com resultados embaralhados: alerta de queda da acurácia móvel;
+# - vazão: o histórico inteiro passa pelo monitor em lotes, com custo por lote constante, comparado com
+#   recalcular os histogramas de todas as partidas já vistas a cada lote;
+# - o estado salvo e recarregado produz os mesmos scores.
+# Sai com código 1 se algum dos alertas esperados não ocorrer, se houver alerta sem drift ou se o estado
+# recarregado divergir.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_drift_monitor [--batch-size 100]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from src.config import FEATURES, TARGET
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.drift_monitor import DriftMonitor, load_drift_monitor
+from src.feature_engineering import engineer_features
+from src.model_training import MODEL_CANDIDATES, get_preprocessor
+from src.vocabulary import update_vocabulary
+
+def feed(monitor, X, predictions, labels, batch_size):
+    """
+    Passa as partidas pelo monitor em lotes; retorna os alertas emitidos e os tempos por lote.
+    """
+    alerts, times = [], []
+    for start in range(0, len(X), batch_size):
+        batch = slice(start, start + batch_size)
+        begin = time.perf_counter()
+        alerts += monitor.update(X.iloc[batch], predictions[batch], None if labels is None else labels[batch])
+        times.append(time.perf_counter() - begin)
+    return alerts, np.array(times)
+
+def alerted(alerts):
+    return sorted({f"{alert['feature']}:{alert['metric']}" for alert in alerts})
+
+def run_benchmark(batch_size):
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        df_raw = load_raw_data()
+        vocabulary = update_vocabulary(df_raw, os.path.join(work_dir, 'vocabulary.json'))
+        df = engineer_features(preprocess_data(df_raw, vocabulary=vocabulary))
+    reference = df.sample(frac=0.7, random_state=42)
+    incoming = df.drop(reference.index).sample(frac=1.0, random_state=42)
+    model = Pipeline([('preprocessor', get_preprocessor(vocabulary)),
+                      ('classifier', MODEL_CANDIDATES['Logistic Regression']())])
+    model.fit(reference[FEATURES], reference[TARGET])
+    print(f"Referência: {len(reference)} partidas | lotes de {batch_size} com as outras {len(incoming)}")
+
+    start = time.perf_counter()
+    base = DriftMonitor.from_reference(reference[FEATURES], model.predict(reference[FEATURES]), reference[TARGET])
+    print(f"Referência criada em {time.perf_counter() - start:.2f}s ({len(base.reference)} histogramas)")
+
+    X_in, y_in = incoming[FEATURES], incoming[TARGET].to_numpy()
+    predictions = model.predict(X_in)
+    ok = True
+
+    monitor = DriftMonitor(**base.to_state())
+    alerts, _ = feed(monitor, X_in, predictions, y_in, batch_size)
+    max_psi = max(score['psi'] for score in monitor.scores().values() if score['psi'] is not None)
+    print(f"\nSem drift: alertas {alerted(alerts) or 'nenhum'} (maior PSI: {max_psi:.4f})")
+    ok = ok and not alerts
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = monitor.save(os.path.join(work_dir, 'drift_state.json'))
+        restored = load_drift_monitor(path).scores() == monitor.scores()
+    print(f"Estado salvo e recarregado: scores {'iguais' if restored else 'DIFERENTES'}")
+    ok = ok and restored
+
+    shifted = X_in.assign(elo_difference=X_in['elo_difference'] + 300)
+    alerts, _ = feed(DriftMonitor(**base.to_state()), shifted, predictions, y_in, batch_size)
+    print(f"elo_difference + 300: alertas {alerted(alerts)}")
+    ok = ok and {'elo_difference:psi', 'elo_difference:ks'} <= set(alerted(alerts))
+
+    shuffled = np.random.default_rng(42).permutation(y_in)
+    alerts, _ = feed(DriftMonitor(**base.to_state()), X_in, predictions, shuffled, batch_size)
+    print(f"Resultados embaralhados: alertas {alerted(alerts)}")
+    ok = ok and 'accuracy:rolling_accuracy' in alerted(alerts)
+
+    # Vazão com o histórico inteiro, em ordem cronológica
+    X_all, y_all = df[FEATURES], df[TARGET].to_numpy()
+    predictions_all = model.predict(X_all)
+    _, times = feed(DriftMonitor(**base.to_state()), X_all, predictions_all, y_all, batch_size)
+    quarter = len(times) // 4
+    print(f"\nHistórico inteiro ({len(df)} partidas, {len(times)} lotes): {times.sum():.2f}s, "
+          f"{len(df) / times.sum():,.0f} partidas/s")
+    print(f"Tempo por lote: {times[:quarter].mean() * 1000:.2f} ms no primeiro quarto, "
+          f"{times[-quarter:].mean() * 1000:.2f} ms no último")
+    start = time.perf_counter()
+    base._histograms(X_all, predictions_all)
+    rescan = time.perf_counter() - start
+    print(f"Recalcular os histogramas de todas as partidas vistas: {rescan * 1000:.1f} ms no último lote; "
+          f"~{rescan * len(times) / 2:.1f}s somando todos os lotes")
+    return ok
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Alertas e vazão do monitor de drift.")
+    parser.add_argument('--batch-size', type=int, default=100, help="Partidas por lote.")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.batch_size) else 1)
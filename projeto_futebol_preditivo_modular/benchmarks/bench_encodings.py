@@ -0,0 +1,113 @@
+# benchmarks/bench_encodings.py
+#
+# Compara as codificações das colunas categóricas (CATEGORICAL_ENCODINGS, src/categorical_encoding.py)
+# para os dois modelos candidatos, com a mesma divisão treino/teste de train_models:
+# - largura e memória da matriz de treino transformada;
+# - tempo de pré-processamento e de treino do classificador;
+# - acurácia no teste, com todas as features e sem goal_difference/total_goals (conhecidas só após a
+#   partida, tornam a acurácia trivialmente ~100%);
+# - na Random Forest, em quantas colunas se espalha a importância da variável 'city'.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_encodings [--sample 20000] [--encodings onehot ordinal ...]
+
+import argparse
+import contextlib
+import io
+import time
+import warnings
+
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from src.config import FEATURES, TARGET, NUMERICAL_COLS, CATEGORICAL_COLS, CATEGORICAL_ENCODINGS
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import get_categorical_encoder, MODEL_CANDIDATES
+from src.vocabulary import Vocabulary
+
+POST_MATCH_COLS = ['goal_difference', 'total_goals']
+
+def matrix_bytes(matrix):
+    if sp.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+def importance_spread(classifier, feature_names, variable):
+    """
+    Importância total das colunas de uma variável categórica e em quantas colunas ela se divide.
+    """
+    columns = [i for i, name in enumerate(feature_names) if name.startswith(f'cat__{variable}')]
+    return classifier.feature_importances_[columns].sum(), len(columns)
+
+def evaluate(encoding, vocabulary, numerical_cols, X_train, X_test, y_train, y_test):
+    preprocessor = ColumnTransformer(transformers=[
+        ('num', StandardScaler(), numerical_cols),
+        ('cat', get_categorical_encoder(encoding, vocabulary), CATEGORICAL_COLS)])
+    start = time.perf_counter()
+    train_matrix = preprocessor.fit_transform(X_train, y_train)
+    preprocess_seconds = time.perf_counter() - start
+    test_matrix = preprocessor.transform(X_test)
+
+    results = []
+    for name, make_estimator in MODEL_CANDIDATES.items():
+        classifier = make_estimator()
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            # Códigos ordinais sem escala (ex.: city, até ~2000) dificultam a convergência da Regressão Logística
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            classifier.fit(train_matrix, y_train)
+        fit_seconds = time.perf_counter() - start
+        accuracy = (classifier.predict(test_matrix) == y_test.to_numpy()).mean()
+        spread = (importance_spread(classifier, preprocessor.get_feature_names_out(), 'city')
+                  if hasattr(classifier, 'feature_importances_') and encoding != 'hashing' else None)
+        results.append({'encoding': encoding, 'model': name, 'columns': train_matrix.shape[1],
+                        'MiB': matrix_bytes(train_matrix) / 2**20, 'preprocess_s': preprocess_seconds,
+                        'fit_s': fit_seconds, 'accuracy': accuracy, 'city_importance': spread})
+    return results
+
+def run_benchmark(sample, encodings):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_raw = load_raw_data()
+        vocabulary = Vocabulary()
+        df = engineer_features(preprocess_data(df_raw, vocabulary=vocabulary))
+    if sample and sample < len(df):
+        df = df.sample(sample, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(df[FEATURES], df[TARGET], test_size=0.2,
+                                                        random_state=42, stratify=df[TARGET])
+    print(f"Treino: {len(X_train)} partidas | teste: {len(X_test)} | categóricas: {', '.join(CATEGORICAL_COLS)}")
+
+    pre_match_cols = [col for col in NUMERICAL_COLS if col not in POST_MATCH_COLS]
+    rows = []
+    for encoding in encodings:
+        full = evaluate(encoding, vocabulary, NUMERICAL_COLS, X_train, X_test, y_train, y_test)
+        pre_match = evaluate(encoding, vocabulary, pre_match_cols, X_train, X_test, y_train, y_test)
+        for result, result_pre_match in zip(full, pre_match):
+            result['accuracy_pre_match'] = result_pre_match['accuracy']
+            rows.append(result)
+
+    print(f"\n{'codificação':<11} {'modelo':<20} {'colunas':>8} {'MiB':>7} {'pré-proc. (s)':>14} "
+          f"{'treino (s)':>11} {'acurácia':>9} {'pré-jogo':>9}  importância de city")
+    for row in rows:
+        spread = row['city_importance']
+        spread = f"{spread[0]:.1%} em {spread[1]} coluna(s)" if spread else '-'
+        print(f"{row['encoding']:<11} {row['model']:<20} {row['columns']:>8} {row['MiB']:>7.2f} "
+              f"{row['preprocess_s']:>14.2f} {row['fit_s']:>11.2f} {row['accuracy']:>9.2%} "
+              f"{row['accuracy_pre_match']:>9.2%}  {spread}")
+
+    table = pd.DataFrame(rows).set_index(['model', 'encoding'])
+    if 'onehot' in encodings:
+        print("\nTempo de treino relativo ao one-hot (mesmo modelo):")
+        print((table['fit_s'] / table['fit_s'].xs('onehot', level='encoding')).unstack().round(2).to_string())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tempo, memória e acurácia das codificações categóricas.")
+    parser.add_argument('--sample', type=int, default=None, help="Usa uma amostra de N partidas (padrão: todas).")
+    parser.add_argument('--encodings', nargs='+', default=CATEGORICAL_ENCODINGS, choices=CATEGORICAL_ENCODINGS)
+    args = parser.parse_args()
+    run_benchmark(args.sample, args.encodings)
@@ -0,0 +1,100 @@
+# benchmarks/bench_head_to_head.py
+#
+# Mede o índice de confrontos diretos (src/head_to_head.py) sobre o histórico completo:
+# - tempo de construção do índice (com as features de todas as partidas), comparado com a abordagem
+#   ingênua de filtrar o DataFrame para cada linha (medida numa amostra e extrapolada);
+# - paridade das features com a filtragem ingênua, numa amostra de partidas;
+# - latência de consultas de um único confronto (p50/p99), como as do pontuador;
+# - atualização incremental: duas partes com save/load do índice entre elas dão as mesmas features.
+# Sai com código 1 se houver divergência ou se o p99 das consultas passar de 1 ms.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_head_to_head [--sample 500] [--queries 100000]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import HEAD_TO_HEAD_FEATURES
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.head_to_head import HeadToHeadIndex
+
+def naive_head_to_head(df, dates, row):
+    """
+    Referência: filtra todas as partidas anteriores entre os dois times da linha.
+    """
+    home, away = df['home_team'].iat[row], df['away_team'].iat[row]
+    previous = df[(dates < dates.iat[row]) & (((df['home_team'] == home) & (df['away_team'] == away)) |
+                                              ((df['home_team'] == away) & (df['away_team'] == home)))]
+    home_side = (previous['home_team'] == home).to_numpy()
+    goals_for = np.where(home_side, previous['home_score'], previous['away_score'])
+    goals_against = np.where(home_side, previous['away_score'], previous['home_score'])
+    return [len(previous), int((goals_for > goals_against).sum()), int((goals_for == goals_against).sum()),
+            int((goals_for < goals_against).sum()), int(goals_for.sum() - goals_against.sum())]
+
+def same_history(a, b):
+    """
+    Mesmos pares e, para cada par, os mesmos dias e totais acumulados (as posições podem diferir).
+    """
+    return a.pairs.keys() == b.pairs.keys() and all(
+        np.array_equal(x, y) for pair in a.pairs for x, y in zip(a.history(pair), b.history(pair)))
+
+def run_benchmark(sample_size, num_queries):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = preprocess_data(load_raw_data())
+    dates = pd.to_datetime(df['date'])
+
+    start = time.perf_counter()
+    index = HeadToHeadIndex()
+    features = index.update(df)
+    build_seconds = time.perf_counter() - start
+    print(f"Índice: {len(df)} partidas, {len(index.pairs)} pares, construído em {build_seconds * 1000:.0f} ms")
+
+    rows = np.random.default_rng(42).choice(len(df), size=min(sample_size, len(df)), replace=False)
+    start = time.perf_counter()
+    expected = [naive_head_to_head(df, dates, row) for row in rows]
+    naive_seconds = (time.perf_counter() - start) / len(rows) * len(df)
+    print(f"Filtragem ingênua (extrapolada para todas as linhas): {naive_seconds:.1f}s "
+          f"({naive_seconds / build_seconds:,.0f}x mais lenta)")
+    mismatches = sum(features.iloc[row].tolist() != values for row, values in zip(rows, expected))
+    print(f"Paridade com a filtragem ingênua em {len(rows)} partidas: {len(rows) - mismatches}/{len(rows)} idênticas")
+
+    pairs = df[['home_team', 'away_team', 'date']].sample(num_queries, replace=True, random_state=0)
+    latencies = np.empty(num_queries)
+    for i, (home, away, date) in enumerate(pairs.itertuples(index=False)):
+        start = time.perf_counter()
+        index.query(home, away, date)
+        latencies[i] = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    print(f"Consultas de um confronto: p50 {p50:.1f} µs, p99 {p99:.1f} µs ({num_queries} consultas)")
+
+    cut = dates < pd.Timestamp('2000-01-01')
+    first = HeadToHeadIndex()
+    parts = [first.update(df[cut])]
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(work_dir, 'head_to_head_index.npz')
+        first.save(path)
+        resumed = HeadToHeadIndex.load(path)
+    parts.append(resumed.update(df[~cut]))
+    same = pd.concat(parts).loc[df.index].equals(features) and same_history(resumed, index)
+    print(f"Atualização incremental (até 1999 + a partir de 2000, com save/load): "
+          f"{'idêntica' if same else 'DIVERGENTE'} à construção completa")
+
+    print("\nExemplo: Brazil x Argentina (todo o histórico)")
+    print(pd.Series(index.query('Brazil', 'Argentina'))[HEAD_TO_HEAD_FEATURES].to_string())
+    return mismatches == 0 and same and p99 < 1000
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Desempenho e paridade do índice de confrontos diretos.")
+    parser.add_argument('--sample', type=int, default=500, help="Partidas comparadas com a filtragem ingênua.")
+    parser.add_argument('--queries', type=int, default=100_000, help="Consultas de um confronto medidas.")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.sample, args.queries) else 1)
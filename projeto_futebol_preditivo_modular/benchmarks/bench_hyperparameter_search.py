@@ -0,0 +1,105 @@
+# benchmarks/bench_hyperparameter_search.py
+#
+# Mede a busca de hiperparâmetros com successive halving (src/hyperparameter_search.py), com resultados e
+# cache num diretório temporário:
+# - busca completa a frio: tempo, avaliações e custo em recurso (candidatos x recurso) comparado com avaliar
+#   a grade inteira com o recurso máximo;
+# - repetição: matrizes das dobras vindas do cache e nenhuma avaliação refeita;
+# - interrupção: remove o último terço das avaliações gravadas (como uma busca interrompida) e retoma;
+#   só as avaliações removidas são refeitas e os parâmetros escolhidos são os mesmos;
+# - teste (20% fora da busca): log loss e acurácia dos classificadores atuais e dos escolhidos pela busca.
+# Sai com código 1 se a retomada divergir ou se a busca não superar o classificador atual na validação cruzada.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_hyperparameter_search [--sample 20000]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from sklearn.metrics import accuracy_score, log_loss
+
+from src.config import SEARCH_PARAM_GRIDS, SEARCH_METRIC
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.hyperparameter_search import run_hyperparameter_search, tuned_candidates
+from src.model_training import MODEL_CANDIDATES, fit_candidates, split_train_test
+
+def timed_search(df, results_path, cache_dir):
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        summary = run_hyperparameter_search(df, results_path=results_path, cache_dir=cache_dir)
+    evaluated = int(output.getvalue().split(' avaliações novas')[0].rsplit('(', 1)[1])
+    return summary, time.perf_counter() - start, evaluated, output.getvalue()
+
+def resource_cost(result):
+    """
+    Custo da busca em candidatos x recurso, relativo a avaliar a grade inteira com o recurso máximo.
+    """
+    used = sum(rung['candidates'] * rung['resource'] for rung in result['rungs'])
+    return used / (result['rungs'][0]['candidates'] * result['rungs'][-1]['resource'])
+
+def run_benchmark(sample):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+    if sample and sample < len(df):
+        df = df.sample(sample, random_state=42)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results_path = os.path.join(work_dir, 'search_results.jsonl')
+        cache_dir = os.path.join(work_dir, 'cache')
+
+        summary, seconds, evaluated, log = timed_search(df, results_path, cache_dir)
+        print(f"Busca a frio: {seconds:.1f}s, {evaluated} avaliações ({len(df)} partidas)")
+        print('\n'.join(line for line in log.splitlines() if line.startswith('  ')))
+        for name, result in summary.items():
+            print(f"  {name}: custo em recurso {resource_cost(result):.0%} da grade completa "
+                  f"({result['rungs'][0]['candidates']} candidatos com o recurso máximo)")
+
+        _, seconds, evaluated, log = timed_search(df, results_path, cache_dir)
+        from_cache = log.count('carregadas do cache')
+        print(f"\nRepetição: {seconds:.1f}s, {evaluated} avaliações refeitas, "
+              f"{from_cache} conjunto(s) de matrizes das dobras vindos do cache")
+        repeat_ok = evaluated == 0
+
+        with open(results_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        kept = len(lines) - len(lines) // 3
+        with open(results_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:kept])
+            f.write(lines[kept][:len(lines[kept]) // 2]) # Linha gravada pela metade na interrupção
+        resumed, seconds, evaluated, _ = timed_search(df, results_path, cache_dir)
+        same = all(resumed[name]['params'] == summary[name]['params'] for name in summary)
+        print(f"Retomada após interrupção ({len(lines) - kept} de {len(lines)} avaliações perdidas): {seconds:.1f}s, "
+              f"{evaluated} refeitas, parâmetros {'idênticos' if same else 'DIVERGENTES'}")
+        resume_ok = same and evaluated == len(lines) - kept
+
+    X_train, X_test, y_train, y_test = split_train_test(df)
+    with contextlib.redirect_stdout(io.StringIO()):
+        configurations = {'atual': fit_candidates(X_train, y_train, {name: MODEL_CANDIDATES[name] for name in summary}),
+                          'busca': fit_candidates(X_train, y_train, tuned_candidates(summary))}
+    print(f"\n{'modelo':<20} {'config.':<7} {f'{SEARCH_METRIC} (CV)':>15} {'log loss (teste)':>17} {'acurácia (teste)':>17}")
+    improved = True
+    for name in summary:
+        for label, models in configurations.items():
+            cv_score = summary[name]['baseline_score' if label == 'atual' else 'score']
+            probabilities = models[name].predict_proba(X_test)
+            print(f"{name:<20} {label:<7} {cv_score:>15.4f} "
+                  f"{log_loss(y_test, probabilities, labels=models[name].classes_):>17.4f} "
+                  f"{accuracy_score(y_test, models[name].predict(X_test)):>17.2%}")
+        better = summary[name]['score'] <= summary[name]['baseline_score'] if SEARCH_METRIC == 'log_loss' \
+            else summary[name]['score'] >= summary[name]['baseline_score']
+        improved = improved and better
+    return repeat_ok and resume_ok and improved
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Custo, cache, retomada e ganho da busca de hiperparâmetros.")
+    parser.add_argument('--sample', type=int, default=None, help="Usa uma amostra de N partidas (padrão: todas).")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.sample) else 1)
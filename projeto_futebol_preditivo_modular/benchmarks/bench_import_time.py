@@ -0,0 +1,111 @@
+# benchmarks/bench_import_time.py
+#
+# Mede o tempo de partida a frio do ponto de entrada de previsões (src.scoring) em processos novos:
+# tempo de import e tempo até a primeira previsão (import + load_model + predict), comparando com
+# os imports dos módulos do pipeline completo. Falha se o import de src.scoring passar do orçamento
+# ou se as bibliotecas de visualização forem carregadas no caminho de previsão.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_import_time [--budget 1.0] [--repeat 3]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.config import FEATURES, TARGET, LOGISTIC_REGRESSION_MODEL_NAME
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import get_preprocessor
+
+HEAVY_MODULES = ['matplotlib', 'matplotlib.pyplot', 'seaborn', 'scipy.stats']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+FIRST_PREDICTION_SCRIPT = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+from src.scoring import load_model, predict
+with contextlib.redirect_stdout(io.StringIO()):
+    model, _ = load_model(models_dir=sys.argv[1])
+predict(model, json.loads(sys.argv[2]))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def build_sample_model(models_dir):
+    """
+    Treina um modelo pequeno para o benchmark (o modelo salvo pelo pipeline pode não existir).
+    Retorna uma partida de exemplo para a previsão.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+    sample = df.sample(5000, random_state=42)
+    model = Pipeline(steps=[('preprocessor', get_preprocessor()),
+                            ('classifier', LogisticRegression(max_iter=1000))])
+    model.fit(sample[FEATURES], sample[TARGET])
+    joblib.dump(model, os.path.join(models_dir, LOGISTIC_REGRESSION_MODEL_NAME))
+    match = sample[FEATURES].iloc[0].to_dict()
+    return {key: (value.item() if hasattr(value, 'item') else value) for key, value in match.items()}
+
+def run_in_fresh_process(script, *args, repeat=3):
+    """
+    Executa o script em processos novos e retorna o menor tempo medido e os módulos pesados carregados.
+    """
+    runs = [json.loads(subprocess.run([sys.executable, '-c', script, *args], check=True,
+                                      capture_output=True, text=True).stdout.strip().splitlines()[-1])
+            for _ in range(repeat)]
+    return min(run['seconds'] for run in runs), runs[0]['loaded']
+
+def run_benchmark(budget, repeat):
+    rows = []
+    for module in ['src.scoring', 'src.monitoring_and_insights', 'main']:
+        script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+        rows.append((f'import {module}',) + run_in_fresh_process(script, repeat=repeat))
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        match = build_sample_model(models_dir)
+        script = FIRST_PREDICTION_SCRIPT.format(heavy=HEAVY_MODULES)
+        rows.append(('src.scoring até a 1ª previsão',) + run_in_fresh_process(script, models_dir, json.dumps(match),
+                                                                             repeat=repeat))
+
+    print(f"{'caminho':<38} {'tempo (s)':>10}  módulos pesados carregados")
+    for name, seconds, loaded in rows:
+        print(f"{name:<38} {seconds:>10.3f}  {', '.join(loaded) or '-'}")
+
+    scoring_import_seconds, scoring_loaded = rows[0][1], rows[0][2]
+    prediction_loaded = rows[-1][2]
+    failures = []
+    if scoring_import_seconds > budget:
+        failures.append(f"import de src.scoring levou {scoring_import_seconds:.3f}s (orçamento: {budget:.3f}s)")
+    plotting_loaded = [m for m in scoring_loaded + prediction_loaded if m.startswith(('matplotlib', 'seaborn'))]
+    if plotting_loaded:
+        failures.append(f"bibliotecas de visualização carregadas no caminho de previsão: {sorted(set(plotting_loaded))}")
+
+    if failures:
+        print("\nFALHA: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\nOK: import de src.scoring em {scoring_import_seconds:.3f}s (orçamento: {budget:.3f}s), "
+          "sem bibliotecas de visualização.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tempo de partida a frio do ponto de entrada de previsões.")
+    parser.add_argument('--budget', type=float, default=1.0, help="Tempo máximo (s) para importar src.scoring.")
+    parser.add_argument('--repeat', type=int, default=3, help="Execuções por medição (vale a menor).")
+    args = parser.parse_args()
+    run_benchmark(args.budget, args.repeat)
@@ -0,0 +1,122 @@
+# benchmarks/bench_online_learning.py
+#
+# Mede o modo de aprendizado online (src/online_learning.py) contra o retreino completo:
+# - custo de uma atualização (partial_fit) para lotes de tamanhos diferentes, com o mesmo histórico;
+# - custo da mesma atualização com históricos de tamanhos diferentes, ao lado do retreino completo da
+#   Regressão Logística (preprocessor + LogisticRegression) com esse histórico;
+# - crescimento das categorias: acrescentar categorias novas não muda as previsões das partidas conhecidas;
+# - rollback: depois de uma atualização, voltar à versão anterior restaura exatamente as suas previsões.
+# Sai com código 1 se o crescimento das categorias ou o rollback mudarem as previsões.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_online_learning [--repeats 5]
+
+import argparse
+import contextlib
+import copy
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import FEATURES, TARGET, CATEGORICAL_COLS
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import MODEL_CANDIDATES, get_preprocessor
+from src.online_learning import OnlineModel, save_snapshot, load_online_model, rollback, update_online_model
+from src.vocabulary import update_vocabulary
+
+BATCH_SIZES = [10, 100, 1000]
+HISTORY_FRACTIONS = [0.25, 0.5, 1.0]
+
+def bootstrap(history):
+    model = OnlineModel()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.partial_fit(history, epochs=5)
+    return model
+
+def update_seconds(model, batch, repeats):
+    """
+    Mediana do tempo de uma atualização, sempre a partir do mesmo modelo.
+    """
+    times = []
+    for _ in range(repeats):
+        candidate = copy.deepcopy(model)
+        start = time.perf_counter()
+        candidate.partial_fit(batch)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+def retrain_seconds(history, vocabulary):
+    start = time.perf_counter()
+    matrix = get_preprocessor(vocabulary).fit_transform(history[FEATURES])
+    MODEL_CANDIDATES['Logistic Regression']().fit(matrix, history[TARGET])
+    return time.perf_counter() - start
+
+def check_growth(model, history, recent):
+    """
+    Previsões das partidas do histórico antes e depois de acrescentar as categorias das partidas recentes.
+    """
+    before = model.predict_proba(history)
+    grown = copy.deepcopy(model)
+    added = grown._grow(recent)
+    unchanged = np.allclose(before, grown.predict_proba(history))
+    print(f"Crescimento: {added} categorias novas, {len(model.feature_names)} -> {len(grown.feature_names)} "
+          f"colunas; previsões do histórico {'inalteradas' if unchanged else 'ALTERADAS'}")
+    return unchanged
+
+def check_rollback(model, history, recent):
+    with tempfile.TemporaryDirectory() as model_dir, contextlib.redirect_stdout(io.StringIO()):
+        save_snapshot(model, {'batch_rows': len(history)}, model_dir)
+        expected = load_online_model(model_dir).predict_proba(recent)
+        updated = update_online_model(pd.concat([history, recent]), model_dir)
+        changed = not np.allclose(expected, updated.predict_proba(recent))
+        rollback(model_dir)
+        restored = np.array_equal(expected, load_online_model(model_dir).predict_proba(recent))
+    print(f"Rollback: a atualização {'mudou' if changed else 'não mudou'} as previsões; após o rollback "
+          f"{'iguais à versão anterior' if restored else 'DIFERENTES da versão anterior'}")
+    return restored
+
+def run_benchmark(repeats):
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        df_raw = load_raw_data()
+        vocabulary = update_vocabulary(df_raw, os.path.join(work_dir, 'vocabulary.json'))
+        df = engineer_features(preprocess_data(df_raw, vocabulary=vocabulary))
+    df = df.iloc[np.argsort(pd.to_datetime(df['date']).to_numpy(), kind='stable')]
+    history, recent = df.iloc[:-max(BATCH_SIZES)], df.iloc[-max(BATCH_SIZES):]
+    print(f"Histórico: {len(history)} partidas | lotes retirados das {len(recent)} partidas mais recentes")
+
+    model = bootstrap(history)
+    print(f"\n{'lote':>6} {'atualização (ms)':>17} {'ms por partida':>15}")
+    for size in BATCH_SIZES:
+        seconds = update_seconds(model, recent.iloc[:size], repeats)
+        print(f"{size:>6} {seconds * 1000:>17.2f} {seconds * 1000 / size:>15.3f}")
+
+    batch = recent.iloc[:100]
+    print(f"\n{'histórico':>10} {'atualização de 100 (ms)':>24} {'retreino completo (s)':>22} {'razão':>8}")
+    for fraction in HISTORY_FRACTIONS:
+        partial = history.iloc[-int(len(history) * fraction):]
+        seconds = update_seconds(bootstrap(partial), batch, repeats)
+        retrain = retrain_seconds(pd.concat([partial, batch]), vocabulary)
+        print(f"{len(partial):>10} {seconds * 1000:>24.2f} {retrain:>22.2f} {retrain / seconds:>7.0f}x")
+
+    accuracy = (model.predict(recent) == recent[TARGET].to_numpy()).mean()
+    print(f"\nAcurácia do modelo online nas {len(recent)} partidas mais recentes (antes de vê-las): {accuracy:.2%}")
+    print(f"Categorias de {', '.join(CATEGORICAL_COLS)} nas partidas recentes fora do ajuste inicial: "
+          f"{copy.deepcopy(model.vocabulary).extend(recent[CATEGORICAL_COLS])}")
+
+    print()
+    ok = check_growth(model, history, recent)
+    ok = check_rollback(model, history, recent) and ok
+    return ok
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Custo das atualizações online e verificação de crescimento e rollback.")
+    parser.add_argument('--repeats', type=int, default=5, help="Repetições por medida (mediana).")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.repeats) else 1)
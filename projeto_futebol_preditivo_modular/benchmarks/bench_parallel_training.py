@@ -0,0 +1,68 @@
+# benchmarks/bench_parallel_training.py
+#
+# Compara o treinamento sequencial original (um Pipeline por modelo, cada um ajustando o seu próprio
+# preprocessor) com fit_candidates (preprocessor ajustado uma vez e candidatos treinados em paralelo).
+# Verifica também que os Pipelines resultantes fazem as mesmas previsões.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_parallel_training [--sample 20000]
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from src.config import FEATURES, TARGET, CATEGORICAL_ENCODING, MODEL_ENCODINGS
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import get_preprocessor, fit_candidates, MODEL_CANDIDATES
+
+def fit_sequential_one(name, X_train, y_train):
+    preprocessor = get_preprocessor(encoding=MODEL_ENCODINGS.get(name, CATEGORICAL_ENCODING))
+    model = Pipeline(steps=[('preprocessor', preprocessor), ('classifier', MODEL_CANDIDATES[name]())])
+    return model.fit(X_train, y_train)
+
+def fit_sequential(X_train, y_train):
+    return {name: fit_sequential_one(name, X_train, y_train) for name in MODEL_CANDIDATES}
+
+def timed(func, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return result, time.perf_counter() - start
+
+def run_benchmark(sample):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+    if sample and sample < len(df):
+        df = df.sample(sample, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(df[FEATURES], df[TARGET], test_size=0.2,
+                                                        random_state=42, stratify=df[TARGET])
+
+    single_fit_seconds = {}
+    for name in MODEL_CANDIDATES:
+        _, single_fit_seconds[name] = timed(fit_sequential_one, name, X_train, y_train)
+    sequential_models, sequential_seconds = timed(fit_sequential, X_train, y_train)
+    parallel_models, parallel_seconds = timed(fit_candidates, X_train, y_train)
+
+    print(f"Amostras de treino: {len(X_train)} | CPUs: {os.cpu_count()}")
+    for name, seconds in single_fit_seconds.items():
+        print(f"  {name:<22} sozinho: {seconds:.2f}s")
+    print(f"Sequencial (original):       {sequential_seconds:.2f}s")
+    print(f"Paralelo (fit_candidates):   {parallel_seconds:.2f}s "
+          f"(candidato mais lento: {max(single_fit_seconds.values()):.2f}s)")
+
+    for name in MODEL_CANDIDATES:
+        same = (sequential_models[name].predict(X_test) == parallel_models[name].predict(X_test)).mean()
+        print(f"Previsões iguais ({name}): {same:.2%}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Treinamento sequencial vs paralelo dos modelos candidatos.")
+    parser.add_argument('--sample', type=int, default=None, help="Usa uma amostra de N partidas (padrão: todas).")
+    args = parser.parse_args()
+    run_benchmark(args.sample)
@@ -0,0 +1,110 @@
+# benchmarks/bench_profiling.py
+#
+# Mede a instrumentação dos estágios (src/profiling.py):
+# - custo do decorador @traced com o rastreamento desativado, por chamada, contra a função sem decorador;
+# - tempo de preprocess_data + engineer_features sobre o histórico completo sem rastreamento, com
+#   rastreamento e com rastreamento e perfil (amostragem de pilhas);
+# - registros gerados: um por chamada, com estágio pai e profundidade em chamadas aninhadas, e perfil no
+#   formato folded ("a;b;c contagem") com os estágios.
+# Sai com código 1 se o custo desativado passar de MAX_DISABLED_OVERHEAD_NS por chamada ou se os registros
+# ou o perfil estiverem incompletos.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_profiling [--repeats 5]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.profiling import traced, enable_tracing, disable_tracing
+
+MAX_DISABLED_OVERHEAD_NS = 1000
+CALLS = 1_000_000
+
+def plain(x):
+    return x
+
+@traced('Benchmark')
+def decorated(x):
+    return x
+
+@traced('Benchmark')
+def pipeline(df_raw):
+    """
+    Estágio externo para conferir o aninhamento: chama dois estágios instrumentados.
+    """
+    return engineer_features(preprocess_data(df_raw, verbose=False), verbose=False)
+
+def per_call_ns(func):
+    start = time.perf_counter()
+    for i in range(CALLS):
+        func(i)
+    return (time.perf_counter() - start) / CALLS * 1e9
+
+def median_seconds(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+def run_benchmark(repeats):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_raw = load_raw_data()
+
+    overhead = min(per_call_ns(decorated) for _ in range(3)) - min(per_call_ns(plain) for _ in range(3))
+    print(f"Decorador com rastreamento desativado: {overhead:.0f} ns a mais por chamada")
+    ok = overhead <= MAX_DISABLED_OVERHEAD_NS
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        trace_path = os.path.join(work_dir, 'trace.jsonl')
+        profile_path = os.path.join(work_dir, 'profile.folded')
+        run = lambda: pipeline(df_raw)
+        baseline = median_seconds(run, repeats)
+        enable_tracing(trace_path)
+        traced_seconds = median_seconds(run, repeats)
+        disable_tracing(verbose=False)
+        enable_tracing(trace_path, profile_path)
+        profiled_seconds = median_seconds(run, repeats)
+        tracer = disable_tracing(verbose=False)
+
+        print(f"\npreprocess_data + engineer_features ({len(df_raw)} partidas, mediana de {repeats}):")
+        print(f"  sem rastreamento:          {baseline:.3f}s")
+        print(f"  com rastreamento:          {traced_seconds:.3f}s ({traced_seconds / baseline - 1:+.1%})")
+        print(f"  com rastreamento e perfil: {profiled_seconds:.3f}s ({profiled_seconds / baseline - 1:+.1%})")
+
+        with open(trace_path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        with open(profile_path, encoding='utf-8') as f:
+            folded = f.read().splitlines()
+
+    expected = 3 * 2 * repeats # Três estágios por execução, em duas rodadas com rastreamento
+    nested = [record for record in records if record['stage'] != 'pipeline']
+    nested_ok = all(record['parent'] == 'pipeline' and record['depth'] == 1 for record in nested)
+    print(f"\nRegistros: {len(records)} (esperados {expected}); estágios aninhados com pai e profundidade "
+          f"{'corretos' if nested_ok else 'INCORRETOS'}")
+    print(tracer.summary().to_string(float_format=lambda value: f'{value:,.2f}'))
+    folded_ok = bool(folded) and all(re.fullmatch(r'.+ \d+', line) for line in folded)
+    stages_ok = any('engineer_features' in line for line in folded)
+    print(f"\nPerfil folded: {len(folded)} pilhas distintas, {sum(int(line.rsplit(' ', 1)[1]) for line in folded)} "
+          f"amostras; formato {'válido' if folded_ok else 'INVÁLIDO'}, "
+          f"engineer_features {'presente' if stages_ok else 'AUSENTE'}")
+    return ok and len(records) == expected and nested_ok and folded_ok and stages_ok
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Custo e saída da instrumentação dos estágios.")
+    parser.add_argument('--repeats', type=int, default=5, help="Repetições por medida (mediana).")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.repeats) else 1)
@@ -0,0 +1,127 @@
+# benchmarks/bench_ratings.py
+#
+# Mede o motor de ratings (src/ratings.py) sobre o histórico completo:
+# - tempo da passagem cronológica única (meta: bem abaixo de 1 segundo);
+# - retomada: processar o histórico em duas partes, salvando e recarregando o estado entre elas,
+#   dá exatamente as mesmas features e o mesmo estado final que uma passagem única;
+# - largura da matriz de features do modelo com ratings, comparada com o one-hot de home_team/away_team,
+#   e a acurácia de uma Regressão Logística com cada uma (divisão cronológica: treino no passado), com e
+#   sem goal_difference/total_goals (conhecidas só após a partida, tornam a acurácia trivialmente 100%).
+# Sai com código 1 se a retomada divergir ou se a passagem levar 1 segundo ou mais.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_ratings [--resume-date 2010-01-01]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.config import FEATURES, TARGET, NUMERICAL_COLS, CATEGORICAL_COLS, RATING_FEATURES, HEAD_TO_HEAD_FEATURES
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.ratings import RatingEngine
+
+# Configuração anterior aos ratings: times como one-hot, sem as colunas de rating. As duas configurações
+# deixam de fora o confronto direto, para comparar apenas a representação dos times.
+RATING_NUMERICAL_COLS = [col for col in NUMERICAL_COLS if col not in HEAD_TO_HEAD_FEATURES]
+ONE_HOT_NUMERICAL_COLS = [col for col in RATING_NUMERICAL_COLS if col not in RATING_FEATURES]
+ONE_HOT_CATEGORICAL_COLS = ['home_team', 'away_team'] + CATEGORICAL_COLS
+
+def check_resume(df, resume_date):
+    """
+    Compara uma passagem única com duas passagens separadas por save/load do estado.
+    """
+    full = RatingEngine()
+    expected = full.update(df)
+
+    before = pd.to_datetime(df['date']) < pd.Timestamp(resume_date)
+    first = RatingEngine()
+    parts = [first.update(df[before])]
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(work_dir, 'rating_state.npz')
+        first.save(path)
+        resumed = RatingEngine.load(path)
+    parts.append(resumed.update(df[~before]))
+    actual = pd.concat(parts).loc[df.index]
+
+    same_features = np.allclose(actual.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-9)
+    # Os ids dependem da ordem em que os times aparecem em cada parte: compara o estado por nome de time
+    order = [resumed.team_ids[team] for team in full.teams]
+    same_state = (sorted(resumed.teams) == sorted(full.teams)
+                  and np.allclose(resumed.elo[order], full.elo, rtol=0, atol=1e-9)
+                  and np.array_equal(resumed.form_points[order], full.form_points)
+                  and np.array_equal(resumed.matches_played[order], full.matches_played))
+    print(f"Retomada em {resume_date} ({int(before.sum())} + {int((~before).sum())} partidas): "
+          f"features {'idênticas' if same_features else 'DIVERGENTES'}, "
+          f"estado final {'idêntico' if same_state else 'DIVERGENTE'} à passagem única.")
+    return same_features and same_state
+
+def compare_feature_matrices(df):
+    """
+    Treina no passado e avalia no futuro (20% mais recentes) com os times em one-hot e com os ratings.
+    """
+    split = int(len(df) * 0.8)
+    train, test = df.iloc[:split], df.iloc[split:]
+    post_match = ['goal_difference', 'total_goals']
+    configurations = {
+        'one-hot de times': (ONE_HOT_NUMERICAL_COLS, ONE_HOT_CATEGORICAL_COLS),
+        'ratings': (RATING_NUMERICAL_COLS, CATEGORICAL_COLS),
+        'one-hot, pré-jogo': ([c for c in ONE_HOT_NUMERICAL_COLS if c not in post_match], ONE_HOT_CATEGORICAL_COLS),
+        'ratings, pré-jogo': ([c for c in RATING_NUMERICAL_COLS if c not in post_match], CATEGORICAL_COLS),
+    }
+    print(f"\n{'configuração':<18} {'colunas':>8} {'não nulos/linha':>16} {'treino (s)':>11} {'acurácia':>9}")
+    for name, (numerical_cols, categorical_cols) in configurations.items():
+        preprocessor = ColumnTransformer(transformers=[
+            ('num', StandardScaler(), numerical_cols),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_cols)])
+        model = Pipeline(steps=[('preprocessor', preprocessor),
+                                ('classifier', LogisticRegression(max_iter=1000))])
+        start = time.perf_counter()
+        model.fit(train[FEATURES], train[TARGET])
+        fit_seconds = time.perf_counter() - start
+        X = model.named_steps['preprocessor'].transform(test[FEATURES])
+        nnz = X.nnz if hasattr(X, 'nnz') else np.count_nonzero(X)
+        accuracy = (model.predict(test[FEATURES]) == test[TARGET].to_numpy()).mean()
+        print(f"{name:<18} {X.shape[1]:>8} {nnz / X.shape[0]:>16.1f} {fit_seconds:>11.2f} {accuracy:>9.2%}")
+
+def run_benchmark(resume_date):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_cleaned = preprocess_data(load_raw_data())
+
+    timings = []
+    for _ in range(5):
+        engine = RatingEngine()
+        start = time.perf_counter()
+        engine.update(df_cleaned)
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    print(f"Passagem única: {len(df_cleaned)} partidas, {len(engine.teams)} times em {seconds * 1000:.0f} ms "
+          f"({len(df_cleaned) / seconds:,.0f} partidas/s)")
+
+    resume_ok = check_resume(df_cleaned, resume_date)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(df_cleaned)
+    compare_feature_matrices(df)
+
+    ranking = pd.Series(engine.elo, index=engine.teams).sort_values(ascending=False)
+    print("\nMaiores ratings Elo ao fim do histórico:")
+    print(ranking.head(5).round(1).to_string())
+    return resume_ok and seconds < 1.0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Desempenho e retomada do motor de ratings.")
+    parser.add_argument('--resume-date', default='2010-01-01', help="Data em que o histórico é dividido.")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.resume_date) else 1)
@@ -0,0 +1,123 @@
+# benchmarks/bench_shared_model_memory.py
+#
+# Compara o carregamento do Random Forest em N processos de pontuação simultâneos:
+# - joblib: joblib.load do Pipeline (cada processo tem a sua própria cópia das árvores);
+# - mmap: load_model(mmap_mode='r'), que usa os arrays planos exportados por save_model e mapeados do disco.
+# Para cada modo e número de processos, reporta o tempo de carga (sem os imports), a memória privada
+# alocada pela carga do modelo em cada processo, o RSS por processo e o PSS total (a memória
+# compartilhada é dividida entre os processos que a usam).
+# Verifica também que o modelo mapeado faz as mesmas previsões do Pipeline original.
+# Requer Linux (/proc/<pid>/status e /proc/<pid>/smaps_rollup).
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_shared_model_memory [--sample 20000] [--workers 1 2 4]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from src.config import FEATURES, TARGET
+from src.data_ingestion import load_raw_data, save_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import fit_candidates, save_model, MODEL_CANDIDATES
+from src.scoring import load_model
+
+WORKER_SCRIPT = """
+import contextlib, io, json, sys, time
+from src.data_ingestion import load_data
+from src.scoring import load_model
+# Importados antes da medição para que o tempo e a memória de import do sklearn não contem como carga do modelo
+import sklearn.compose, sklearn.ensemble, sklearn.pipeline, sklearn.preprocessing
+
+def anonymous_memory():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) * 1024 for line in f if line.startswith('RssAnon:'))
+
+X = load_data(sys.argv[3])
+anon_before = anonymous_memory()
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    model, _ = load_model(sys.argv[1], mmap_mode='r' if sys.argv[2] == 'mmap' else None)
+load_seconds = time.perf_counter() - start
+anon_loaded = anonymous_memory()
+model.predict_proba(X)
+print(json.dumps({'load_seconds': load_seconds, 'model_anon': anon_loaded - anon_before}), flush=True)
+sys.stdin.readline() # Mantém o processo vivo até o processo pai medir a memória de todos
+"""
+
+def proc_memory(pid):
+    """
+    Retorna (RSS, PSS) do processo, em bytes.
+    """
+    values = {}
+    for path, key in [(f'/proc/{pid}/status', 'VmRSS:'), (f'/proc/{pid}/smaps_rollup', 'Pss:')]:
+        with open(path) as f:
+            values[key] = next(int(line.split()[1]) * 1024 for line in f if line.startswith(key))
+    return values['VmRSS:'], values['Pss:']
+
+def run_workers(models_dir, mode, num_workers, sample_path):
+    """
+    Inicia num_workers processos simultâneos que carregam o modelo e pontuam a amostra.
+    Retorna o tempo médio de carga, a memória privada alocada pela carga do modelo por processo,
+    o RSS médio por processo e o PSS somado de todos os processos.
+    """
+    workers = [subprocess.Popen([sys.executable, '-c', WORKER_SCRIPT, models_dir, mode, sample_path],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(num_workers)]
+    try:
+        reports = [json.loads(worker.stdout.readline()) for worker in workers]
+        memory = np.array([proc_memory(worker.pid) for worker in workers])
+    finally:
+        for worker in workers:
+            worker.communicate('\n')
+    return (np.mean([r['load_seconds'] for r in reports]), np.mean([r['model_anon'] for r in reports]),
+            memory[:, 0].mean(), memory[:, 1].sum())
+
+def run_benchmark(sample, worker_counts):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+    if sample and sample < len(df):
+        df = df.sample(sample, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(df[FEATURES], df[TARGET], test_size=0.2,
+                                                        random_state=42, stratify=df[TARGET])
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline = fit_candidates(X_train, y_train, {'Random Forest': MODEL_CANDIDATES['Random Forest']},
+                                      n_jobs=1)['Random Forest']
+            save_model(pipeline, 'Random Forest', models_dir)
+            shared_model, _ = load_model(models_dir, mmap_mode='r')
+            sample_path = os.path.join(models_dir, 'sample.parquet')
+            save_data(X_test, sample_path)
+
+        proba_diff = np.abs(shared_model.predict_proba(X_test) - pipeline.predict_proba(X_test)).max()
+        same = (shared_model.predict(X_test) == pipeline.predict(X_test)).mean()
+        print(f"Paridade ({len(X_test)} partidas): previsões iguais {same:.2%}, "
+              f"maior diferença de probabilidade {proba_diff:.2e}")
+        model_bytes = sum(os.path.getsize(os.path.join(root, name))
+                          for root, _, names in os.walk(models_dir) for name in names if name != 'sample.parquet')
+        print(f"Modelos em disco (joblib + arrays planos): {model_bytes / 1e6:.1f} MB\n")
+
+        print(f"{'modo':<8} {'processos':>9} {'carga (s)':>10} {'modelo privado/proc (MB)':>25} "
+              f"{'RSS/proc (MB)':>14} {'PSS total (MB)':>15}")
+        for mode in ['joblib', 'mmap']:
+            for num_workers in worker_counts:
+                load_seconds, model_anon, rss, pss = run_workers(models_dir, mode, num_workers, sample_path)
+                print(f"{mode:<8} {num_workers:>9} {load_seconds:>10.3f} {model_anon / 1e6:>25.1f} "
+                      f"{rss / 1e6:>14.1f} {pss / 1e6:>15.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Memória e tempo de carga do modelo em N processos.")
+    parser.add_argument('--sample', type=int, default=None, help="Treina com uma amostra de N partidas.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Números de processos.")
+    args = parser.parse_args()
+    run_benchmark(args.sample, args.workers)
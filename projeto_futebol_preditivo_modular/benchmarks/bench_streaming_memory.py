@@ -0,0 +1,86 @@
+# benchmarks/bench_streaming_memory.py
+#
+# Mede o pico de memória (RSS) do pipeline Measure/Analyze em memória versus em streaming,
+# sobre um CSV bruto com cada partida repetida N vezes (em ordem de data, como o streaming exige).
+# Cada medição roda em um subprocesso isolado e grava tudo, inclusive o estado, num diretório temporário.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_streaming_memory [--scale 20] [--chunk-sizes 50000 200000]
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.config import RAW_DATA_PATH
+
+IN_MEMORY_SCRIPT = """
+import contextlib, io, resource, sys
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+import src.data_ingestion as ingestion
+ingestion.RAW_DATA_PATH = sys.argv[1]
+with contextlib.redirect_stdout(io.StringIO()):
+    df = engineer_features(preprocess_data(load_raw_data()))
+    df.to_parquet(sys.argv[2], index=False)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+STREAMING_SCRIPT = """
+import contextlib, io, os, resource, sys
+from src.streaming import run_streaming_pipeline
+with contextlib.redirect_stdout(io.StringIO()):
+    work_dir = sys.argv[3]
+    run_streaming_pipeline(raw_path=sys.argv[1], cleaned_path=os.path.join(work_dir, 'cleaned.parquet'),
+                           analyzed_path=sys.argv[2], chunk_size=int(sys.argv[4]),
+                           rating_state_path=os.path.join(work_dir, 'rating_state.npz'),
+                           head_to_head_path=os.path.join(work_dir, 'head_to_head_index.npz'),
+                           vocabulary_path=os.path.join(work_dir, 'vocabulary.json'))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+def build_scaled_csv(path, scale):
+    """
+    Repete cada linha do CSV bruto (em ordem de data) scale vezes seguidas, mantendo a ordem de data.
+    """
+    with open(RAW_DATA_PATH, 'rb') as f:
+        header = f.readline()
+        lines = f.read().splitlines(keepends=True)
+    if lines and not lines[-1].endswith(b'\n'):
+        lines[-1] += b'\n'
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.writelines(line * scale for line in lines)
+
+def measure(script, *args):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', script, *map(str, args)], check=True,
+                            capture_output=True, text=True).stdout
+    elapsed = time.perf_counter() - start
+    peak_mb = int(output.strip().splitlines()[-1]) / 1024 # ru_maxrss em KB no Linux
+    return peak_mb, elapsed
+
+def run_benchmark(scale, chunk_sizes):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_path = os.path.join(tmp_dir, 'results.csv')
+        build_scaled_csv(raw_path, scale)
+        size_mb = os.path.getsize(raw_path) / 1024 ** 2
+        output_path = os.path.join(tmp_dir, 'analyzed.parquet')
+        print(f"CSV bruto replicado {scale}x: {size_mb:.1f} MB")
+
+        print(f"\n{'modo':<28} {'pico RSS (MB)':>14} {'tempo (s)':>10}")
+        peak_mb, elapsed = measure(IN_MEMORY_SCRIPT, raw_path, output_path)
+        print(f"{'em memória':<28} {peak_mb:>14.1f} {elapsed:>10.2f}")
+        for chunk_size in chunk_sizes:
+            peak_mb, elapsed = measure(STREAMING_SCRIPT, raw_path, output_path, tmp_dir, chunk_size)
+            print(f"{f'streaming ({chunk_size} linhas)':<28} {peak_mb:>14.1f} {elapsed:>10.2f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pico de memória do pipeline em memória vs. streaming.")
+    parser.add_argument('--scale', type=int, default=20, help="Quantas vezes replicar o CSV bruto.")
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[50_000, 200_000])
+    args = parser.parse_args()
+    run_benchmark(args.scale, args.chunk_sizes)
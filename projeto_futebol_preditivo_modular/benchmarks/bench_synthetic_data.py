@@ -0,0 +1,90 @@
+# benchmarks/bench_synthetic_data.py
+#
+# Mede o gerador de partidas sintéticas (src/synthetic_data.py), ajustado ao histórico completo:
+# - vazão da geração em memória, com as features do modelo (add_match_features) e com gravação em blocos
+#   em Parquet;
+# - reprodutibilidade: mesma semente gera as mesmas partidas, sementes diferentes não;
+# - realismo: distância de variação total entre as frequências de cada coluna nas partidas sintéticas e no
+#   histórico, e quantos times, torneios e cidades distintos aparecem.
+# Sai com código 1 se a geração não for reprodutível ou se alguma distância passar de MAX_DISTANCE.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_synthetic_data [--matches 5000000]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.head_to_head import HeadToHeadIndex
+from src.ratings import RatingEngine
+from src.synthetic_data import SyntheticMatchGenerator, add_match_features
+
+COMPARED_COLUMNS = ['home_team', 'away_team', 'tournament', 'city', 'country', 'neutral', 'home_score',
+                    'away_score', 'result', 'year']
+MAX_DISTANCE = 0.03
+
+def total_variation(real, synthetic):
+    p = real.astype(str).value_counts(normalize=True)
+    q = synthetic.astype(str).value_counts(normalize=True)
+    return 0.5 * p.sub(q, fill_value=0).abs().sum()
+
+def rate(num_matches, seconds):
+    return f"{seconds:.2f}s ({num_matches / seconds / 1e6:.2f} milhões de partidas/s)"
+
+def run_benchmark(num_matches):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+        ratings, head_to_head = RatingEngine(), HeadToHeadIndex()
+        ratings.update(df)
+        head_to_head.update(df)
+    start = time.perf_counter()
+    generator = SyntheticMatchGenerator.from_matches(df)
+    print(f"Gerador ajustado a {len(df)} partidas em {time.perf_counter() - start:.3f}s")
+
+    chunk_size = min(1_000_000, num_matches)
+    start = time.perf_counter()
+    rows = sum(len(chunk) for chunk in generator.iter_chunks(num_matches, chunk_size, seed=42))
+    print(f"\nGeração em memória de {rows} partidas: {rate(rows, time.perf_counter() - start)}")
+    start = time.perf_counter()
+    rows = sum(len(add_match_features(chunk, ratings, head_to_head))
+               for chunk in generator.iter_chunks(num_matches, chunk_size, seed=42))
+    print(f"Com as features do modelo (ratings e confronto direto): {rate(rows, time.perf_counter() - start)}")
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(work_dir, 'synthetic_matches.parquet')
+        start = time.perf_counter()
+        generator.write(path, num_matches, chunk_size, seed=42)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+    print(f"Gravação em blocos em Parquet: {rate(num_matches, seconds)}, {size / 2**20:.1f} MiB")
+
+    sample = generator.generate(chunk_size, np.random.default_rng(42))
+    reproducible = sample.equals(generator.generate(chunk_size, np.random.default_rng(42)))
+    distinct = not sample.equals(generator.generate(chunk_size, np.random.default_rng(43)))
+    print(f"\nMesma semente: {'partidas idênticas' if reproducible else 'partidas DIFERENTES'} | "
+          f"outra semente: {'partidas diferentes' if distinct else 'partidas IDÊNTICAS'}")
+
+    synthetic = sample.assign(year=sample['date'].dt.year)
+    real = df.assign(year=pd.to_datetime(df['date']).dt.year)
+    print(f"\n{'coluna':<12} {'distância TV':>13} {'distintos (histórico)':>22} {'distintos (sintético)':>22}")
+    worst = 0.0
+    for col in COMPARED_COLUMNS:
+        distance = total_variation(real[col], synthetic[col])
+        worst = max(worst, distance)
+        print(f"{col:<12} {distance:>13.4f} {real[col].nunique():>22} {synthetic[col].nunique():>22}")
+    return reproducible and distinct and worst <= MAX_DISTANCE
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Vazão, reprodutibilidade e realismo do gerador de partidas sintéticas.")
+    parser.add_argument('--matches', type=int, default=5_000_000, help="Partidas geradas nas medidas de vazão.")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.matches) else 1)
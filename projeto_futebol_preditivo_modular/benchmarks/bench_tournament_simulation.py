@@ -0,0 +1,105 @@
+# benchmarks/bench_tournament_simulation.py
+#
+# Mede a simulação de Monte Carlo de torneios (src.tournament_simulation) na Copa do Mundo de 2022
+# (data/tournaments/world_cup_2022.json): tempo para --simulations torneios vetorizados, comparado com
+# uma implementação de referência em laço Python (partida a partida) sobre as mesmas probabilidades.
+# Verifica também que as duas dão as mesmas probabilidades de título, dentro do erro de Monte Carlo, e que
+# as probabilidades dos confrontos (modelo sem as features pós-partida) não são uniformes.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_tournament_simulation [--simulations 100000] [--loop-simulations 2000]
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+import numpy as np
+
+from src.config import BASE_DIR
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.ratings import RatingEngine
+from src.head_to_head import HeadToHeadIndex
+from src.tournament_simulation import (load_tournament_definition, pairwise_probabilities, simulate_tournament,
+                                      train_simulation_model)
+
+DEFINITION_PATH = os.path.join(BASE_DIR, 'data', 'tournaments', 'world_cup_2022.json')
+
+def simulate_with_loop(definition, teams, win, draw, num_tournaments, seed):
+    """
+    Referência em Python puro: uma partida por vez, um torneio por vez.
+    """
+    rng = random.Random(seed)
+    index = {team: i for i, team in enumerate(teams)}
+    champions = np.zeros(len(teams))
+    for _ in range(num_tournaments):
+        positions = {}
+        for name, group in definition['groups'].items():
+            points = {team: 0 for team in group}
+            for a in range(len(group)):
+                for b in range(a + 1, len(group)):
+                    i, j = index[group[a]], index[group[b]]
+                    u = rng.random()
+                    if u < win[i, j]:
+                        points[group[a]] += 3
+                    elif u < win[i, j] + draw[i, j]:
+                        points[group[a]] += 1
+                        points[group[b]] += 1
+                    else:
+                        points[group[b]] += 3
+            ranking = sorted(group, key=lambda team: (-points[team], rng.random()))
+            for position, team in enumerate(ranking, start=1):
+                positions[f'{position}{name}'] = index[team]
+        alive = [positions[slot] for slot in definition['bracket']]
+        while len(alive) > 1:
+            alive = [i if rng.random() < win[i, j] + draw[i, j] / 2 else j for i, j in zip(alive[0::2], alive[1::2])]
+        champions[alive[0]] += 1
+    return champions / num_tournaments
+
+def run_benchmark(num_simulations, loop_simulations):
+    ratings, head_to_head = RatingEngine(), HeadToHeadIndex()
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()), ratings=ratings, head_to_head=head_to_head)
+    sample = df.sample(min(20000, len(df)), random_state=42)
+    model = train_simulation_model(sample)
+    definition = load_tournament_definition(DEFINITION_PATH)
+
+    start = time.perf_counter()
+    results = simulate_tournament(model, definition, num_simulations, ratings=ratings, head_to_head=head_to_head)
+    vectorized_seconds = time.perf_counter() - start
+
+    teams = [team for group in definition['groups'].values() for team in group]
+    win, draw, _ = pairwise_probabilities(model, teams, definition, ratings, head_to_head)
+    start = time.perf_counter()
+    loop_champion = simulate_with_loop(definition, teams, win, draw, loop_simulations, seed=0)
+    loop_seconds = time.perf_counter() - start
+
+    print(f"{definition['name']}: {len(teams)} times, {len(teams) * (len(teams) - 1)} confrontos pontuados uma vez")
+    off_diagonal = ~np.eye(len(teams), dtype=bool)
+    print(f"Confrontos: vitória do primeiro time entre {win[off_diagonal].min():.3f} e {win[off_diagonal].max():.3f}, "
+          f"empate médio {draw[off_diagonal].mean():.3f}")
+    print(f"Vetorizado: {num_simulations} torneios em {vectorized_seconds:.2f}s "
+          f"({num_simulations / vectorized_seconds:,.0f} torneios/s, incluindo a pontuação dos confrontos)")
+    print(f"Laço Python: {loop_simulations} torneios em {loop_seconds:.2f}s "
+          f"({loop_simulations / loop_seconds:,.0f} torneios/s)")
+    print(f"Ganho: {(num_simulations / vectorized_seconds) / (loop_simulations / loop_seconds):.0f}x")
+
+    champion = results['champion'].reindex(teams).to_numpy()
+    # Erro padrão da diferença entre as duas estimativas (dominado pela referência, com menos simulações)
+    tolerance = 4 * np.sqrt(champion * (1 - champion) / loop_simulations + champion * (1 - champion) / num_simulations)
+    within = np.abs(champion - loop_champion) <= tolerance + 1e-12
+    print(f"Probabilidades de título compatíveis com a referência (4 erros padrão): {within.mean():.0%} dos times")
+
+    print("\nProbabilidades (5 favoritos):")
+    print(results.head(5).round(4).to_string())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Desempenho da simulação de Monte Carlo de torneios.")
+    parser.add_argument('--simulations', type=int, default=100_000, help="Torneios na versão vetorizada.")
+    parser.add_argument('--loop-simulations', type=int, default=2000, help="Torneios na referência em laço.")
+    args = parser.parse_args()
+    run_benchmark(args.simulations, args.loop_simulations)
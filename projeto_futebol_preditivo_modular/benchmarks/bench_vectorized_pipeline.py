@@ -0,0 +1,95 @@
+# benchmarks/bench_vectorized_pipeline.py
+#
+# Compara o motor vetorizado de preprocess_data/engineer_features com a implementação
+# antiga baseada em df.apply(axis=1), verificando paridade e medindo o tempo em 1x, 10x e 100x
+# o tamanho do dataset.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_vectorized_pipeline [--scales 1 10 100] [--legacy-max-scale 10]
+
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from src.config import RAW_DATA_PATH
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+
+def legacy_match_result(df):
+    """
+    Implementação original (linha a linha) da variável alvo 'result'.
+    """
+    def get_match_result(row):
+        if row['home_score'] > row['away_score']:
+            return 'Home Win'
+        elif row['home_score'] < row['away_score']:
+            return 'Away Win'
+        else:
+            return 'Draw'
+    return df.apply(get_match_result, axis=1)
+
+def legacy_is_home_game(df):
+    """
+    Implementação original (linha a linha) da feature 'is_home_game'.
+    """
+    return df.apply(lambda row: 1 if row['neutral'] == False else 0, axis=1)
+
+def legacy_pipeline(df):
+    df['home_score'] = pd.to_numeric(df['home_score'], errors='coerce').fillna(0).astype(int)
+    df['away_score'] = pd.to_numeric(df['away_score'], errors='coerce').fillna(0).astype(int)
+    df['result'] = legacy_match_result(df)
+    df['date'] = pd.to_datetime(df['date'])
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['day_of_week'] = df['date'].dt.dayofweek
+    df['is_home_game'] = legacy_is_home_game(df)
+    df['goal_difference'] = df['home_score'] - df['away_score']
+    df['total_goals'] = df['home_score'] + df['away_score']
+    return df
+
+def vectorized_pipeline(df):
+    # Silencia os prints das funções para não distorcer a medição
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engineer_features(preprocess_data(df))
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+def check_parity(df_raw):
+    """
+    Garante que o motor vetorizado produz exatamente a mesma saída da implementação original.
+    """
+    expected = legacy_pipeline(df_raw.copy())
+    actual = vectorized_pipeline(df_raw.copy())
+    # Os ratings (src/ratings.py) não existem na implementação original: compara as demais colunas,
+    # pelos valores ('result' é categórico e as features de data e de mando usam inteiros compactos)
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False, check_categorical=False)
+    print(f"Paridade verificada em {len(df_raw)} linhas: saída idêntica à implementação original.")
+
+def run_benchmark(scales, legacy_max_scale):
+    df_raw = pd.read_csv(RAW_DATA_PATH)
+    check_parity(df_raw)
+
+    print(f"\n{'escala':>6} {'linhas':>10} {'vetorizado (s)':>15} {'original (s)':>13} {'speedup':>8}")
+    for scale in scales:
+        df_scaled = pd.concat([df_raw] * scale, ignore_index=True)
+        _, vectorized_time = timed(vectorized_pipeline, df_scaled.copy())
+        if scale <= legacy_max_scale:
+            _, legacy_time = timed(legacy_pipeline, df_scaled.copy())
+            print(f"{scale:>5}x {len(df_scaled):>10} {vectorized_time:>15.3f} {legacy_time:>13.3f} {legacy_time / vectorized_time:>7.1f}x")
+        else:
+            print(f"{scale:>5}x {len(df_scaled):>10} {vectorized_time:>15.3f} {'-':>13} {'-':>8}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark do pré-processamento e engenharia de features vetorizados.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="Multiplicadores do tamanho do dataset a medir.")
+    parser.add_argument('--legacy-max-scale', type=int, default=10,
+                        help="Maior escala em que a implementação original (lenta) também é medida.")
+    args = parser.parse_args()
+    run_benchmark(args.scales, args.legacy_max_scale)
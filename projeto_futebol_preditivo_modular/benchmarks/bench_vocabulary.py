@@ -0,0 +1,111 @@
+# benchmarks/bench_vocabulary.py
+#
+# Mede o vocabulário global das colunas categóricas (src/vocabulary.py) sobre o histórico completo:
+# - memória das colunas de times, torneio, cidade e país como strings (object) e como códigos do vocabulário;
+# - tempo de codificação (transform) das colunas categóricas do modelo com o VocabularyEncoder e com o
+#   OneHotEncoder, com as colunas já categóricas e com strings;
+# - paridade: as duas matrizes têm os mesmos valores (a menos da ordem das colunas);
+# - estabilidade entre retreinos: ajusta com as partidas até --retrain-date e com o histórico completo e
+#   conta quantas colunas presentes nos dois ajustes mudaram de posição dentro do bloco da sua variável.
+# Sai com código 1 se as matrizes divergirem ou se alguma coluna do vocabulário mudar de posição.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.bench_vocabulary [--retrain-date 2015-01-01]
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder
+
+from src.config import CATEGORICAL_COLS, VOCABULARY_NAMESPACES
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.vocabulary import Vocabulary, VocabularyEncoder
+
+def best_time(function, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def block_positions(encoder):
+    """
+    (variável, categoria) -> posição da coluna dentro do bloco da variável.
+    """
+    return {(col, category): position for col, categories in zip(CATEGORICAL_COLS, encoder.categories_)
+            for position, category in enumerate(categories)}
+
+def count_moved(first, second):
+    shared = first.keys() & second.keys()
+    return len(shared), sum(first[key] != second[key] for key in shared)
+
+def run_benchmark(retrain_date):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_raw = load_raw_data()
+    vocabulary_cols = list(VOCABULARY_NAMESPACES)
+    strings = df_raw[vocabulary_cols].astype(object)
+    memory_strings = strings.memory_usage(index=False, deep=True).sum()
+
+    vocabulary = Vocabulary()
+    start = time.perf_counter()
+    vocabulary.extend(df_raw)
+    extend_seconds = time.perf_counter() - start
+    coded = vocabulary.apply(strings)
+    memory_coded = coded.memory_usage(index=False, deep=True).sum()
+    memory_int32 = 4 * strings.size
+    print(f"Vocabulário: {len(vocabulary)} valores "
+          f"({', '.join(f'{len(values)} {namespace}' for namespace, values in vocabulary.values.items())}), "
+          f"construído em {extend_seconds * 1000:.0f} ms")
+    print(f"Memória de {', '.join(vocabulary_cols)}: strings {memory_strings / 2**20:.1f} MiB, "
+          f"categóricas {memory_coded / 2**20:.2f} MiB, códigos int32 {memory_int32 / 2**20:.2f} MiB")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(df_raw, vocabulary=vocabulary))
+    X = df[CATEGORICAL_COLS]
+    X_strings = X.astype(object)
+    vocabulary_encoder = VocabularyEncoder([vocabulary.categories(col) for col in CATEGORICAL_COLS]).fit(X)
+    one_hot_encoder = OneHotEncoder(handle_unknown='ignore').fit(X)
+
+    print(f"\n{'codificação (transform)':<28} {'categóricas (ms)':>17} {'strings (ms)':>13}")
+    for name, encoder in [('VocabularyEncoder', vocabulary_encoder), ('OneHotEncoder', one_hot_encoder)]:
+        print(f"{name:<28} {best_time(lambda: encoder.transform(X)) * 1000:>17.1f} "
+              f"{best_time(lambda: encoder.transform(X_strings)) * 1000:>13.1f}")
+
+    # Paridade: reordena as colunas do VocabularyEncoder pelos nomes do OneHotEncoder
+    names = list(vocabulary_encoder.get_feature_names_out(CATEGORICAL_COLS))
+    position = {name: i for i, name in enumerate(names)}
+    permutation = [position[name] for name in one_hot_encoder.get_feature_names_out(CATEGORICAL_COLS)]
+    expected = one_hot_encoder.transform(X).tocsc()
+    differences = sum((vocabulary_encoder.transform(matrix).tocsc()[:, permutation] != expected).nnz
+                      for matrix in (X, X_strings))
+    print(f"Paridade com o OneHotEncoder ({X.shape[0]} linhas, {len(names)} colunas): "
+          f"{'idêntica' if differences == 0 else f'{differences} valores DIVERGENTES'}")
+
+    # Retreino: o vocabulário cresce com as partidas novas, o OneHotEncoder reordena as categorias
+    before = pd.to_datetime(df['date']) < pd.Timestamp(retrain_date)
+    growing = Vocabulary()
+    growing.extend(df_raw[before.to_numpy()])
+    first_fit = VocabularyEncoder([growing.categories(col) for col in CATEGORICAL_COLS]).fit(X[before])
+    growing.extend(df_raw)
+    second_fit = VocabularyEncoder([growing.categories(col) for col in CATEGORICAL_COLS]).fit(X)
+    shared, vocabulary_moved = count_moved(block_positions(first_fit), block_positions(second_fit))
+    _, one_hot_moved = count_moved(block_positions(OneHotEncoder(handle_unknown='ignore').fit(X[before])),
+                                   block_positions(one_hot_encoder))
+    print(f"\nRetreino (até {retrain_date} e histórico completo): {shared} colunas presentes nos dois ajustes; "
+          f"mudaram de posição no bloco da variável: VocabularyEncoder {vocabulary_moved}, "
+          f"OneHotEncoder {one_hot_moved}")
+    return differences == 0 and vocabulary_moved == 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Memória, desempenho e estabilidade do vocabulário categórico.")
+    parser.add_argument('--retrain-date', default='2015-01-01', help="Data de corte do primeiro ajuste.")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.retrain_date) else 1)
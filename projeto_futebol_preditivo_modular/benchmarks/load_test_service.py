@@ -0,0 +1,149 @@
+# benchmarks/load_test_service.py
+#
+# Teste de carga do serviço de previsões (src.prediction_service): abre N conexões keep-alive
+# concorrentes que enviam requisições POST /predict durante um intervalo fixo e mede, do lado do cliente,
+# a vazão (requisições e partidas por segundo) e a latência p50/p99. Ao final, imprime as métricas
+# reportadas pelo próprio serviço (GET /metrics), incluindo o tamanho médio dos micro-lotes.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m benchmarks.load_test_service --spawn [--concurrency 64] [--duration 10]
+#     python -m benchmarks.load_test_service --port 8765          # serviço já em execução
+# Com --spawn, um modelo de exemplo é treinado num diretório temporário e o serviço é iniciado
+# num subprocesso (com o pontuador compilado, a menos que --no-compiled seja usado).
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.config import FEATURES, TARGET, SERVICE_HOST, SERVICE_PORT, LOGISTIC_REGRESSION_MODEL_NAME
+from src.compiled_scorer import export_compiled_scorer
+from src.data_ingestion import load_raw_data
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.model_training import get_preprocessor
+
+def load_sample_matches(num_matches=1000):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer_features(preprocess_data(load_raw_data()))
+    sample = df.sample(min(num_matches, len(df)), random_state=42)
+    return df, json.loads(sample[FEATURES].to_json(orient='records'))
+
+def build_sample_models(df, models_dir, compiled):
+    model = Pipeline(steps=[('preprocessor', get_preprocessor()),
+                            ('classifier', LogisticRegression(max_iter=1000))])
+    model.fit(df[FEATURES], df[TARGET])
+    with contextlib.redirect_stdout(io.StringIO()):
+        joblib.dump(model, os.path.join(models_dir, LOGISTIC_REGRESSION_MODEL_NAME))
+        if compiled:
+            export_compiled_scorer(model, models_dir)
+
+async def open_connection(host, port, unix_socket):
+    if unix_socket:
+        return await asyncio.open_unix_connection(unix_socket)
+    return await asyncio.open_connection(host, port)
+
+async def http_request(reader, writer, method, path, body=b''):
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = next(int(line.split(b':', 1)[1]) for line in head.split(b'\r\n')
+                  if line.lower().startswith(b'content-length:'))
+    return status, json.loads(await reader.readexactly(length))
+
+async def client(host, port, unix_socket, bodies, deadline, latencies, counters):
+    reader, writer = await open_connection(host, port, unix_socket)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, 'POST', '/predict', bodies[i % len(bodies)])
+            latencies.append((time.perf_counter() - start) * 1000)
+            counters['errors' if status != 200 else 'ok'] += 1
+            i += 1
+    finally:
+        writer.close()
+
+async def wait_until_ready(host, port, unix_socket, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await open_connection(host, port, unix_socket)
+            await http_request(reader, writer, 'GET', '/health')
+            writer.close()
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+async def run_load_test(host, port, unix_socket, matches, concurrency, duration, matches_per_request):
+    await wait_until_ready(host, port, unix_socket)
+    bodies = [json.dumps(matches[i:i + matches_per_request]).encode('utf-8')
+              for i in range(0, len(matches) - matches_per_request + 1, matches_per_request)]
+    latencies = []
+    counters = {'ok': 0, 'errors': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, unix_socket, bodies, start + duration, latencies, counters)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await open_connection(host, port, unix_socket)
+    _, service_metrics = await http_request(reader, writer, 'GET', '/metrics')
+    writer.close()
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"Conexões concorrentes: {concurrency} | partidas por requisição: {matches_per_request} | duração: {elapsed:.1f}s")
+    print(f"Requisições: {counters['ok']} ok, {counters['errors']} com erro")
+    print(f"Vazão: {counters['ok'] / elapsed:,.0f} requisições/s, {counters['ok'] * matches_per_request / elapsed:,.0f} partidas/s")
+    print(f"Latência (cliente): p50 {p50:.2f} ms | p99 {p99:.2f} ms")
+    print("\nMétricas do serviço:")
+    for name, value in service_metrics.items():
+        print(f"  {name}: {value:.2f}" if isinstance(value, float) else f"  {name}: {value}")
+
+def main(args):
+    df, matches = load_sample_matches()
+    service = None
+    with tempfile.TemporaryDirectory() as models_dir:
+        if args.spawn:
+            build_sample_models(df, models_dir, compiled=not args.no_compiled)
+            command = [sys.executable, '-m', 'src.prediction_service', '--models-dir', models_dir,
+                       '--host', args.host, '--port', str(args.port),
+                       '--max-batch-size', str(args.max_batch_size), '--max-wait-ms', str(args.max_wait_ms)]
+            if args.unix_socket:
+                command += ['--unix-socket', args.unix_socket]
+            service = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(run_load_test(args.host, args.port, args.unix_socket, matches, args.concurrency,
+                                      args.duration, args.matches_per_request))
+        finally:
+            if service is not None:
+                service.terminate()
+                service.wait()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço de previsões.")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--unix-socket', help="Conecta por socket Unix em vez de TCP.")
+    parser.add_argument('--concurrency', type=int, default=64, help="Conexões concorrentes.")
+    parser.add_argument('--duration', type=float, default=10, help="Duração do teste (s).")
+    parser.add_argument('--matches-per-request', type=int, default=1, help="Partidas por requisição.")
+    parser.add_argument('--spawn', action='store_true', help="Inicia o serviço com um modelo de exemplo.")
+    parser.add_argument('--no-compiled', action='store_true', help="Com --spawn, usa o Pipeline do sklearn.")
+    parser.add_argument('--max-batch-size', type=int, default=256, help="Com --spawn, tamanho máximo do lote.")
+    parser.add_argument('--max-wait-ms', type=float, default=2, help="Com --spawn, espera máxima do lote (ms).")
+    main(parser.parse_args())
@@ -1,87 +1,285 @@
 # main.py
 
+import argparse
 import os
 import pandas as pd
 
 # Importa as funções de cada módulo
-from src.data_ingestion import load_raw_data, save_data
+from src.data_ingestion import load_raw_data, save_data, load_data
 from src.data_preprocessing import preprocess_data
 from src.feature_engineering import engineer_features, analyze_correlation
 from src.model_training import train_models, save_model
+from src.hyperparameter_search import run_hyperparameter_search, tuned_candidates
+from src.backtesting import run_backtest
+from src.compiled_scorer import export_compiled_scorer
 from src.model_evaluation import evaluate_model, interpret_model
 from src.monitoring_and_insights import load_model, simulate_new_data, monitor_and_insight
-from src.config import RAW_DATA_PATH, CLEANED_DATA_PATH, ANALYZED_DATA_PATH, FEATURES, TARGET
+from src.drift_monitor import build_drift_monitor, load_drift_monitor
+from src.streaming import run_streaming_pipeline
+from src.incremental import run_incremental_ingestion
+from src.online_learning import update_online_model
+from src.ratings import RatingEngine
+from src.head_to_head import HeadToHeadIndex
+from src.vocabulary import update_vocabulary
+from src.reporting import Report
+from src.profiling import enable_tracing, disable_tracing
+from src.stage_cache import file_fingerprint, stage_cache_key, load_cached_stage, store_cached_stage
+# Copy-on-Write: os estágios retornam novos DataFrames que compartilham as colunas não alteradas,
+# então o orquestrador não precisa de cópias defensivas entre as fases (padrão a partir do pandas 3).
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
-def run_dmaic_project():
+from src.config import (RAW_DATA_PATH, CLEANED_DATA_PATH, ANALYZED_DATA_PATH, CLEANED_DATA_CSV_PATH,
+                        ANALYZED_DATA_CSV_PATH, FEATURES, TARGET, CACHE_STAGES, STREAM_CHUNK_SIZE, REPORT_DIR,
+                        PROFILE_TRACE_PATH, PROFILE_FOLDED_PATH, RATING_STATE_PATH, HEAD_TO_HEAD_ENABLED,
+                        HEAD_TO_HEAD_INDEX_PATH, VOCABULARY_PATH)
+
+def stage_cache_keys():
     """
-    Orquestra a execução de todas as fases do projeto DMAIC.
+    Chaves de cache do Measure e do Analyze. Dependem do conteúdo do CSV bruto, do vocabulário salvo (que
+    define os códigos das colunas categóricas), das configurações e do código de cada estágio.
     """
-    print("--- Iniciando Projeto de Análise Preditiva no Futebol (DMAIC) ---")
+    vocabulary_fingerprint = file_fingerprint(VOCABULARY_PATH) if os.path.exists(VOCABULARY_PATH) else 'vazio'
+    measure_key = stage_cache_key('measure', file_fingerprint(RAW_DATA_PATH) + vocabulary_fingerprint,
+                                  [load_raw_data, preprocess_data, update_vocabulary])
+    return measure_key, stage_cache_key('analyze', measure_key, [engineer_features, RatingEngine, HeadToHeadIndex])
 
-    # --- Fase 1: DEFINE (Definir o Problema e o Objetivo do Projeto) ---
-    print("\n### Fase 1: DEFINE (Definir o Problema e o Objetivo do Projeto) ###")
-    print("Esta fase foi definida conceitualmente e documentada no README.md.")
-    print("Objetivo: Aumentar a acurácia da previsão de resultados de jogos de futebol em 15% e identificar os 3 principais fatores estatísticos.")
-    
-    # --- Fase 2: MEASURE (Medir o Desempenho Atual e Coletar Dados) ---
-    print("\n### Fase 2: MEASURE (Medir o Desempenho Atual e Coletar Dados) ###")
-    # Carregar dados brutos (tente do local primeiro, se não, da URL)
-    df_raw = load_raw_data(from_url=False)
-    if df_raw is None:
-        print("Falha ao carregar dados brutos. Encerrando o projeto.")
-        return
-
-    # Pré-processar os dados
-    df_cleaned = preprocess_data(df_raw.copy())
-    if df_cleaned is None:
-        print("Falha no pré-processamento dos dados. Encerrando o projeto.")
-        return
-    save_data(df_cleaned, CLEANED_DATA_PATH)
+def run_measure_and_analyze(use_cache=True, rebuild_stages=(), memory_report=False):
+    """
+    Executa as fases Measure (carga e pré-processamento) e Analyze (engenharia de features),
+    reaproveitando o cache de estágios quando os dados brutos e as configurações não mudaram.
+    Retorna o DataFrame analisado, ou None em caso de falha.
+    """
+    measure_key = analyze_key = None
+    if use_cache and os.path.exists(RAW_DATA_PATH):
+        measure_key, analyze_key = stage_cache_keys()
+
+    df_analyzed = None
+    if analyze_key is not None and 'analyze' not in rebuild_stages:
+        df_analyzed = load_cached_stage('analyze', analyze_key)
+
+    if df_analyzed is not None and 'measure' not in rebuild_stages and os.path.exists(CLEANED_DATA_PATH):
+        print("Saída do Analyze já disponível em cache: carregamento e pré-processamento dos dados brutos ignorados.")
+    else:
+        df_cleaned = None
+        if measure_key is not None and 'measure' not in rebuild_stages:
+            df_cleaned = load_cached_stage('measure', measure_key)
+
+        if df_cleaned is None:
+            # Carregar dados brutos (tente do local primeiro, se não, da URL)
+            df_raw = load_raw_data(from_url=False, report_memory=memory_report)
+            if df_raw is None:
+                print("Falha ao carregar dados brutos. Encerrando o projeto.")
+                return None
+
+            # Estender o vocabulário global com os valores novos e pré-processar os dados com ele
+            vocabulary = update_vocabulary(df_raw)
+            df_cleaned = preprocess_data(df_raw, vocabulary=vocabulary)
+            if df_cleaned is None:
+                print("Falha no pré-processamento dos dados. Encerrando o projeto.")
+                return None
+            if measure_key is not None:
+                # As saídas ficam sob a chave do vocabulário já estendido, que gerou os seus códigos: é o
+                # vocabulário de partida da próxima execução com os mesmos dados brutos
+                measure_key, analyze_key = stage_cache_keys()
+                store_cached_stage('measure', measure_key, df_cleaned)
+            save_data(df_cleaned, CLEANED_DATA_PATH)
+        elif not os.path.exists(CLEANED_DATA_PATH):
+            save_data(df_cleaned, CLEANED_DATA_PATH)
 
     # --- Fase 3: ANALYZE (Analisar as Causas-Raiz e Desenvolver Hipóteses) ---
     print("\n### Fase 3: ANALYZE (Analisar as Causas-Raiz e Desenvolver Hipóteses) ###")
     # Engenharia de features
-    df_analyzed = engineer_features(df_cleaned.copy())
     if df_analyzed is None:
-        print("Falha na engenharia de features. Encerrando o projeto.")
-        return
+        ratings, head_to_head = RatingEngine(), HeadToHeadIndex()
+        df_analyzed = engineer_features(df_cleaned, ratings=ratings, head_to_head=head_to_head)
+        if df_analyzed is None:
+            print("Falha na engenharia de features. Encerrando o projeto.")
+            return None
+        if analyze_key is not None:
+            store_cached_stage('analyze', analyze_key, df_analyzed)
+        save_data(df_analyzed, ANALYZED_DATA_PATH)
+        ratings.save(RATING_STATE_PATH)
+        if HEAD_TO_HEAD_ENABLED:
+            head_to_head.save(HEAD_TO_HEAD_INDEX_PATH)
+    else:
+        if not os.path.exists(ANALYZED_DATA_PATH):
+            save_data(df_analyzed, ANALYZED_DATA_PATH)
+        if not os.path.exists(RATING_STATE_PATH):
+            # Saída do Analyze em cache sem o estado dos ratings, o índice de confrontos diretos ou o vocabulário:
+            # refaz a passagem (rápida) sobre o histórico
+            ratings = RatingEngine()
+            ratings.update(df_analyzed)
+            ratings.save(RATING_STATE_PATH)
+        if HEAD_TO_HEAD_ENABLED and not os.path.exists(HEAD_TO_HEAD_INDEX_PATH):
+            head_to_head = HeadToHeadIndex()
+            head_to_head.update(df_analyzed)
+            head_to_head.save(HEAD_TO_HEAD_INDEX_PATH)
+        if not os.path.exists(VOCABULARY_PATH):
+            update_vocabulary(df_analyzed)
+
+    return df_analyzed
+
+def run_measure_and_analyze_streaming(chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Executa Measure e Analyze em streaming, bloco a bloco, gravando a saída incrementalmente.
+    Retorna o DataFrame analisado lido do armazenamento, ou None se nenhuma linha foi processada.
+    """
+    try:
+        summary = run_streaming_pipeline(chunk_size=chunk_size)
+    except ValueError as e:
+        print(f"Erro no pipeline em streaming: {e}")
+        return None
+    if summary['rows'] == 0:
+        print("Nenhuma linha processada em streaming. Encerrando o projeto.")
+        return None
+
+    # --- Fase 3: ANALYZE (Analisar as Causas-Raiz e Desenvolver Hipóteses) ---
+    print("\n### Fase 3: ANALYZE (Analisar as Causas-Raiz e Desenvolver Hipóteses) ###")
+    print("Features geradas em streaming; carregando os dados analisados do armazenamento colunar.")
+    return load_data(ANALYZED_DATA_PATH)
+
+def run_dmaic_project(use_cache=True, rebuild_stages=(), export_csv=False, memory_report=False,
+                      stream=False, chunk_size=STREAM_CHUNK_SIZE, incremental=False, report_dir=None, search=False,
+                      backtest=False, online=False, trace_path=None, profile=False):
+    """
+    Orquestra a execução de todas as fases do projeto DMAIC.
+    - use_cache: reaproveita as saídas de Measure/Analyze quando os dados brutos e as configurações não mudaram.
+    - rebuild_stages: estágios ('measure', 'analyze') que devem ser recomputados mesmo com cache válido.
+    - export_csv: além do armazenamento colunar, exporta os dados limpos e analisados em CSV.
+    - memory_report: imprime o uso de memória por coluna dos dados brutos antes e depois da tipagem.
+    - stream: executa Measure e Analyze bloco a bloco (chunk_size linhas por vez), gravando a saída
+      incrementalmente; indicado para arquivos maiores que a memória disponível.
+    - incremental: processa apenas as partidas adicionadas ao CSV bruto desde a última execução,
+      anexando-as aos dados processados (com reconstrução completa se o histórico mudou).
+    - report_dir: modo relatório (headless). As figuras são renderizadas em paralelo e salvas em report_dir,
+      junto com um resumo das estatísticas em JSON, sem abrir janelas nem bloquear a execução.
+    - search: na fase Improve, busca os hiperparâmetros dos modelos (successive halving, retomável) e
+      treina os candidatos com os parâmetros escolhidos.
+    - backtest: na fase Improve, avalia os modelos candidatos com um backtest walk-forward anual (cada ano
+      previsto só com partidas anteriores) e salva a tabela de métricas por período.
+    - online: na fase Improve, em vez do treino completo, atualiza o modelo online (partial_fit) só com as
+      partidas que ele ainda não viu, gravando um novo snapshot versionado; combine com incremental.
+    - trace_path: registra tempo, CPU, pico de memória e linhas de cada estágio em trace_path (JSON lines) e
+      imprime um resumo ao final. Com profile, também grava as pilhas amostradas para um flame graph
+      (PROFILE_FOLDED_PATH).
+    """
+    print("--- Iniciando Projeto de Análise Preditiva no Futebol (DMAIC) ---")
+    report = Report(report_dir) if report_dir else None
+    if trace_path:
+        enable_tracing(trace_path, PROFILE_FOLDED_PATH if profile else None)
+    try:
+        # --- Fase 1: DEFINE (Definir o Problema e o Objetivo do Projeto) ---
+        print("\n### Fase 1: DEFINE (Definir o Problema e o Objetivo do Projeto) ###")
+        print("Esta fase foi definida conceitualmente e documentada no README.md.")
+        print("Objetivo: Aumentar a acurácia da previsão de resultados de jogos de futebol em 15% e identificar os 3 principais fatores estatísticos.")
     
-    # Análise de correlação e EDA
-    analyze_correlation(df_analyzed.copy()) # Passa uma cópia para evitar modificações
-    save_data(df_analyzed, ANALYZED_DATA_PATH)
-
-    # --- Fase 4: IMPROVE (Melhorar e Implementar Soluções/Modelos) ---
-    print("\n### Fase 4: IMPROVE (Melhorar e Implementar Soluções/Modelos) ###")
-    # Treinar e selecionar o melhor modelo
-    best_model, best_model_name, X_test_df, y_test_df = train_models(df_analyzed.copy())
-    if best_model is None:
-        print("Falha no treinamento/seleção do modelo. Encerrando o projeto.")
-        return
+        # --- Fase 2: MEASURE (Medir o Desempenho Atual e Coletar Dados) ---
+        print("\n### Fase 2: MEASURE (Medir o Desempenho Atual e Coletar Dados) ###")
+        if stream:
+            df_analyzed = run_measure_and_analyze_streaming(chunk_size)
+        elif incremental:
+            df_analyzed = run_incremental_ingestion()
+            print("\n### Fase 3: ANALYZE (Analisar as Causas-Raiz e Desenvolver Hipóteses) ###")
+        else:
+            df_analyzed = run_measure_and_analyze(use_cache, rebuild_stages, memory_report)
+        if df_analyzed is None:
+            return
+
+        if export_csv:
+            save_data(load_data(CLEANED_DATA_PATH), CLEANED_DATA_CSV_PATH)
+            save_data(df_analyzed, ANALYZED_DATA_CSV_PATH)
+
+        # Análise de correlação e EDA
+        analyze_correlation(df_analyzed, report=report)
+
+        # --- Fase 4: IMPROVE (Melhorar e Implementar Soluções/Modelos) ---
+        print("\n### Fase 4: IMPROVE (Melhorar e Implementar Soluções/Modelos) ###")
+        if online:
+            # Atualização online: custo proporcional às partidas novas, sem retreinar com o histórico
+            update_online_model(df_analyzed)
+            print("\n--- Projeto de Análise Preditiva no Futebol (DMAIC) Concluído (modo online)! ---")
+            return
+        # Buscar os hiperparâmetros (opcional) e treinar e selecionar o melhor modelo
+        candidates = tuned_candidates(run_hyperparameter_search(df_analyzed)) if search else None
+        best_model, best_model_name, X_test_df, y_test_df = train_models(df_analyzed, candidates)
+        if best_model is None:
+            print("Falha no treinamento/seleção do modelo. Encerrando o projeto.")
+            return
     
-    # Salvar o melhor modelo
-    save_model(best_model, best_model_name)
+        # Salvar o melhor modelo
+        save_model(best_model, best_model_name)
+        # Exportar o pontuador compilado (NumPy) para previsões de baixa latência
+        if best_model_name == 'Logistic Regression':
+            export_compiled_scorer(best_model)
+        # Referência do monitor de drift: a distribuição dos dados com que o novo modelo foi treinado
+        build_drift_monitor(best_model, df_analyzed)
 
-    # Avaliar o modelo e interpretar (se aplicável)
-    evaluate_model(best_model, X_test_df, y_test_df)
+        # Avaliar o modelo e interpretar (se aplicável)
+        evaluate_model(best_model, X_test_df, y_test_df, report=report)
     
-    # Para interpretação, passamos o X e Y originais para que o preprocessor possa ser re-utilizado
-    # e obter os nomes das features transformadas corretamente.
-    interpret_model(best_model, best_model_name, df_analyzed[FEATURES], df_analyzed[TARGET])
+        # Para interpretação, passamos o X e Y originais para que o preprocessor possa ser re-utilizado
+        # e obter os nomes das features transformadas corretamente.
+        interpret_model(best_model, best_model_name, df_analyzed[FEATURES], df_analyzed[TARGET], report=report)
+
+        # Backtest walk-forward (opcional): como a acurácia se sustenta ao longo do tempo
+        if backtest:
+            run_backtest(df_analyzed)
 
 
-    # --- Fase 5: CONTROL (Controlar e Sustentar as Melhorias) ---
-    print("\n### Fase 5: CONTROL (Controlar e Sustentar as Melhorias) ###")
-    # Carregar o modelo salvo (para simular um novo ciclo de monitoramento)
-    loaded_model, loaded_model_name = load_model()
-    if loaded_model is None:
-        print("Falha ao carregar o modelo para monitoramento. Encerrando o projeto.")
-        return
+        # --- Fase 5: CONTROL (Controlar e Sustentar as Melhorias) ---
+        print("\n### Fase 5: CONTROL (Controlar e Sustentar as Melhorias) ###")
+        # Carregar o modelo salvo (para simular um novo ciclo de monitoramento)
+        loaded_model, loaded_model_name = load_model()
+        if loaded_model is None:
+            print("Falha ao carregar o modelo para monitoramento. Encerrando o projeto.")
+            return
 
-    # Simular novos dados e monitorar
-    df_new_games = simulate_new_data(df_analyzed.copy())
-    monitor_and_insight(loaded_model, loaded_model_name, df_new_games)
+        # Simular novos dados e monitorar
+        df_new_games = simulate_new_data(df_analyzed)
+        drift_monitor = load_drift_monitor() or build_drift_monitor(loaded_model, df_analyzed)
+        monitor_and_insight(loaded_model, loaded_model_name, df_new_games, report=report, drift_monitor=drift_monitor)
 
-    print("\n--- Projeto de Análise Preditiva no Futebol (DMAIC) Concluído! ---")
+        print("\n--- Projeto de Análise Preditiva no Futebol (DMAIC) Concluído! ---")
+    finally:
+        # Mesmo se alguma fase falhar, as figuras já agendadas e o resumo parcial são gravados
+        if report is not None:
+            report.render()
+        if trace_path:
+            disable_tracing()
 
 if __name__ == '__main__':
-    run_dmaic_project()
+    parser = argparse.ArgumentParser(description="Projeto de Análise Preditiva no Futebol (DMAIC).")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de estágios e recomputa Measure e Analyze.")
+    parser.add_argument('--rebuild', action='append', choices=CACHE_STAGES, default=[],
+                        help="Força a reconstrução de um estágio mesmo com cache válido (pode ser repetido).")
+    parser.add_argument('--export-csv', action='store_true',
+                        help="Exporta também os dados limpos e analisados em CSV.")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="Mostra o uso de memória por coluna dos dados brutos antes e depois da tipagem.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Executa Measure e Analyze em streaming, bloco a bloco, para arquivos maiores que a memória.")
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE,
+                        help="Linhas por bloco no modo streaming.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Processa apenas as partidas novas do CSV bruto desde a última execução.")
+    parser.add_argument('--report', nargs='?', const=REPORT_DIR, default=None, metavar='DIR',
+                        help="Modo relatório (headless): salva as figuras e um resumo em JSON em DIR, sem abrir janelas.")
+    parser.add_argument('--search', action='store_true',
+                        help="Busca os hiperparâmetros dos modelos na fase Improve (retoma uma busca interrompida).")
+    parser.add_argument('--backtest', action='store_true',
+                        help="Executa o backtest walk-forward anual dos modelos na fase Improve.")
+    parser.add_argument('--online', action='store_true',
+                        help="Atualiza o modelo online só com as partidas novas, em vez do treino completo.")
+    parser.add_argument('--trace', nargs='?', const=PROFILE_TRACE_PATH, default=None, metavar='ARQUIVO',
+                        help="Registra tempo, CPU, pico de memória e linhas de cada estágio (JSON lines).")
+    parser.add_argument('--profile', action='store_true',
+                        help="Com --trace, amostra as pilhas e grava um perfil para flame graph.")
+    args = parser.parse_args()
+
+    run_dmaic_project(use_cache=not args.no_cache, rebuild_stages=args.rebuild, export_csv=args.export_csv,
+                      memory_report=args.memory_report, stream=args.stream, chunk_size=args.chunk_size,
+                      incremental=args.incremental, report_dir=args.report, search=args.search,
+                      backtest=args.backtest, online=args.online,
+                      trace_path=args.trace, profile=args.profile)
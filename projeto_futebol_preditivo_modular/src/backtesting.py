@@ -0,0 +1,173 @@
+# src/backtesting.py
+#
+# Backtest walk-forward: em vez de uma divisão aleatória (que põe partidas futuras no treino), cada ano a
+# partir de BACKTEST_FIRST_YEAR é previsto por um modelo treinado apenas com as partidas anteriores a ele
+# (janela expansível, ou deslizante de BACKTEST_WINDOW_YEARS anos). O resultado é uma tabela de métricas
+# por modelo e período, que mostra como a acurácia se sustenta ao longo do tempo.
+#
+# - Paralelismo: os períodos são divididos em blocos contíguos, um por processo.
+# - Warm start: dentro de um bloco, cada período parte do ajuste do período anterior. A Regressão Logística
+#   começa a otimização dos coeficientes anteriores; a floresta mantém a maior parte das árvores e treina
+#   só BACKTEST_FOREST_REFRESH delas com os dados do novo período (as mais antigas são descartadas).
+#   Com warm start os resultados dependem da divisão em blocos; com warm_start=False, não.
+# - Codificadores: com o vocabulário, as colunas categóricas não dependem dos dados de treino e são
+#   codificadas uma única vez para todas as partidas; codificações ajustadas aos dados (frequência, alvo)
+#   são ajustadas a cada período, só com o treino. A padronização das numéricas é sempre por período.
+
+import os
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed, cpu_count
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.preprocessing import StandardScaler
+from src.config import (TARGET, NUMERICAL_COLS, CATEGORICAL_COLS, CATEGORICAL_ENCODING, MODEL_ENCODINGS,
+                        BACKTEST_FIRST_YEAR, BACKTEST_WINDOW_YEARS, BACKTEST_EXCLUDE_FEATURES,
+                        BACKTEST_FOREST_REFRESH, BACKTEST_MAX_WORKERS, BACKTEST_RESULTS_PATH)
+from src.categorical_encoding import OrdinalCodeEncoder, HashingEncoder
+from src.model_training import MODEL_CANDIDATES, get_categorical_encoder
+from src.vocabulary import VocabularyEncoder
+
+def walk_forward_periods(years, first_year=BACKTEST_FIRST_YEAR, window_years=BACKTEST_WINDOW_YEARS):
+    """
+    Períodos do backtest: uma lista de (ano, linhas de treino, linhas de teste), com as partidas dos anos
+    anteriores ao ano testado (todas, ou as dos últimos window_years anos) no treino.
+    """
+    years = np.asarray(years)
+    periods = []
+    for year in range(first_year, int(years.max()) + 1):
+        test_rows = np.flatnonzero(years == year)
+        train_mask = years < year
+        if window_years is not None:
+            train_mask &= years >= year - window_years
+        train_rows = np.flatnonzero(train_mask)
+        if len(test_rows) and len(train_rows):
+            periods.append((year, train_rows, test_rows))
+    return periods
+
+def _is_fixed_encoder(encoder):
+    """
+    Codificadores cuja saída não depende dos dados de ajuste (categorias do vocabulário, hashing).
+    """
+    return (isinstance(encoder, (VocabularyEncoder, HashingEncoder))
+            or (isinstance(encoder, OrdinalCodeEncoder) and not isinstance(encoder.categories, str)))
+
+def _prepare_warm_start(estimator):
+    """
+    Prepara um classificador já ajustado para continuar do ajuste anterior. Retorna False se ele não
+    suportar warm start.
+    """
+    if 'warm_start' not in estimator.get_params():
+        return False
+    if hasattr(estimator, 'estimators_'):
+        # Floresta: descarta as árvores mais antigas; o próximo fit treina o mesmo número de árvores novas
+        refresh = max(1, int(round(len(estimator.estimators_) * BACKTEST_FOREST_REFRESH)))
+        estimator.estimators_ = estimator.estimators_[refresh:]
+    estimator.set_params(warm_start=True)
+    return True
+
+def _run_block(name, periods, numerical, categorical, encoded, encoder, y, warm_start):
+    """
+    Executada nos processos do backtest: avalia um bloco contíguo de períodos, em ordem, reaproveitando o
+    ajuste do período anterior quando warm_start é verdadeiro. Retorna uma lista de métricas por período.
+    """
+    records = []
+    estimator, width = None, None
+    for year, train_rows, test_rows in periods:
+        scaler = StandardScaler().fit(numerical[train_rows])
+        if encoded is not None:
+            cat_train, cat_test = encoded[train_rows], encoded[test_rows]
+        else:
+            period_encoder = clone(encoder)
+            cat_train = period_encoder.fit_transform(categorical.iloc[train_rows], y[train_rows])
+            cat_test = period_encoder.transform(categorical.iloc[test_rows])
+        blocks_train = [scaler.transform(numerical[train_rows]), cat_train]
+        blocks_test = [scaler.transform(numerical[test_rows]), cat_test]
+        if sp.issparse(cat_train):
+            X_train, X_test = sp.hstack(blocks_train, format='csr'), sp.hstack(blocks_test, format='csr')
+        else:
+            X_train, X_test = np.hstack(blocks_train), np.hstack(blocks_test)
+
+        warm = (warm_start and estimator is not None and X_train.shape[1] == width
+                and _prepare_warm_start(estimator))
+        if not warm:
+            estimator = MODEL_CANDIDATES[name]()
+            if estimator.get_params().get('n_jobs') not in (None, 1):
+                estimator.set_params(n_jobs=1) # O paralelismo do backtest já é entre blocos de períodos
+        width = X_train.shape[1]
+        start = time.perf_counter()
+        estimator.fit(X_train, y[train_rows])
+        fit_seconds = time.perf_counter() - start
+        probabilities = estimator.predict_proba(X_test)
+        records.append({'model': name, 'period': year, 'train_rows': len(train_rows), 'test_rows': len(test_rows),
+                        'accuracy': accuracy_score(y[test_rows], estimator.classes_[probabilities.argmax(axis=1)]),
+                        'log_loss': log_loss(y[test_rows], probabilities, labels=estimator.classes_),
+                        'fit_seconds': fit_seconds, 'warm_start': warm})
+    return records
+
+def run_backtest(df, models=None, first_year=BACKTEST_FIRST_YEAR, window_years=BACKTEST_WINDOW_YEARS,
+                 warm_start=True, n_jobs=BACKTEST_MAX_WORKERS, exclude_features=BACKTEST_EXCLUDE_FEATURES,
+                 path=BACKTEST_RESULTS_PATH, vocabulary=None):
+    """
+    Executa o backtest walk-forward dos modelos informados (por padrão, todos de MODEL_CANDIDATES), com a
+    codificação categórica de cada um (MODEL_ENCODINGS) e o vocabulário informado (por padrão, o salvo).
+    Salva e retorna a tabela de métricas por modelo e período (path=None para não salvar).
+    """
+    models = list(MODEL_CANDIDATES) if models is None else models
+    numerical_cols = [col for col in NUMERICAL_COLS if col not in exclude_features]
+    years = pd.to_datetime(df['date']).dt.year.to_numpy()
+    periods = walk_forward_periods(years, first_year, window_years)
+    window = 'expansível' if window_years is None else f'deslizante de {window_years} anos'
+    print(f"\n--- Backtest Walk-Forward ({len(periods)} períodos anuais, {periods[0][0]}-{periods[-1][0]}, "
+          f"janela {window}, warm start {'ativado' if warm_start else 'desativado'}) ---")
+
+    n_workers = min(cpu_count() if n_jobs in (None, -1) else n_jobs, len(periods))
+    blocks = [list(block) for block in np.array_split(np.arange(len(periods)), n_workers)]
+    numerical = df[numerical_cols].to_numpy(dtype=np.float64)
+    categorical = df[CATEGORICAL_COLS]
+    y = df[TARGET].to_numpy()
+
+    start = time.perf_counter()
+    tasks = []
+    for name in models:
+        encoder = get_categorical_encoder(MODEL_ENCODINGS.get(name, CATEGORICAL_ENCODING), vocabulary)
+        # Codificação independente dos dados de treino: calculada uma vez para todas as partidas
+        encoded = encoder.fit(categorical).transform(categorical) if _is_fixed_encoder(encoder) else None
+        tasks += [(name, [periods[i] for i in block], numerical, categorical, encoded, encoder, y, warm_start)
+                  for block in blocks]
+    outputs = Parallel(n_jobs=n_workers)(delayed(_run_block)(*task) for task in tasks)
+    metrics = pd.DataFrame([record for records in outputs for record in records])
+    print(f"Backtest concluído em {time.perf_counter() - start:.1f}s ({n_workers} processo(s)).")
+
+    pivot = metrics.pivot(index='period', columns='model', values='accuracy')
+    print("\nAcurácia por período:")
+    print(pivot.to_string(float_format=lambda value: f'{value:.4f}'))
+    summary = metrics.groupby('model').agg(accuracy=('accuracy', 'mean'), log_loss=('log_loss', 'mean'),
+                                           fit_seconds=('fit_seconds', 'sum'))
+    print("\nMédia dos períodos:")
+    print(summary.to_string(float_format=lambda value: f'{value:.4f}'))
+
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        metrics.to_csv(path, index=False)
+        print(f"Métricas por período salvas em: {path}")
+    return metrics
+
+if __name__ == '__main__':
+    import argparse
+    from src.config import ANALYZED_DATA_PATH
+    from src.data_ingestion import load_data
+
+    parser = argparse.ArgumentParser(description="Backtest walk-forward dos modelos candidatos.")
+    parser.add_argument('--first-year', type=int, default=BACKTEST_FIRST_YEAR, help="Primeiro ano testado.")
+    parser.add_argument('--window', type=int, default=BACKTEST_WINDOW_YEARS,
+                        help="Janela deslizante de N anos (padrão: expansível).")
+    parser.add_argument('--cold', action='store_true', help="Treina cada período do zero (sem warm start).")
+    parser.add_argument('--models', nargs='+', default=None, choices=list(MODEL_CANDIDATES))
+    args = parser.parse_args()
+
+    df = load_data(ANALYZED_DATA_PATH)
+    if df is not None:
+        run_backtest(df, args.models, args.first_year, args.window, warm_start=not args.cold)
@@ -0,0 +1,95 @@
+# src/bulk_scoring.py
+#
+# Pontuação em massa de arquivos de partidas (histórico completo, calendários de temporada): o arquivo
+# é lido em blocos, os blocos são pontuados em paralelo por um pool de processos (cada processo carrega
+# o modelo uma única vez) e as previsões são gravadas em blocos, na ordem de entrada, num arquivo colunar.
+
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.config import (FEATURES, MODELS_DIR, BULK_SCORING_CHUNK_SIZE, BULK_SCORING_MAX_WORKERS,
+                        BULK_SCORING_ID_COLUMNS)
+from src.data_ingestion import iter_data_chunks, ChunkedDataWriter
+from src.scoring import load_scoring_model, predict, HistoryFeatures
+
+# Modelo e estados do histórico carregados em cada processo do pool (por _init_worker)
+_worker_model = None
+_worker_history = None
+
+def _init_worker(models_dir, mmap_mode):
+    global _worker_model, _worker_history
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_model = load_scoring_model(models_dir, mmap_mode)
+        _worker_history = HistoryFeatures.load()
+    # O paralelismo vem do pool: cada processo usa uma única thread para não disputar os mesmos núcleos
+    if 'classifier__n_jobs' in getattr(_worker_model, 'get_params', dict)():
+        _worker_model.set_params(classifier__n_jobs=1)
+
+def _score_chunk(df_chunk):
+    """
+    Executada nos processos do pool: pontua um bloco e devolve as previsões com as colunas de identificação.
+    """
+    predictions = predict(_worker_model, df_chunk, _worker_history)
+    id_columns = [col for col in BULK_SCORING_ID_COLUMNS if col in df_chunk.columns and col not in predictions]
+    return df_chunk[id_columns].join(predictions)
+
+def score_file(input_path, output_path, models_dir=MODELS_DIR, chunk_size=BULK_SCORING_CHUNK_SIZE,
+               max_workers=BULK_SCORING_MAX_WORKERS, mmap_mode=None):
+    """
+    Pontua todas as partidas de input_path ('parquet' ou 'csv', com as colunas de FEATURES; as de rating e de
+    confronto direto, se ausentes, vêm dos estados salvos pelo pipeline, ver HistoryFeatures) e grava em
+    output_path a previsão e a probabilidade de cada classe, junto com as colunas de identificação
+    (BULK_SCORING_ID_COLUMNS) presentes na entrada.
+    No máximo 2 blocos por processo ficam em andamento ao mesmo tempo, então a memória usada é limitada
+    pelo tamanho do bloco, e não pelo tamanho do arquivo.
+    - mmap_mode: 'r' faz os processos compartilharem o modelo com memória mapeada (src/shared_model.py).
+      Para o Random Forest isso troca memória por CPU: a floresta compartilhada é percorrida em NumPy,
+      mais devagar que as árvores do sklearn, então o padrão é cada processo carregar a sua cópia.
+    Retorna um resumo com o número de linhas, de blocos, de processos e o tempo total.
+    """
+    max_workers = max_workers or os.cpu_count()
+    print(f"\n--- Pontuação em Massa: {input_path} (blocos de {chunk_size} linhas, {max_workers} processos) ---")
+    with contextlib.closing(iter_data_chunks(input_path, chunk_size=1)) as chunks:
+        available_columns = next(chunks).columns
+    columns = [col for col in dict.fromkeys(FEATURES + BULK_SCORING_ID_COLUMNS) if col in available_columns]
+
+    start = time.perf_counter()
+    num_chunks = 0
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(models_dir, mmap_mode)) as executor, \
+            ChunkedDataWriter(output_path) as writer:
+        in_flight = deque()
+        for df_chunk in iter_data_chunks(input_path, chunk_size=chunk_size, columns=columns):
+            in_flight.append(executor.submit(_score_chunk, df_chunk))
+            if len(in_flight) >= 2 * max_workers:
+                writer.write(in_flight.popleft().result())
+                num_chunks += 1
+        while in_flight:
+            writer.write(in_flight.popleft().result())
+            num_chunks += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{writer.rows_written} partidas pontuadas em {elapsed:.2f}s "
+          f"({writer.rows_written / elapsed:,.0f} partidas/s).")
+    return {'rows': writer.rows_written, 'chunks': num_chunks, 'workers': max_workers, 'seconds': elapsed}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pontua em massa um arquivo de partidas com o modelo salvo.")
+    parser.add_argument('input', help="Arquivo de partidas (parquet ou csv) com as colunas de FEATURES.")
+    parser.add_argument('output', help="Arquivo de saída das previsões (parquet ou csv).")
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="Diretório dos modelos salvos.")
+    parser.add_argument('--chunk-size', type=int, default=BULK_SCORING_CHUNK_SIZE, help="Linhas por bloco.")
+    parser.add_argument('--workers', type=int, default=BULK_SCORING_MAX_WORKERS,
+                        help="Processos de pontuação (padrão: número de CPUs).")
+    parser.add_argument('--mmap', action='store_true',
+                        help="Compartilha o modelo entre os processos com memória mapeada (menos memória, mais CPU).")
+    args = parser.parse_args()
+
+    score_file(args.input, args.output, args.models_dir, args.chunk_size, args.workers,
+               mmap_mode='r' if args.mmap else None)
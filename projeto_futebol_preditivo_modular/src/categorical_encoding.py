@@ -0,0 +1,123 @@
+# src/categorical_encoding.py
+#
+# Codificações compactas das colunas categóricas, alternativas ao one-hot (uma coluna por categoria).
+# Modelos de árvore não precisam de uma coluna por cidade ou torneio: com uma (ou poucas) colunas por
+# variável a matriz fica muito mais estreita, o treino mais rápido e a importância de cada variável não
+# se fragmenta entre centenas de dummies. Estratégias (CATEGORICAL_ENCODINGS em config.py):
+#   onehot:    uma coluna por categoria (VocabularyEncoder/OneHotEncoder, ver src/model_training.py)
+#   ordinal:   o código inteiro de cada categoria (os códigos estáveis do vocabulário, se houver)
+#   frequency: a fração das linhas de treino com a categoria
+#   target:    média do alvo por categoria (uma coluna por classe), ajustada fora da dobra (cross-fitting)
+#              no treino, para que a linha não veja o próprio resultado (TargetEncoder do sklearn)
+#   hashing:   one-hot com largura fixa (ENCODING_HASH_FEATURES colunas), pelo hash de 'coluna=valor'
+# Em todos os casos, categorias desconhecidas não falham: viram -1 (ordinal), 0 (frequency), a média
+# global (target) ou ainda ocupam a coluna do seu hash (hashing).
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils import murmurhash3_32
+
+def _category_positions(values, categories):
+    """
+    Posição de cada valor em categories (-1 se desconhecido), mapeando só as categorias em colunas categóricas.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = pd.Index(categories).get_indexer(values.cat.categories)
+        return np.append(lookup, -1)[values.cat.codes.to_numpy()]
+    return pd.Categorical(values, categories=categories).codes.astype(np.int64)
+
+def _fitted_categories(values):
+    """
+    Categorias observadas numa coluna (as usadas, em colunas categóricas), em ordem.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories().cat.categories.tolist()
+    return sorted(pd.unique(values.dropna()).tolist())
+
+class OrdinalCodeEncoder(BaseEstimator, TransformerMixin):
+    """
+    Uma coluna por variável com o código inteiro da categoria (-1 para desconhecidas).
+    - categories: lista de categorias por coluna (por exemplo, as do vocabulário, com códigos estáveis entre
+      retreinos) ou 'auto' para usar as categorias vistas no ajuste.
+    """
+
+    def __init__(self, categories='auto'):
+        self.categories = categories
+
+    def fit(self, X, y=None):
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        categories = [_fitted_categories(X[col]) for col in X.columns] if self.categories == 'auto' else self.categories
+        self.categories_ = [np.asarray(values, dtype=object) for values in categories]
+        return self
+
+    def transform(self, X):
+        X = pd.DataFrame(X, columns=self.feature_names_in_)
+        return np.column_stack([_category_positions(X[col], categories)
+                                for col, categories in zip(self.feature_names_in_, self.categories_)]).astype(np.float64)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.feature_names_in_ if input_features is None else input_features, dtype=object)
+
+class FrequencyEncoder(BaseEstimator, TransformerMixin):
+    """
+    Uma coluna por variável com a frequência relativa da categoria no ajuste (0 para desconhecidas).
+    """
+
+    def fit(self, X, y=None):
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self.frequencies_ = [X[col].value_counts(normalize=True, sort=False) for col in X.columns]
+        self.frequencies_ = [frequencies[frequencies > 0] for frequencies in self.frequencies_]
+        return self
+
+    def transform(self, X):
+        X = pd.DataFrame(X, columns=self.feature_names_in_)
+        columns = []
+        for col, frequencies in zip(self.feature_names_in_, self.frequencies_):
+            positions = _category_positions(X[col], frequencies.index)
+            columns.append(np.append(frequencies.to_numpy(dtype=np.float64), 0.0)[positions])
+        return np.column_stack(columns)
+
+    def get_feature_names_out(self, input_features=None):
+        input_features = self.feature_names_in_ if input_features is None else input_features
+        return np.asarray([f'{col}_frequency' for col in input_features], dtype=object)
+
+class HashingEncoder(BaseEstimator, TransformerMixin):
+    """
+    One-hot com largura fixa: cada 'coluna=valor' vai para a coluna murmurhash3 % n_features. A largura
+    não depende do número de categorias nem muda com categorias novas (ao custo de colisões).
+    """
+
+    def __init__(self, n_features=256):
+        self.n_features = n_features
+
+    def fit(self, X, y=None):
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        return self
+
+    def _hash_positions(self, col, values):
+        """
+        Coluna de cada valor: o hash é calculado uma vez por valor distinto, não por linha.
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        hashed = np.array([murmurhash3_32(f'{col}={value}', positive=True) % self.n_features
+                           for value in uniques], dtype=np.int64)
+        return hashed[codes]
+
+    def transform(self, X):
+        X = pd.DataFrame(X, columns=self.feature_names_in_)
+        num_rows = len(X)
+        cols = np.concatenate([self._hash_positions(col, X[col]) for col in self.feature_names_in_])
+        rows = np.tile(np.arange(num_rows), len(self.feature_names_in_))
+        # Valores que colidem na mesma coluna e linha são somados pelo csr_matrix
+        return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_rows, self.n_features))
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray([f'hash_{i}' for i in range(self.n_features)], dtype=object)
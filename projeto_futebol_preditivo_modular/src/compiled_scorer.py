@@ -0,0 +1,171 @@
+# src/compiled_scorer.py
+#
+# Pontuador compilado da Regressão Logística: exporta o Pipeline do sklearn já ajustado (ColumnTransformer
+# + LogisticRegression) para constantes NumPy, evitando o custo de validação de DataFrames e do
+# OneHotEncoder a cada previsão. Usado para previsões de baixa latência (uma partida por vez).
+
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from src.config import MODELS_DIR, COMPILED_SCORER_NAME
+
+def _python_key(value):
+    """
+    Converte escalares NumPy para o tipo Python equivalente, para uso como chave de dicionário.
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+class CompiledScorer:
+    """
+    Versão somente NumPy de um Pipeline (preprocessor + LogisticRegression) ajustado.
+    - A padronização (StandardScaler) é incorporada aos coeficientes das colunas numéricas e ao intercepto.
+    - Cada categoria é mapeada por dicionário para a sua coluna na matriz de coeficientes; categorias
+      desconhecidas são ignoradas, como no OneHotEncoder(handle_unknown='ignore').
+    Oferece a mesma interface de previsão do Pipeline (classes_, predict, predict_proba), aceitando
+    DataFrames, listas de dicionários ou uma única partida (dicionário).
+    """
+
+    def __init__(self, numerical_cols, numerical_coef, categorical_cols, category_index, categorical_coef,
+                 intercept, classes):
+        self.numerical_cols = list(numerical_cols)
+        self.numerical_coef = numerical_coef           # (n_classes, n_numéricas), já dividido pelo desvio padrão
+        self.categorical_cols = list(categorical_cols)
+        self.category_index = category_index           # uma lista de {categoria: coluna} por coluna categórica
+        self.categorical_coef = categorical_coef       # (n_classes, n_categorias + 1); a última coluna é zero
+        self.intercept = intercept                     # (n_classes,), já com a média do scaler incorporada
+        self.classes_ = np.asarray(classes)
+        self._unknown_index = categorical_coef.shape[1] - 1
+
+    def _logits_one(self, match):
+        logits = self.intercept + self.numerical_coef @ np.array(
+            [match[col] for col in self.numerical_cols], dtype=np.float64)
+        for col, index in zip(self.categorical_cols, self.category_index):
+            position = index.get(_python_key(match[col]))
+            if position is not None:
+                logits = logits + self.categorical_coef[:, position]
+        return logits
+
+    def _logits(self, X):
+        logits = self.intercept + X[self.numerical_cols].to_numpy(dtype=np.float64) @ self.numerical_coef.T
+        for col, index in zip(self.categorical_cols, self.category_index):
+            values = X[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Mapeia só as categorias (poucas) e depois indexa pelos códigos, em vez de mapear linha a linha
+                lookup = np.array([index.get(_python_key(c), self._unknown_index)
+                                   for c in values.cat.categories] + [self._unknown_index])
+                positions = lookup[values.cat.codes.to_numpy()]
+            else:
+                positions = values.map(index).fillna(self._unknown_index).to_numpy(dtype=np.intp)
+            logits += self.categorical_coef[:, positions].T
+        return logits
+
+    def _probabilities(self, logits):
+        if logits.shape[-1] == 1:
+            # Problema binário: a LogisticRegression tem uma única linha de coeficientes (sigmoide)
+            positive = 1.0 / (1.0 + np.exp(-logits))
+            return np.concatenate([1.0 - positive, positive], axis=-1)
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp_logits = np.exp(logits)
+        return exp_logits / exp_logits.sum(axis=-1, keepdims=True)
+
+    def predict_proba_one(self, match):
+        """
+        Probabilidade de cada classe (na ordem de classes_) para uma única partida (dicionário).
+        """
+        return self._probabilities(self._logits_one(match)[np.newaxis, :])[0]
+
+    def predict_one(self, match):
+        """
+        Classe prevista para uma única partida (dicionário).
+        """
+        return self.classes_[np.argmax(self.predict_proba_one(match))]
+
+    def predict_proba(self, X):
+        """
+        Probabilidades de cada classe para um lote de partidas (DataFrame, lista de dicionários ou dicionário).
+        """
+        if isinstance(X, dict):
+            return self.predict_proba_one(X)[np.newaxis, :]
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X)
+        return self._probabilities(self._logits(X))
+
+    def predict(self, X):
+        """
+        Classes previstas para um lote de partidas (DataFrame, lista de dicionários ou dicionário).
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def compile_pipeline(pipeline):
+    """
+    Compila um Pipeline ajustado ('preprocessor' com os transformadores 'num' e 'cat', e 'classifier'
+    LogisticRegression) em um CompiledScorer.
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    classifier = pipeline.named_steps['classifier']
+    if not hasattr(classifier, 'coef_'):
+        raise ValueError(f"Apenas modelos lineares podem ser compilados (recebido: {type(classifier).__name__}).")
+
+    columns = dict((name, cols) for name, _, cols in preprocessor.transformers_)
+    scaler = preprocessor.named_transformers_['num']
+    encoder = preprocessor.named_transformers_['cat']
+    numerical_cols = list(columns['num'])
+    categorical_cols = list(columns['cat'])
+
+    coef = np.asarray(classifier.coef_, dtype=np.float64)
+    num_coef = coef[:, :len(numerical_cols)]
+    cat_coef = coef[:, len(numerical_cols):]
+
+    # (x - média) / desvio · w = x · (w / desvio) - média · (w / desvio)
+    numerical_coef = num_coef / scaler.scale_
+    intercept = np.asarray(classifier.intercept_, dtype=np.float64) - numerical_coef @ scaler.mean_
+
+    # Só o one-hot tem uma coluna por categoria (as codificações compactas não podem ser compiladas assim)
+    categories_list = getattr(encoder, 'categories_', None)
+    if categories_list is None or sum(len(categories) for categories in categories_list) != cat_coef.shape[1]:
+        raise ValueError(f"Apenas colunas categóricas em one-hot podem ser compiladas "
+                         f"(recebido: {type(encoder).__name__}).")
+
+    category_index = []
+    offset = 0
+    for categories in categories_list:
+        category_index.append({_python_key(c): offset + i for i, c in enumerate(categories)})
+        offset += len(categories)
+    categorical_coef = np.hstack([cat_coef, np.zeros((coef.shape[0], 1))])
+
+    return CompiledScorer(numerical_cols, numerical_coef, categorical_cols, category_index, categorical_coef,
+                          intercept, classifier.classes_)
+
+def export_compiled_scorer(pipeline, path=MODELS_DIR):
+    """
+    Compila o Pipeline e salva o pontuador em path. Retorna o caminho do arquivo, ou None se o modelo
+    não puder ser compilado.
+    """
+    try:
+        scorer = compile_pipeline(pipeline)
+    except (KeyError, ValueError) as e:
+        print(f"Pontuador compilado não exportado: {e}")
+        return None
+    os.makedirs(path, exist_ok=True)
+    filename = os.path.join(path, COMPILED_SCORER_NAME)
+    joblib.dump(scorer, filename)
+    print(f"Pontuador compilado salvo em: {filename}")
+    return filename
+
+def load_compiled_scorer(models_dir=MODELS_DIR):
+    """
+    Carrega o pontuador compilado, ou None se ele não existir.
+    """
+    filename = os.path.join(models_dir, COMPILED_SCORER_NAME)
+    if not os.path.exists(filename):
+        print(f"\nPontuador compilado não encontrado em '{models_dir}'.")
+        return None
+    return joblib.load(filename)
+
+if __name__ == '__main__':
+    from src.scoring import load_model
+
+    model, model_name = load_model()
+    if model is not None:
+        export_compiled_scorer(model)
@@ -7,27 +7,198 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 # Caminhos dos dados
 RAW_DATA_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'results.csv')
-CLEANED_DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'cleaned_data.csv')
-ANALYZED_DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'analyzed_data.csv')
+# Formato de armazenamento dos dados intermediários: 'parquet' (binário, colunar e tipado) ou 'csv'
+DATA_STORAGE_FORMAT = 'parquet'
+CLEANED_DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', f'cleaned_data.{DATA_STORAGE_FORMAT}')
+ANALYZED_DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', f'analyzed_data.{DATA_STORAGE_FORMAT}')
+# Marca d'água da ingestão incremental (até onde o CSV bruto já foi processado)
+INGESTION_STATE_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'ingestion_state.json')
+# Exportações em CSV (opcionais, para inspeção manual ou uso em outras ferramentas)
+CLEANED_DATA_CSV_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'cleaned_data.csv')
+ANALYZED_DATA_CSV_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'analyzed_data.csv')
 
 # Caminho para salvar e carregar modelos
 MODELS_DIR = os.path.join(BASE_DIR, 'models')
 LOGISTIC_REGRESSION_MODEL_NAME = 'logistic_regression_model.joblib'
 RANDOM_FOREST_MODEL_NAME = 'random_forest_model.joblib'
+# Random Forest em arrays planos (.npy) para carregamento com memória mapeada, compartilhado entre processos
+RANDOM_FOREST_ARRAYS_DIR = 'random_forest_arrays'
+FOREST_PREDICT_CHUNK_SIZE = 1024 # Linhas percorridas por vez nas árvores (limita a matriz densa temporária)
+# Pontuador compilado (somente NumPy) exportado a partir do Pipeline da Regressão Logística
+COMPILED_SCORER_NAME = 'logistic_regression_scorer.joblib'
+
+# Esquema de tipos para a ingestão tipada dos dados brutos (reduz o uso de memória)
+TYPED_INGESTION = True
+RAW_DATA_DTYPES = {
+    'home_team': 'category',
+    'away_team': 'category',
+    'tournament': 'category',
+    'city': 'category',
+    'country': 'category',
+    'home_score': 'Int16', # Inteiro compacto que admite placares ausentes (tratados no pré-processamento)
+    'away_score': 'Int16',
+    'neutral': 'bool',
+}
+RAW_DATA_DATE_COLUMNS = ['date']
+
+# Vocabulário global das colunas categóricas (src/vocabulary.py): valor -> código inteiro estável
+VOCABULARY_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'vocabulary.json')
+# Coluna -> espaço de códigos (mandante e visitante compartilham os códigos dos times)
+VOCABULARY_NAMESPACES = {'home_team': 'team', 'away_team': 'team', 'tournament': 'tournament',
+                         'city': 'city', 'country': 'country'}
+# Categorias fixas das colunas categóricas que não vêm do vocabulário
+VOCABULARY_FIXED_CATEGORIES = {'neutral': [False, True], 'is_home_game': [0, 1]}
+
+# Modo streaming: número de linhas lidas e processadas por bloco (limita o pico de memória)
+STREAM_CHUNK_SIZE = 100_000
 
 # URL do dataset bruto no GitHub (se preferir carregar diretamente)
 # Substitua 'SeuUsuario' e 'projeto_futebol_preditivo' pelo seu usuário e nome do repositório
 GITHUB_RAW_DATA_URL = 'https://raw.githubusercontent.com/moises-rb/projeto_futebol_preditivo/main/02_measure/data/raw/results.csv'
 
+# Ratings das seleções (src/ratings.py): Elo e forma recente de cada time antes de cada partida
+RATING_STATE_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'rating_state.npz')
+RATING_INITIAL = 1500.0
+RATING_K_FACTOR = 30.0
+RATING_HOME_ADVANTAGE = 100.0 # Pontos de Elo somados ao mandante quando o jogo não é em campo neutro
+RATING_FORM_WINDOW = 5 # Partidas consideradas na forma recente
+RATING_FORM_DEFAULT = 1.0 # Forma (pontos por partida) de um time sem partidas anteriores
+RATING_FEATURES = ['home_elo', 'away_elo', 'elo_difference', 'home_form', 'away_form']
+
+# Índice de confrontos diretos (src/head_to_head.py): retrospecto entre os dois times antes de cada partida.
+# Estágio opcional de engineer_features; desativado, as colunas não são geradas nem usadas pelo modelo.
+HEAD_TO_HEAD_ENABLED = True
+HEAD_TO_HEAD_INDEX_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'head_to_head_index.npz')
+HEAD_TO_HEAD_FEATURES = ['h2h_matches', 'h2h_home_wins', 'h2h_draws', 'h2h_away_wins', 'h2h_goal_difference']
+_HEAD_TO_HEAD_MODEL_FEATURES = HEAD_TO_HEAD_FEATURES if HEAD_TO_HEAD_ENABLED else []
+
 # Colunas de features e alvo
 FEATURES = ['home_team', 'away_team', 'tournament', 'city', 'country',
             'neutral', 'year', 'month', 'day_of_week', 'is_home_game',
-            'goal_difference', 'total_goals']
+            'goal_difference', 'total_goals'] + RATING_FEATURES + _HEAD_TO_HEAD_MODEL_FEATURES
 TARGET = 'result'
 
-# Colunas para pré-processamento
-NUMERICAL_COLS = ['year', 'month', 'day_of_week', 'goal_difference', 'total_goals']
-CATEGORICAL_COLS = ['home_team', 'away_team', 'tournament', 'city', 'country', 'neutral', 'is_home_game']
+# Colunas para pré-processamento. Os times entram no modelo pelos ratings (poucas colunas numéricas),
+# e não por one-hot de home_team/away_team (centenas de colunas esparsas); os nomes continuam em FEATURES
+# para identificar as partidas e consultar os ratings de partidas futuras.
+NUMERICAL_COLS = (['year', 'month', 'day_of_week', 'goal_difference', 'total_goals'] + RATING_FEATURES
+                  + _HEAD_TO_HEAD_MODEL_FEATURES)
+CATEGORICAL_COLS = ['tournament', 'city', 'country', 'neutral', 'is_home_game']
+
+# Treinamento: processos usados para ajustar os modelos candidatos em paralelo (-1 = todos os CPUs)
+TRAINING_MAX_WORKERS = -1
+
+# Codificação das colunas categóricas (src/categorical_encoding.py): 'onehot', 'ordinal', 'frequency',
+# 'target' ou 'hashing'. Modelos de árvore usam uma codificação compacta (uma coluna por variável) em vez
+# de milhares de colunas de one-hot; modelos fora de MODEL_ENCODINGS usam CATEGORICAL_ENCODING.
+CATEGORICAL_ENCODINGS = ['onehot', 'ordinal', 'frequency', 'target', 'hashing']
+CATEGORICAL_ENCODING = 'onehot'
+MODEL_ENCODINGS = {'Logistic Regression': 'onehot', 'Random Forest': 'ordinal'}
+ENCODING_HASH_FEATURES = 256 # Largura fixa da codificação por hashing
+ENCODING_TARGET_FOLDS = 5 # Dobras do ajuste fora da dobra (cross-fitting) da codificação por alvo
+
+# Busca de hiperparâmetros com successive halving (src/hyperparameter_search.py), na fase Improve com --search.
+# Cada modelo tem uma grade e um recurso que cresce a cada rodada: o número de árvores da floresta ou o
+# número de partidas de treino da Regressão Logística. A cada rodada só 1/SEARCH_HALVING_FACTOR dos
+# candidatos (os melhores na média das dobras) segue para a próxima, com SEARCH_HALVING_FACTOR vezes mais recurso.
+SEARCH_PARAM_GRIDS = {
+    'Logistic Regression': {'C': [0.01, 0.1, 1.0, 10.0], 'class_weight': [None, 'balanced']},
+    'Random Forest': {'max_depth': [None, 16], 'min_samples_leaf': [1, 5], 'max_features': ['sqrt', 0.5]},
+}
+SEARCH_RESOURCES = {'Logistic Regression': 'n_samples', 'Random Forest': 'n_estimators'}
+SEARCH_MIN_RESOURCES = {'n_samples': 3000, 'n_estimators': 20}
+SEARCH_MAX_RESOURCES = {'n_samples': None, 'n_estimators': 180} # None = todas as partidas de treino da dobra
+SEARCH_HALVING_FACTOR = 3
+SEARCH_FOLDS = 3
+SEARCH_METRIC = 'log_loss' # 'log_loss' (menor é melhor) ou 'accuracy'; a acurácia fica perto de 100% com goal_difference
+SEARCH_MAX_WORKERS = -1 # Processos que avaliam as dobras em paralelo (-1 = todos os CPUs)
+SEARCH_RESULTS_PATH = os.path.join(MODELS_DIR, 'search_results.jsonl') # Uma linha por avaliação; permite retomar
+
+# Backtest walk-forward (src/backtesting.py): cada ano a partir de BACKTEST_FIRST_YEAR é previsto por um modelo
+# treinado só com as partidas anteriores a ele (todas, ou as dos últimos BACKTEST_WINDOW_YEARS anos)
+BACKTEST_FIRST_YEAR = 1975
+BACKTEST_WINDOW_YEARS = None # None = janela expansível (todo o histórico anterior); N = janela deslizante de N anos
+# Features conhecidas só após a partida ficam fora do backtest (com elas a acurácia é trivialmente ~100%)
+BACKTEST_EXCLUDE_FEATURES = ['goal_difference', 'total_goals']
+BACKTEST_FOREST_REFRESH = 0.25 # Fração das árvores da floresta substituída a cada período no warm start
+BACKTEST_MAX_WORKERS = -1 # Processos, cada um com um bloco contíguo de períodos (-1 = todos os CPUs)
+BACKTEST_RESULTS_PATH = os.path.join(BASE_DIR, 'reports', 'backtest_metrics.csv')
+
+# Aprendizado online (src/online_learning.py): classificador linear atualizado com partial_fit a cada lote de
+# partidas novas, com snapshots versionados (rollback) em ONLINE_MODEL_DIR
+ONLINE_MODEL_DIR = os.path.join(MODELS_DIR, 'online')
+ONLINE_ALPHA = 1e-4 # Regularização L2 do SGDClassifier
+ONLINE_BOOTSTRAP_EPOCHS = 5 # Passagens sobre o histórico no ajuste inicial
+ONLINE_UPDATE_EPOCHS = 1 # Passagens sobre cada lote novo
+ONLINE_MAX_SNAPSHOTS = 20 # Snapshots mantidos; os mais antigos são removidos (nunca o atual)
+
+# Monitor de drift (src/drift_monitor.py): histogramas incrementais por feature e por classe prevista,
+# comparados com a distribuição de referência do treino
+DRIFT_STATE_PATH = os.path.join(MODELS_DIR, 'drift_state.json')
+DRIFT_ALERTS_PATH = os.path.join(BASE_DIR, 'reports', 'drift_alerts.jsonl')
+DRIFT_EXCLUDE_FEATURES = ['year'] # Cresce com o tempo por construção: sempre se afastaria da referência
+DRIFT_NUM_BINS = 10 # Faixas por feature numérica (quantis da referência)
+DRIFT_TOP_CATEGORIES = 30 # Categorias acompanhadas por feature categórica; as demais vão para 'outros'
+DRIFT_HALF_LIFE = 2000 # Partidas após as quais o peso de uma observação nos histogramas atuais cai à metade
+DRIFT_ACCURACY_WINDOW = 1000 # Últimas partidas com resultado conhecido na acurácia móvel
+DRIFT_MIN_COUNT = 200 # Observações (ponderadas) necessárias antes de avaliar um histograma
+DRIFT_PSI_ALERT = 0.25
+DRIFT_KS_ALERT = 0.15
+DRIFT_ACCURACY_DROP = 0.05 # Queda da acurácia móvel, em relação à da referência, que gera alerta
+DRIFT_EPSILON = 1e-4 # Proporção mínima por faixa no PSI (evita log de zero)
+
+# Serviço local de previsões (src/prediction_service.py)
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+SERVICE_MAX_BATCH_SIZE = 256 # Máximo de partidas pontuadas numa única chamada ao modelo
+SERVICE_MAX_WAIT_MS = 2 # Tempo máximo que a primeira requisição de um lote espera por outras
+SERVICE_LATENCY_WINDOW = 10_000 # Requisições recentes consideradas no cálculo de p50/p99
+
+# Pontuação em massa de arquivos de partidas (src/bulk_scoring.py)
+BULK_SCORING_CHUNK_SIZE = 50_000 # Partidas por bloco enviado a cada processo
+BULK_SCORING_MAX_WORKERS = None # Processos de pontuação (None = número de CPUs)
+BULK_SCORING_ID_COLUMNS = ['date', 'home_team', 'away_team'] # Copiadas da entrada para a saída, se existirem
+
+# Modo relatório (headless): figuras salvas em arquivo e estatísticas em JSON
+REPORT_DIR = os.path.join(BASE_DIR, 'reports')
+REPORT_MAX_PLOT_ROWS = 50_000 # Acima disso, histogramas e boxplots usam uma amostra aleatória
+REPORT_MAX_WORKERS = None # Processos para renderizar as figuras (None = número de CPUs)
+REPORT_FIGURE_DPI = 100
+
+# Instrumentação dos estágios (src/profiling.py): tempo, CPU, pico de memória e linhas por estágio
+PROFILE_TRACE_PATH = os.path.join(REPORT_DIR, 'trace.jsonl') # Um registro JSON por chamada de estágio (anexado)
+PROFILE_FOLDED_PATH = os.path.join(REPORT_DIR, 'profile.folded') # Pilhas agregadas (flame graph), com --profile
+PROFILE_SAMPLE_INTERVAL = 0.005 # Segundos entre amostras de memória (e de pilhas, com o perfil ativado)
 
 # Parâmetros de simulação para novos dados
 NUM_SIMULATED_GAMES = 5
+SIMULATION_RECENT_YEARS = 4 # Os jogos simulados seguem as frequências dos últimos N anos do histórico
+
+# Gerador de partidas sintéticas (src/synthetic_data.py), para testes de carga e de escala
+SYNTHETIC_DATA_PATH = os.path.join(BASE_DIR, 'data', 'synthetic', 'synthetic_matches.parquet')
+SYNTHETIC_CHUNK_SIZE = 1_000_000 # Partidas geradas e gravadas por bloco
+SYNTHETIC_RANDOM_SEED = 42
+
+# Simulação de Monte Carlo de torneios (src/tournament_simulation.py)
+SIMULATION_NUM_TOURNAMENTS = 100_000
+SIMULATION_BATCH_SIZE = 100_000 # Torneios simulados juntos em cada lote de operações de arrays
+SIMULATION_RANDOM_SEED = 42
+# Valores das features de data que a definição do torneio não informa. As features conhecidas só após a
+# partida (BACKTEST_EXCLUDE_FEATURES) não são inventadas: o modelo da simulação é treinado sem elas
+SIMULATION_FEATURE_DEFAULTS = {'year': 2024, 'month': 6, 'day_of_week': 5}
+# Amplitude mínima das probabilidades de vitória entre os confrontos; abaixo dela o modelo não distingue os times
+SIMULATION_MIN_PROBABILITY_SPREAD = 0.01
+
+# Cache de estágios (Measure/Analyze), endereçado pelo conteúdo dos dados de entrada
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
+CACHE_MAX_BYTES = 512 * 1024 * 1024 # Tamanho máximo do cache; entradas menos usadas recentemente são removidas
+CACHE_STAGES = ['measure', 'analyze']
+# Configurações de config.py que influenciam a saída de cada estágio e, portanto, fazem parte da chave
+CACHE_STAGE_SETTINGS = {
+    'measure': ['TARGET', 'TYPED_INGESTION', 'RAW_DATA_DTYPES', 'RAW_DATA_DATE_COLUMNS'],
+    'analyze': ['FEATURES', 'NUMERICAL_COLS', 'CATEGORICAL_COLS', 'RATING_INITIAL', 'RATING_K_FACTOR',
+                'RATING_HOME_ADVANTAGE', 'RATING_FORM_WINDOW', 'RATING_FORM_DEFAULT', 'HEAD_TO_HEAD_ENABLED'],
+    # Matrizes das dobras da busca de hiperparâmetros (uma entrada por codificação categórica)
+    'search': ['FEATURES', 'NUMERICAL_COLS', 'CATEGORICAL_COLS', 'SEARCH_FOLDS', 'ENCODING_HASH_FEATURES',
+               'ENCODING_TARGET_FOLDS'],
+}
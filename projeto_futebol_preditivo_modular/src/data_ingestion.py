@@ -1,32 +1,42 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
-from src.config import RAW_DATA_PATH, GITHUB_RAW_DATA_URL
+from pandas.api.types import union_categoricals
+from src.config import (RAW_DATA_PATH, GITHUB_RAW_DATA_URL, DATA_STORAGE_FORMAT, TYPED_INGESTION,
+                        RAW_DATA_DTYPES, RAW_DATA_DATE_COLUMNS, STREAM_CHUNK_SIZE)
+from src.profiling import traced
 
-def load_raw_data(from_url=False):
+@traced('Measure')
+def load_raw_data(from_url=False, typed=TYPED_INGESTION, report_memory=False):
     """
     Carrega o dataset bruto de resultados de futebol.
     Pode carregar de uma URL do GitHub ou de um caminho de arquivo local.
+    - typed: aplica o esquema RAW_DATA_DTYPES/RAW_DATA_DATE_COLUMNS de config.py já na leitura
+      (categóricas para textos de baixa cardinalidade, inteiros compactos, booleano e datas).
+    - report_memory: imprime o uso de memória por coluna antes e depois da tipagem.
     """
     if from_url:
         print(f"Tentando carregar dados da URL: {GITHUB_RAW_DATA_URL}")
         try:
-            df = pd.read_csv(GITHUB_RAW_DATA_URL)
+            df = read_raw_csv(GITHUB_RAW_DATA_URL, typed, report_memory)
             print("Dataset carregado com sucesso da URL!")
             return df
         except Exception as e:
             print(f"Erro ao carregar dados da URL: {e}")
             print("Tentando carregar do caminho local como fallback...")
-            return _load_local_raw_data()
+            return _load_local_raw_data(typed, report_memory)
     else:
-        return _load_local_raw_data()
+        return _load_local_raw_data(typed, report_memory)
 
-def _load_local_raw_data():
+def _load_local_raw_data(typed=TYPED_INGESTION, report_memory=False):
     """
     Função auxiliar para carregar o dataset bruto de um caminho local.
     """
     print(f"Tentando carregar dados do caminho local: {RAW_DATA_PATH}")
     try:
-        df = pd.read_csv(RAW_DATA_PATH)
+        df = read_raw_csv(RAW_DATA_PATH, typed, report_memory)
         print("Dataset carregado com sucesso do caminho local!")
         return df
     except FileNotFoundError:
@@ -37,21 +47,263 @@ def _load_local_raw_data():
         print(f"Ocorreu um erro ao carregar o arquivo local: {e}")
         return None
 
-def save_data(df, path):
+def read_raw_csv(source, typed=TYPED_INGESTION, report_memory=False, **read_kwargs):
     """
-    Salva um DataFrame em um arquivo CSV, criando o diretório se não existir.
+    Lê o CSV bruto, com ou sem o esquema de tipos.
+    Para o relatório de memória, o arquivo é lido uma única vez sem tipos e convertido em seguida;
+    sem relatório, as categóricas são aplicadas diretamente pelo leitor, sem materializar as colunas de texto,
+    e os placares e neutral são convertidos em seguida (coerce_raw_columns), tolerando células malformadas.
+    Argumentos extras (ex.: names, header) são repassados para pd.read_csv.
     """
+    if not typed:
+        return pd.read_csv(source, **read_kwargs)
+    if report_memory:
+        df_untyped = pd.read_csv(source, **read_kwargs)
+        df = apply_raw_schema(df_untyped)
+        print_memory_report(df_untyped, df)
+        return df
+    df = pd.read_csv(source, dtype=_reader_dtypes(), parse_dates=RAW_DATA_DATE_COLUMNS, **read_kwargs)
+    return coerce_raw_columns(df)
+
+# Tipos aplicados só depois da leitura: com eles no leitor, uma única célula malformada (ex.: um placar
+# 'x' ou um neutral vazio) abortaria a leitura do arquivo inteiro
+_COERCED_DTYPES = ('Int16', 'bool')
+
+def _reader_dtypes():
+    """
+    Tipos de RAW_DATA_DTYPES que o leitor aplica diretamente (as categóricas).
+    """
+    return {col: dtype for col, dtype in RAW_DATA_DTYPES.items() if dtype not in _COERCED_DTYPES}
+
+def coerce_raw_columns(df):
+    """
+    Converte os placares e neutral, lidos sem tipo fixo, para os tipos de RAW_DATA_DTYPES: placares
+    inválidos (texto, frações, fora da faixa do inteiro) viram ausentes, tratados no pré-processamento;
+    um neutral que não seja verdadeiro/falso vira False (partida com mando de campo).
+    """
+    conversions = {}
+    for col, dtype in RAW_DATA_DTYPES.items():
+        if col not in df.columns or dtype not in _COERCED_DTYPES or df[col].dtype == dtype:
+            continue
+        if dtype == 'bool':
+            if pd.api.types.is_bool_dtype(df[col]):
+                conversions[col] = df[col].astype(bool)
+            else:
+                text = df[col].astype(str).str.strip().str.lower()
+                flags = text.map({'true': True, 'false': False, '1': True, '0': False})
+                conversions[col] = flags.fillna(False).astype(bool)
+        else:
+            limits = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+            numbers = pd.to_numeric(df[col], errors='coerce')
+            valid = (numbers == numbers.round()) & numbers.between(limits.min, limits.max)
+            conversions[col] = numbers.where(valid).astype(dtype)
+    return df.assign(**conversions) if conversions else df
+
+def iter_raw_data_chunks(chunk_size=STREAM_CHUNK_SIZE, path=RAW_DATA_PATH, typed=TYPED_INGESTION):
+    """
+    Lê o dataset bruto em blocos de tamanho fixo, sem carregar o arquivo inteiro na memória.
+    Cada bloco é um DataFrame com o mesmo esquema de load_raw_data.
+    """
+    read_kwargs = {'dtype': _reader_dtypes(), 'parse_dates': RAW_DATA_DATE_COLUMNS} if typed else {}
+    with pd.read_csv(path, chunksize=chunk_size, **read_kwargs) as reader:
+        for chunk in reader:
+            yield coerce_raw_columns(chunk) if typed else chunk
+
+def apply_raw_schema(df):
+    """
+    Converte um DataFrame bruto sem tipos para o esquema definido em config.py.
+    """
+    dtypes = {col: dtype for col, dtype in _reader_dtypes().items() if col in df.columns}
+    df = coerce_raw_columns(df.astype(dtypes))
+    for col in RAW_DATA_DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+def memory_footprint(df):
+    """
+    Retorna o uso de memória (em bytes) de cada coluna, contando o conteúdo real das strings.
+    """
+    return df.memory_usage(deep=True, index=False)
+
+def print_memory_report(df_before, df_after):
+    """
+    Imprime o uso de memória por coluna antes e depois da conversão de tipos.
+    """
+    report = pd.DataFrame({
+        'tipo_antes': df_before.dtypes.astype(str),
+        'MB_antes': memory_footprint(df_before) / 1024 ** 2,
+        'tipo_depois': df_after.dtypes.astype(str),
+        'MB_depois': memory_footprint(df_after) / 1024 ** 2,
+    })
+    report['reducao_%'] = 100 * (1 - report['MB_depois'] / report['MB_antes'])
+    total_before = report['MB_antes'].sum()
+    total_after = report['MB_depois'].sum()
+
+    print("\n--- Uso de Memória por Coluna (antes/depois da tipagem) ---")
+    print(report.round(3).to_string())
+    print(f"Total: {total_before:.2f} MB -> {total_after:.2f} MB ({100 * (1 - total_after / total_before):.1f}% de redução)")
+
+def _save_csv(df, path):
+    df.to_csv(path, index=False)
+
+def _load_csv(path, columns=None):
+    return pd.read_csv(path, usecols=columns)
+
+def _save_parquet(df, path):
+    # Parquet preserva os tipos (categóricas, datetime, inteiros) e permite ler apenas algumas colunas
+    df.to_parquet(path, index=False)
+
+def _load_parquet(path, columns=None):
+    return pd.read_parquet(path, columns=columns)
+
+# Backends de armazenamento disponíveis: formato -> (função de escrita, função de leitura)
+STORAGE_BACKENDS = {
+    'csv': (_save_csv, _load_csv),
+    'parquet': (_save_parquet, _load_parquet),
+}
+
+def register_storage_backend(fmt, save_func, load_func):
+    """
+    Registra um novo backend de armazenamento para save_data/load_data.
+    - save_func(df, path) grava o DataFrame.
+    - load_func(path, columns=None) lê o DataFrame, opcionalmente apenas as colunas informadas.
+    """
+    STORAGE_BACKENDS[fmt] = (save_func, load_func)
+
+def _resolve_storage_format(path, fmt):
+    """
+    Usa o formato informado ou, na ausência dele, infere pela extensão do arquivo.
+    """
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip('.').lower() or DATA_STORAGE_FORMAT
+    if fmt not in STORAGE_BACKENDS:
+        raise ValueError(f"Formato de armazenamento desconhecido: '{fmt}'. Disponíveis: {sorted(STORAGE_BACKENDS)}")
+    return fmt
+
+def save_data(df, path, fmt=None):
+    """
+    Salva um DataFrame no formato indicado (ou inferido pela extensão do arquivo),
+    criando o diretório se não existir.
+    """
+    fmt = _resolve_storage_format(path, fmt)
     output_dir = os.path.dirname(path)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         print(f"Diretório '{output_dir}' criado com sucesso.")
     
-    df.to_csv(path, index=False)
+    save_func, _ = STORAGE_BACKENDS[fmt]
+    save_func(df, path)
     print(f"Dados salvos com sucesso em: {path}")
 
+def load_data(path, columns=None, fmt=None):
+    """
+    Carrega um DataFrame salvo por save_data, no formato indicado (ou inferido pela extensão do arquivo).
+    - columns: lista opcional de colunas a carregar (no Parquet, as demais colunas nem são lidas do disco).
+    """
+    fmt = _resolve_storage_format(path, fmt)
+    _, load_func = STORAGE_BACKENDS[fmt]
+    return load_func(path, columns=columns)
+
+def iter_data_chunks(path, chunk_size=STREAM_CHUNK_SIZE, columns=None, fmt=None):
+    """
+    Lê um arquivo salvo em 'parquet' ou 'csv' em blocos de até chunk_size linhas, sem carregá-lo inteiro.
+    - columns: lista opcional de colunas a ler.
+    """
+    fmt = _resolve_storage_format(path, fmt)
+    if fmt == 'parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == 'csv':
+        with pd.read_csv(path, chunksize=chunk_size, usecols=columns) as reader:
+            for chunk in reader:
+                yield chunk
+    else:
+        raise ValueError(f"Leitura em blocos não suportada para o formato '{fmt}'.")
+
+def concat_preserving_categories(frames):
+    """
+    Concatena DataFrames com as mesmas colunas mantendo as colunas categóricas como categóricas
+    (pd.concat converteria para texto quando os conjuntos de categorias diferem).
+    """
+    frames = list(frames)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([frame[col].astype('category') for frame in frames]).categories
+            frames = [frame.assign(**{col: frame[col].astype(pd.CategoricalDtype(categories))}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+class ChunkedDataWriter:
+    """
+    Grava um DataFrame bloco a bloco no armazenamento de dados processados ('parquet' ou 'csv'),
+    mantendo em memória apenas o bloco corrente.
+    Os blocos vão para um arquivo temporário (path + '.tmp'), que só substitui path ao fechar sem erro
+    (saída limpa do bloco with): uma execução interrompida não apaga nem corrompe o arquivo anterior.
+    """
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = _resolve_storage_format(path, fmt)
+        if self.fmt not in ('parquet', 'csv'):
+            raise ValueError(f"Gravação em blocos não suportada para o formato '{self.fmt}'.")
+        self.rows_written = 0
+        self._tmp_path = path + '.tmp'
+        self._parquet_writer = None
+        self._schema = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path) # Sobra de uma execução interrompida
+
+    def write(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self._tmp_path, mode='a', header=self.rows_written == 0, index=False)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                # Cada bloco tem seu próprio conjunto de categorias; índices int32 comportam a união de todos eles
+                fields = [pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+                          if pa.types.is_dictionary(f.type) else f for f in table.schema]
+                self._schema = pa.schema(fields, metadata=table.schema.metadata)
+                self._parquet_writer = pq.ParquetWriter(self._tmp_path, self._schema)
+            self._parquet_writer.write_table(table.cast(self._schema))
+        self.rows_written += len(df)
+
+    def _close_writer(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def close(self):
+        """
+        Conclui a gravação: o arquivo temporário substitui path (sem nenhum bloco, path é removido).
+        """
+        self._close_writer()
+        if os.path.exists(self._tmp_path):
+            os.replace(self._tmp_path, self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        print(f"{self.rows_written} linhas gravadas em blocos em: {self.path}")
+
+    def discard(self):
+        """
+        Abandona a gravação: remove o arquivo temporário e mantém path como estava.
+        """
+        self._close_writer()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
 if __name__ == '__main__':
     # Exemplo de uso
-    df_raw = load_raw_data(from_url=False) # Tente carregar do local primeiro
+    df_raw = load_raw_data(from_url=False, report_memory=True) # Tente carregar do local primeiro
     if df_raw is not None:
         print("\nPrimeiras 5 linhas do DataFrame bruto:")
         print(df_raw.head())
@@ -2,45 +2,73 @@
 
 import pandas as pd
 import numpy as np
+from src.profiling import traced
 
-def preprocess_data(df):
+# Rótulos indexados por sinal(home_score - away_score) + 1
+MATCH_RESULT_LABELS = np.array(['Away Win', 'Draw', 'Home Win'], dtype=object)
+
+def compute_match_result(home_score, away_score):
+    """
+    Calcula o resultado de cada partida ('Home Win', 'Away Win' ou 'Draw') de forma vetorizada.
+    Equivale a aplicar a comparação linha a linha, mas opera sobre os arrays inteiros. O resultado é
+    categórico (um código de 1 byte por partida em vez de um texto), com as categorias de MATCH_RESULT_LABELS.
+    """
+    goal_difference = np.asarray(home_score) - np.asarray(away_score)
+    return pd.Series(pd.Categorical.from_codes(np.sign(goal_difference) + 1, categories=MATCH_RESULT_LABELS),
+                     index=home_score.index)
+
+def to_score(scores):
+    """
+    Converte uma coluna de placares para inteiro, preenchendo valores ausentes ou inválidos com 0.
+    Colunas já inteiras (ex.: 'Int16' da ingestão tipada) mantêm a largura compacta.
+    """
+    if pd.api.types.is_integer_dtype(scores):
+        return scores.fillna(0).astype(getattr(scores.dtype, 'numpy_dtype', scores.dtype))
+    return pd.to_numeric(scores, errors='coerce').fillna(0).astype(int)
+
+@traced('Measure')
+def preprocess_data(df, verbose=True, vocabulary=None):
     """
     Realiza as etapas iniciais de limpeza e pré-processamento dos dados.
     - Trata valores ausentes (se houver).
     - Cria a variável alvo 'result'.
+    - verbose: imprime o diagnóstico de cada etapa (desativado no modo streaming, chamado por bloco).
+    - vocabulary: Vocabulary (src/vocabulary.py) estendido com os valores novos de df e aplicado às
+      colunas categóricas, que passam a usar os códigos estáveis do vocabulário.
+    Não modifica o DataFrame de entrada: retorna um novo DataFrame que compartilha (Copy-on-Write)
+    as colunas não alteradas com a entrada.
     """
     if df is None:
         print("DataFrame de entrada é None. Não é possível pré-processar.")
         return None
 
-    print("\n--- Iniciando Pré-processamento de Dados ---")
-    print("Verificando valores ausentes antes do pré-processamento:")
-    print(df.isnull().sum())
+    if verbose:
+        print("\n--- Iniciando Pré-processamento de Dados ---")
+        print("Verificando valores ausentes antes do pré-processamento:")
+        print(df.isnull().sum())
+
+    if vocabulary is not None:
+        vocabulary.extend(df)
+        df = vocabulary.apply(df)
 
     # Converter colunas de score para numérico, tratando possíveis erros
-    df['home_score'] = pd.to_numeric(df['home_score'], errors='coerce').fillna(0).astype(int)
-    df['away_score'] = pd.to_numeric(df['away_score'], errors='coerce').fillna(0).astype(int)
+    home_score = to_score(df['home_score'])
+    away_score = to_score(df['away_score'])
 
     # Tratar valores ausentes (ex: preencher com 0 ou remover linhas)
     # Para este dataset, scores não devem ter NaN, mas é uma boa prática.
     # Outras colunas como 'city' ou 'country' podem ter NaNs, mas OneHotEncoder lida com 'handle_unknown'.
     # df.dropna(subset=['home_score', 'away_score'], inplace=True) # Exemplo: remover se scores forem NaN
 
-    # Criar a variável 'result' (variável alvo)
-    def get_match_result(row):
-        if row['home_score'] > row['away_score']:
-            return 'Home Win'
-        elif row['home_score'] < row['away_score']:
-            return 'Away Win'
-        else:
-            return 'Draw'
-
-    df['result'] = df.apply(get_match_result, axis=1)
-    print("\nVariável 'result' criada com sucesso!")
-    print("Contagem de cada tipo de resultado:")
-    print(df['result'].value_counts())
-
-    print("Pré-processamento de dados concluído.")
+    # Criar a variável 'result' (variável alvo) com operações vetorizadas sobre as colunas
+    df = df.assign(home_score=home_score, away_score=away_score,
+                   result=compute_match_result(home_score, away_score))
+    if verbose:
+        print("\nVariável 'result' criada com sucesso!")
+        print("Contagem de cada tipo de resultado:")
+        print(df['result'].value_counts())
+
+        print("Pré-processamento de dados concluído.")
     return df
 
 if __name__ == '__main__':
@@ -50,7 +78,7 @@ if __name__ == '__main__':
 
     df_raw = load_raw_data(from_url=False)
     if df_raw is not None:
-        df_cleaned = preprocess_data(df_raw.copy()) # Passa uma cópia para não modificar o original
+        df_cleaned = preprocess_data(df_raw)
         if df_cleaned is not None:
             print("\nPrimeiras 5 linhas do DataFrame pré-processado:")
             print(df_cleaned.head())
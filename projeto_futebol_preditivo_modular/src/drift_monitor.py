@@ -0,0 +1,241 @@
+# src/drift_monitor.py
+#
+# Monitor de drift da fase Control: compara as partidas que chegam com a distribuição de referência do
+# treino, sem reprocessar o histórico.
+# - Histogramas fixos, definidos na referência: faixas de quantis para as features numéricas (mais uma
+#   faixa para ausentes) e as DRIFT_TOP_CATEGORIES categorias mais frequentes para as categóricas (as
+#   demais, e as desconhecidas, vão para 'outros'); mais um histograma da classe prevista.
+# - Cada lote soma as suas contagens aos histogramas atuais em O(tamanho do lote). As contagens anteriores
+#   decaem com meia-vida de DRIFT_HALF_LIFE partidas, então os histogramas refletem o período recente.
+# - Scores: PSI (todas as features) e KS sobre as faixas (numéricas), e acurácia móvel das últimas
+#   DRIFT_ACCURACY_WINDOW partidas com resultado conhecido, comparada com a acurácia na referência.
+# - Alertas: ao cruzar um limite (DRIFT_PSI_ALERT, DRIFT_KS_ALERT, DRIFT_ACCURACY_DROP), o alerta é impresso
+#   e gravado em DRIFT_ALERTS_PATH (JSONL); só volta a ser emitido depois de o score voltar ao normal.
+# O estado (referência, histogramas atuais e alertas ativos) é persistido em JSON entre execuções.
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m src.drift_monitor status
+#     python -m src.drift_monitor reset
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.config import (FEATURES, TARGET, NUMERICAL_COLS, DRIFT_STATE_PATH, DRIFT_ALERTS_PATH,
+                        DRIFT_EXCLUDE_FEATURES, DRIFT_NUM_BINS, DRIFT_TOP_CATEGORIES, DRIFT_HALF_LIFE, DRIFT_ACCURACY_WINDOW,
+                        DRIFT_MIN_COUNT, DRIFT_PSI_ALERT, DRIFT_KS_ALERT, DRIFT_ACCURACY_DROP, DRIFT_EPSILON)
+from src.categorical_encoding import _category_positions
+
+PREDICTED_CLASS = 'predicted_class'
+
+def population_stability_index(reference, current):
+    """
+    PSI entre dois histogramas com as mesmas faixas.
+    """
+    p = np.maximum(reference / reference.sum(), DRIFT_EPSILON)
+    q = np.maximum(current / current.sum(), DRIFT_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+def binned_ks(reference, current):
+    """
+    Estatística KS calculada sobre as faixas: maior distância entre as distribuições acumuladas.
+    """
+    return float(np.abs(np.cumsum(reference / reference.sum()) - np.cumsum(current / current.sum())).max())
+
+class DriftMonitor:
+    """
+    Histogramas de referência e atuais por feature (numéricas: bordas das faixas em edges; categóricas:
+    categorias acompanhadas em categories) e por classe prevista, com a acurácia móvel.
+    Crie com DriftMonitor.from_reference e atualize com update a cada lote.
+    """
+
+    def __init__(self, edges, categories, reference, reference_accuracy=None, current=None,
+                 correct=None, position=0, rows_seen=0, active_alerts=()):
+        self.edges = {col: np.asarray(values, dtype=np.float64) for col, values in edges.items()}
+        self.categories = {name: list(values) for name, values in categories.items()}
+        self.reference = {name: np.asarray(counts, dtype=np.float64) for name, counts in reference.items()}
+        self.reference_accuracy = reference_accuracy
+        self.current = ({name: np.asarray(counts, dtype=np.float64) for name, counts in current.items()}
+                        if current is not None else {name: np.zeros_like(counts) for name, counts in self.reference.items()})
+        # Janela circular da acurácia móvel: 1 acerto, 0 erro, -1 posição ainda vazia
+        self.correct = (np.asarray(correct, dtype=np.int8) if correct is not None
+                        else np.full(DRIFT_ACCURACY_WINDOW, -1, dtype=np.int8))
+        self.position = position
+        self.rows_seen = rows_seen
+        self.active_alerts = set(active_alerts)
+
+    @classmethod
+    def from_reference(cls, X, predictions, labels=None):
+        """
+        Cria o monitor a partir dos dados de treino (colunas de FEATURES), das previsões do modelo para eles e,
+        se informados, dos resultados reais (para a acurácia de referência).
+        """
+        monitored = [col for col in FEATURES if col not in DRIFT_EXCLUDE_FEATURES]
+        edges, categories = {}, {}
+        for col in monitored:
+            if col in NUMERICAL_COLS:
+                values = X[col].to_numpy(dtype=np.float64)
+                quantiles = np.linspace(0, 1, DRIFT_NUM_BINS + 1)[1:-1]
+                edges[col] = np.unique(np.nanquantile(values, quantiles))
+            else:
+                categories[col] = X[col].value_counts().head(DRIFT_TOP_CATEGORIES).index.tolist()
+        categories[PREDICTED_CLASS] = sorted(pd.unique(np.asarray(predictions)).tolist())
+        monitor = cls(edges, categories, reference={})
+        monitor.reference = monitor._histograms(X, predictions)
+        monitor.current = {name: np.zeros_like(counts) for name, counts in monitor.reference.items()}
+        if labels is not None:
+            monitor.reference_accuracy = float(np.mean(np.asarray(predictions) == np.asarray(labels)))
+        return monitor
+
+    def _histograms(self, X, predictions):
+        """
+        Contagens do lote em cada histograma, em O(tamanho do lote).
+        """
+        histograms = {}
+        for col, edges in self.edges.items():
+            values = X[col].to_numpy(dtype=np.float64)
+            # Faixas 0..len(edges) pelos quantis; a última posição conta os ausentes
+            bins = np.where(np.isnan(values), len(edges) + 1, np.searchsorted(edges, values, side='right'))
+            histograms[col] = np.bincount(bins, minlength=len(edges) + 2).astype(np.float64)
+        for name, categories in self.categories.items():
+            values = pd.Series(np.asarray(predictions)) if name == PREDICTED_CLASS else X[name]
+            positions = _category_positions(values, categories)
+            positions = np.where(positions < 0, len(categories), positions) # 'outros'
+            histograms[name] = np.bincount(positions, minlength=len(categories) + 1).astype(np.float64)
+        return histograms
+
+    def update(self, X, predictions, labels=None):
+        """
+        Acrescenta um lote (features, previsões e, se conhecidos, os resultados reais) aos histogramas atuais
+        e à acurácia móvel, e retorna os alertas que passaram a valer com ele.
+        """
+        decay = 0.5 ** (len(X) / DRIFT_HALF_LIFE)
+        for name, counts in self._histograms(X, predictions).items():
+            self.current[name] = self.current[name] * decay + counts
+        if labels is not None:
+            hits = (np.asarray(predictions) == np.asarray(labels)).astype(np.int8)[-len(self.correct):]
+            slots = (self.position + np.arange(len(hits))) % len(self.correct)
+            self.correct[slots] = hits
+            self.position = int((self.position + len(hits)) % len(self.correct))
+        self.rows_seen += len(X)
+        return self._check_alerts()
+
+    def rolling_accuracy(self):
+        filled = self.correct[self.correct >= 0]
+        return (float(filled.mean()) if len(filled) else None), len(filled)
+
+    def scores(self):
+        """
+        PSI e KS de cada histograma (None enquanto o histograma atual tiver menos de DRIFT_MIN_COUNT observações).
+        """
+        scores = {}
+        for name, reference in self.reference.items():
+            current = self.current[name]
+            if current.sum() < DRIFT_MIN_COUNT:
+                scores[name] = {'psi': None, 'ks': None, 'count': float(current.sum())}
+                continue
+            scores[name] = {'psi': population_stability_index(reference, current),
+                            'ks': binned_ks(reference, current) if name in self.edges else None,
+                            'count': float(current.sum())}
+        return scores
+
+    def _check_alerts(self):
+        breaches = {}
+        for name, score in self.scores().items():
+            if score['psi'] is not None and score['psi'] > DRIFT_PSI_ALERT:
+                breaches[f'{name}:psi'] = (name, 'psi', score['psi'], DRIFT_PSI_ALERT)
+            if score['ks'] is not None and score['ks'] > DRIFT_KS_ALERT:
+                breaches[f'{name}:ks'] = (name, 'ks', score['ks'], DRIFT_KS_ALERT)
+        accuracy, count = self.rolling_accuracy()
+        if self.reference_accuracy is not None and accuracy is not None and count >= DRIFT_MIN_COUNT:
+            limit = self.reference_accuracy - DRIFT_ACCURACY_DROP
+            if accuracy < limit:
+                breaches['accuracy'] = ('accuracy', 'rolling_accuracy', accuracy, limit)
+        new_alerts = [{'feature': feature, 'metric': metric, 'value': value, 'threshold': threshold,
+                       'rows_seen': self.rows_seen}
+                      for key, (feature, metric, value, threshold) in breaches.items() if key not in self.active_alerts]
+        # Alertas que voltaram ao normal podem disparar de novo num cruzamento futuro
+        self.active_alerts = set(breaches)
+        return new_alerts
+
+    def to_state(self):
+        return {'edges': {col: edges.tolist() for col, edges in self.edges.items()},
+                'categories': self.categories,
+                'reference': {name: counts.tolist() for name, counts in self.reference.items()},
+                'reference_accuracy': self.reference_accuracy,
+                'current': {name: counts.tolist() for name, counts in self.current.items()},
+                'correct': self.correct.tolist(), 'position': self.position, 'rows_seen': self.rows_seen,
+                'active_alerts': sorted(self.active_alerts)}
+
+    def save(self, path=DRIFT_STATE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.to_state(), f, ensure_ascii=False)
+        os.replace(f'{path}.tmp', path)
+        return path
+
+    def print_summary(self, top=10):
+        accuracy, count = self.rolling_accuracy()
+        reference = f"{self.reference_accuracy:.4f}" if self.reference_accuracy is not None else '-'
+        print(f"Monitor de drift: {self.rows_seen} partidas acompanhadas | acurácia móvel: "
+              f"{f'{accuracy:.4f}' if accuracy is not None else '-'} em {count} partidas (referência: {reference})")
+        scores = pd.DataFrame(self.scores()).T.dropna(subset=['psi'])
+        if scores.empty:
+            print(f"Observações insuficientes para os scores de drift (mínimo: {DRIFT_MIN_COUNT}).")
+            return
+        print(scores.sort_values('psi', ascending=False).head(top).to_string(
+            float_format=lambda value: f'{value:.4f}'))
+
+def load_drift_monitor(path=DRIFT_STATE_PATH):
+    """
+    Carrega o monitor salvo, ou None se ele ainda não existir.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return DriftMonitor(**json.load(f))
+
+def build_drift_monitor(model, df, path=DRIFT_STATE_PATH):
+    """
+    Cria (ou recria, após um novo treino) o monitor com df como referência e as previsões do modelo para ele.
+    """
+    monitor = DriftMonitor.from_reference(df[FEATURES], model.predict(df[FEATURES]), df[TARGET])
+    if path is not None:
+        monitor.save(path)
+        print(f"Referência do monitor de drift criada com {len(df)} partidas e salva em: {path}")
+    return monitor
+
+def log_alerts(alerts, path=DRIFT_ALERTS_PATH):
+    """
+    Imprime os alertas e os acrescenta ao arquivo de alertas (JSONL).
+    """
+    if not alerts:
+        return
+    created = pd.Timestamp.now().isoformat(timespec='seconds')
+    for alert in alerts:
+        print(f"ALERTA de drift: {alert['feature']} ({alert['metric']} = {alert['value']:.4f}, "
+              f"limite {alert['threshold']:.4f})")
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps({'created': created, **alert}, ensure_ascii=False) + '\n')
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estado do monitor de drift.")
+    parser.add_argument('command', choices=['status', 'reset'])
+    parser.add_argument('--state', default=DRIFT_STATE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'reset':
+        if os.path.exists(args.state):
+            os.remove(args.state)
+        print("Estado do monitor de drift removido; a referência será recriada na próxima execução.")
+    else:
+        monitor = load_drift_monitor(args.state)
+        if monitor is None:
+            print("Monitor de drift ainda não criado.")
+        else:
+            monitor.print_summary()
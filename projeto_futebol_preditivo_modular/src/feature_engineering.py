@@ -2,110 +2,160 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import ttest_ind
+from src.reporting import show_figure, downsample_for_plot
+from src.config import HEAD_TO_HEAD_ENABLED
+from src.ratings import RatingEngine
+from src.head_to_head import HeadToHeadIndex
+from src.profiling import traced
 
-def engineer_features(df):
+def compute_is_home_game(neutral):
+    """
+    Retorna 1 para jogos com mando de campo (neutral == False) e 0 caso contrário, de forma vetorizada (int8).
+    """
+    return pd.Series(np.where(neutral == False, 1, 0).astype(np.int8), index=neutral.index)
+
+@traced('Analyze')
+def engineer_features(df, verbose=True, ratings=None, head_to_head=None):
     """
     Cria features avançadas a partir do DataFrame pré-processado.
     - Extrai ano, mês, dia da semana da data.
     - Cria 'is_home_game', 'goal_difference', 'total_goals'.
+    - Cria os ratings de antes de cada partida (RATING_FEATURES: Elo e forma recente dos dois times).
+    - verbose: imprime o progresso (desativado no modo streaming, chamado por bloco).
+    - ratings: RatingEngine com o estado das partidas anteriores a df (atualizado com as partidas de df).
+      Se None, os ratings partem do zero, como para o histórico completo.
+    - head_to_head: HeadToHeadIndex com as partidas anteriores a df, para o retrospecto dos confrontos
+      diretos (HEAD_TO_HEAD_FEATURES, apenas com HEAD_TO_HEAD_ENABLED). Se None, parte de um índice vazio.
+    Não modifica o DataFrame de entrada: retorna um novo DataFrame que compartilha (Copy-on-Write)
+    as colunas não alteradas com a entrada.
     """
     if df is None:
         print("DataFrame de entrada é None. Não é possível engenheirar features.")
         return None
 
-    print("\n--- Iniciando Engenharia de Features Avançada ---")
+    if verbose:
+        print("\n--- Iniciando Engenharia de Features Avançada ---")
+
+    # Converter a coluna 'date' para o formato datetime (sem cópia se a ingestão tipada já a converteu)
+    date = df['date'] if pd.api.types.is_datetime64_dtype(df['date']) else pd.to_datetime(df['date'])
+
+    df = df.assign(
+        date=date,
+        # Criando features baseadas na data, com inteiros compactos
+        year=date.dt.year.astype(np.int16),
+        month=date.dt.month.astype(np.int8),
+        day_of_week=date.dt.dayofweek.astype(np.int8), # Segunda-feira=0, Domingo=6
+        # Criando feature de vantagem de jogar em casa (1 se não é neutro, 0 caso contrário)
+        is_home_game=compute_is_home_game(df['neutral']),
+        # Feature: Diferença de gols
+        goal_difference=df['home_score'] - df['away_score'],
+        # Feature: Total de gols no jogo
+        total_goals=df['home_score'] + df['away_score'],
+    )
+    if ratings is None:
+        ratings = RatingEngine()
+    df = df.join(ratings.update(df))
+    if HEAD_TO_HEAD_ENABLED:
+        if head_to_head is None:
+            head_to_head = HeadToHeadIndex()
+        df = df.join(head_to_head.update(df))
+
+    if verbose:
+        print("Engenharia de features concluída.")
+    return df
+
+def _plot_result_distribution(result_counts):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(8, 6))
+    sns.barplot(x=result_counts.index, y=result_counts.values, hue=result_counts.index, palette='viridis')
+    plt.title('Distribuição dos Resultados dos Jogos')
+    plt.xlabel('Resultado')
+    plt.ylabel('Número de Jogos')
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
 
-    # Converter a coluna 'date' para o formato datetime
-    df['date'] = pd.to_datetime(df['date'])
+def _plot_score_histogram(scores, max_score, color, title):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    # Criando features baseadas na data
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    df['day_of_week'] = df['date'].dt.dayofweek # Segunda-feira=0, Domingo=6
+    plt.figure(figsize=(10, 6))
+    sns.histplot(scores, bins=range(0, max_score + 2), kde=True, color=color)
+    plt.title(title)
+    plt.xlabel('Gols Marcados')
+    plt.ylabel('Frequência')
+    plt.xticks(range(0, max_score + 1))
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
 
-    # Criando feature de vantagem de jogar em casa (1 se não é neutro, 0 caso contrário)
-    df['is_home_game'] = df.apply(lambda row: 1 if row['neutral'] == False else 0, axis=1)
+def _plot_score_by_result(df, score_col, title, ylabel):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    # Feature: Diferença de gols
-    df['goal_difference'] = df['home_score'] - df['away_score']
+    plt.figure(figsize=(12, 7))
+    sns.boxplot(x='result', y=score_col, data=df, palette='pastel')
+    plt.title(title)
+    plt.xlabel('Resultado do Jogo')
+    plt.ylabel(ylabel)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
 
-    # Feature: Total de gols no jogo
-    df['total_goals'] = df['home_score'] + df['away_score']
+def _plot_correlation_heatmap(correlation_matrix):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    print("Engenharia de features concluída.")
-    return df
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
+    plt.title('Matriz de Correlação das Features Numéricas')
 
-def analyze_correlation(df):
+def analyze_correlation(df, report=None):
     """
     Realiza a Análise Exploratória de Dados (EDA) e análise de correlação.
+    - report: se informado (src.reporting.Report), as figuras são salvas em arquivo e as estatísticas
+      vão para o resumo do relatório, sem abrir janelas. Histogramas e boxplots usam uma amostra
+      quando o número de linhas passa de REPORT_MAX_PLOT_ROWS.
     """
     if df is None:
         print("DataFrame de entrada é None. Não é possível analisar correlação.")
         return
 
+    # Biblioteca de estatística importada apenas aqui, para não pesar no import do módulo
+    from scipy.stats import ttest_ind
+
     print("\n--- Análise Exploratória de Dados (EDA) e Correlação ---")
 
     # Distribuição dos resultados
-    plt.figure(figsize=(8, 6))
-    sns.countplot(x='result', data=df, palette='viridis', hue='result')
-    plt.title('Distribuição dos Resultados dos Jogos')
-    plt.xlabel('Resultado')
-    plt.ylabel('Número de Jogos')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    result_counts = df['result'].value_counts(sort=False)
+    show_figure(report, 'analyze_result_distribution', _plot_result_distribution, result_counts=result_counts)
+
+    # Histogramas e boxplots são desenhados sobre uma amostra quando o volume de dados é grande
+    df_plot = downsample_for_plot(df[['result', 'home_score', 'away_score']])
 
     # Distribuição dos gols do time da casa
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df['home_score'], bins=range(0, df['home_score'].max() + 2), kde=True, color='skyblue')
-    plt.title('Distribuição dos Gols Marcados pelo Time da Casa')
-    plt.xlabel('Gols Marcados')
-    plt.ylabel('Frequência')
-    plt.xticks(range(0, df['home_score'].max() + 1))
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    show_figure(report, 'analyze_home_score_histogram', _plot_score_histogram,
+                scores=df_plot['home_score'], max_score=int(df['home_score'].max()), color='skyblue',
+                title='Distribuição dos Gols Marcados pelo Time da Casa')
 
     # Distribuição dos gols do time visitante
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df['away_score'], bins=range(0, df['away_score'].max() + 2), kde=True, color='lightcoral')
-    plt.title('Distribuição dos Gols Marcados pelo Time Visitante')
-    plt.xlabel('Gols Marcados')
-    plt.ylabel('Frequência')
-    plt.xticks(range(0, df['away_score'].max() + 1))
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    show_figure(report, 'analyze_away_score_histogram', _plot_score_histogram,
+                scores=df_plot['away_score'], max_score=int(df['away_score'].max()), color='lightcoral',
+                title='Distribuição dos Gols Marcados pelo Time Visitante')
 
     # Comparação de gols médios por tipo de resultado
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='result', y='home_score', data=df, palette='pastel')
-    plt.title('Gols do Time da Casa por Resultado do Jogo')
-    plt.xlabel('Resultado do Jogo')
-    plt.ylabel('Gols do Time da Casa')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
-
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='result', y='away_score', data=df, palette='pastel')
-    plt.title('Gols do Time Visitante por Resultado do Jogo')
-    plt.xlabel('Resultado do Jogo')
-    plt.ylabel('Gols do Time Visitante')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    show_figure(report, 'analyze_home_score_by_result', _plot_score_by_result,
+                df=df_plot, score_col='home_score', title='Gols do Time da Casa por Resultado do Jogo',
+                ylabel='Gols do Time da Casa')
+    show_figure(report, 'analyze_away_score_by_result', _plot_score_by_result,
+                df=df_plot, score_col='away_score', title='Gols do Time Visitante por Resultado do Jogo',
+                ylabel='Gols do Time Visitante')
 
     # Para a análise de correlação, precisamos converter a variável 'result' em numérica.
     result_mapping = {'Home Win': 1, 'Draw': 0, 'Away Win': -1}
-    df['result_numeric'] = df['result'].map(result_mapping)
+    df = df.assign(result_numeric=df['result'].map(result_mapping).astype(np.int8))
 
     # Selecionando features numéricas para a matriz de correlação
     numerical_features = ['home_score', 'away_score', 'goal_difference', 'total_goals', 'year', 'month', 'day_of_week', 'is_home_game', 'result_numeric']
     correlation_matrix = df[numerical_features].corr()
 
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
-    plt.title('Matriz de Correlação das Features Numéricas')
-    plt.show()
+    show_figure(report, 'analyze_correlation_heatmap', _plot_correlation_heatmap, correlation_matrix=correlation_matrix)
 
     print("\nCorrelação das features com o resultado numérico (result_numeric):")
     print(correlation_matrix['result_numeric'].sort_values(ascending=False))
@@ -124,6 +174,17 @@ def analyze_correlation(df):
     else:
         print("Não há uma diferença estatisticamente significativa na média de gols entre times da casa e visitantes.")
 
+    if report is not None:
+        report.add_summary('analyze', {
+            'rows': len(df),
+            'result_counts': result_counts.to_dict(),
+            'correlation_with_result': correlation_matrix['result_numeric'].sort_values(ascending=False).to_dict(),
+            'home_score_mean': df['home_score'].mean(),
+            'away_score_mean': df['away_score'].mean(),
+            'home_vs_away_goals_t_stat': t_stat_goals,
+            'home_vs_away_goals_p_value': p_value_goals,
+        })
+
     print("\nAnálise de correlação e EDA concluídas.")
 
 if __name__ == '__main__':
@@ -134,9 +195,9 @@ if __name__ == '__main__':
 
     df_raw = load_raw_data(from_url=False)
     if df_raw is not None:
-        df_cleaned = preprocess_data(df_raw.copy())
+        df_cleaned = preprocess_data(df_raw)
         if df_cleaned is not None:
-            df_analyzed = engineer_features(df_cleaned.copy())
+            df_analyzed = engineer_features(df_cleaned)
             if df_analyzed is not None:
-                analyze_correlation(df_analyzed.copy())
+                analyze_correlation(df_analyzed)
                 save_data(df_analyzed, ANALYZED_DATA_PATH)
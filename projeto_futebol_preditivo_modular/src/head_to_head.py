@@ -0,0 +1,317 @@
+# src/head_to_head.py
+#
+# Índice de confrontos diretos (head-to-head). Para cada par de times, guarda as datas das partidas entre
+# eles e os totais acumulados até cada data (vitórias de cada lado, empates e gols de cada lado). O
+# retrospecto de um confronto antes de uma partida vem de uma consulta ao dicionário (O(1)) seguida de uma
+# busca binária nas datas do par, em vez de filtrar o DataFrame inteiro para cada linha.
+#
+# O par é guardado em ordem alfabética (o mesmo histórico serve para os dois mandos); as features são
+# devolvidas do ponto de vista do mandante da partida consultada (HEAD_TO_HEAD_FEATURES):
+#   h2h_matches:         confrontos anteriores entre os dois times
+#   h2h_home_wins:       vitórias anteriores do mandante sobre o visitante (em qualquer campo)
+#   h2h_draws:           empates anteriores
+#   h2h_away_wins:       vitórias anteriores do visitante sobre o mandante
+#   h2h_goal_difference: gols do mandante menos gols do visitante nos confrontos anteriores
+
+import os
+import numpy as np
+import pandas as pd
+from src.config import HEAD_TO_HEAD_INDEX_PATH, HEAD_TO_HEAD_FEATURES
+
+# Totais acumulados do ponto de vista do primeiro time do par (em ordem alfabética)
+_TOTALS = ['first_wins', 'draws', 'second_wins', 'first_goals', 'second_goals']
+_EMPTY_TOTALS = (0, 0, 0, 0, 0)
+# Chave de busca (posição do par, dia) num único int64; os dias (desde 1970) podem ser negativos
+_KEY_DAY_OFFSET = 2**31
+# Tipo das features: cabe qualquer contagem de confrontos com um quarto da memória de int64
+_FEATURE_DTYPE = np.int32
+# Linhas por bloco ao montar e fatorar as chaves (par, dia), para não manter arrays int64 do tamanho de df
+_GROUP_BLOCK_ROWS = 2**18
+
+def _to_days(dates):
+    """
+    Datas como número inteiro de dias desde 1970-01-01 (chave da busca binária).
+    """
+    dates = pd.Series(dates)
+    if not pd.api.types.is_datetime64_dtype(dates):
+        dates = pd.to_datetime(dates)
+    return dates.to_numpy().astype('datetime64[D]').view(np.int64)
+
+def _search_keys(positions, days):
+    """
+    Chaves (posição do par, dia), crescentes na ordem dos arrays planos do índice.
+    """
+    return np.asarray(positions, dtype=np.int64) * 2**32 + (np.asarray(days, dtype=np.int64) + _KEY_DAY_OFFSET)
+
+def _team_codes(teams):
+    """
+    Códigos e nomes distintos de uma coluna de times (as categorias, quando a coluna é categórica).
+    """
+    if isinstance(teams.dtype, pd.CategoricalDtype):
+        return teams.cat.codes.to_numpy(), teams.cat.categories
+    return pd.factorize(teams)
+
+def _home_perspective(totals, home_is_first):
+    """
+    Converte totais (n, 5) do ponto de vista do primeiro time do par para as features do mandante.
+    """
+    totals = np.asarray(totals, dtype=np.int64).reshape(-1, len(_TOTALS))
+    home_is_first = np.asarray(home_is_first, dtype=bool)
+    first_wins, draws, second_wins, first_goals, second_goals = totals.T
+    return np.column_stack([
+        first_wins + draws + second_wins,
+        np.where(home_is_first, first_wins, second_wins),
+        draws,
+        np.where(home_is_first, second_wins, first_wins),
+        np.where(home_is_first, first_goals - second_goals, second_goals - first_goals),
+    ])
+
+class HeadToHeadIndex:
+    """
+    Índice incremental de confrontos diretos. update() devolve as features de antes de cada partida e
+    acrescenta as partidas ao índice; query() e fixture_features() consultam o índice sem alterá-lo.
+    O histórico fica em arrays planos ordenados por (par, dia), com os deslocamentos de cada par.
+    """
+
+    def __init__(self):
+        # (primeiro time, segundo time) -> posição p; o histórico do par ocupa days[offsets[p]:offsets[p + 1]]
+        # e totals[offsets[p]:offsets[p + 1]] (totais acumulados até o fim de cada dia, dias crescentes)
+        self.pairs = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.days = np.empty(0, dtype=np.int64)
+        self.totals = np.empty((0, len(_TOTALS)), dtype=np.int64)
+        self.last_day = None
+        self._keys = np.empty(0, dtype=np.int64)
+
+    def history(self, pair):
+        """
+        Dias e totais acumulados (arrays) de um par em ordem alfabética.
+        """
+        position = self.pairs.get(pair)
+        if position is None:
+            return self.days[:0], self.totals[:0]
+        segment = slice(self.offsets[position], self.offsets[position + 1])
+        return self.days[segment], self.totals[segment]
+
+    def totals_before(self, pair, day=None):
+        """
+        Totais acumulados do par (em ordem alfabética) nas partidas de dias anteriores a day
+        (None = todo o histórico indexado).
+        """
+        days, totals = self.history(pair)
+        position = len(days) if day is None else int(np.searchsorted(days, day))
+        return tuple(totals[position - 1].tolist()) if position else _EMPTY_TOTALS
+
+    def _totals_before(self, positions, days=None):
+        """
+        Versão vetorizada de totals_before: totais (n, 5) dos pares nas posições informadas (-1 = par sem
+        histórico), com uma única busca binária nas chaves de todos os pares.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if not len(self._keys):
+            return np.zeros((len(positions), len(_TOTALS)), dtype=np.int64)
+        known = positions >= 0
+        positions = np.where(known, positions, 0)
+        if days is None:
+            last = self.offsets[positions + 1] - 1
+        else:
+            last = np.searchsorted(self._keys, _search_keys(positions, days)) - 1
+        found = known & (last >= self.offsets[positions])
+        return np.where(found[:, None], self.totals[np.where(found, last, 0)], 0)
+
+    def query(self, home_team, away_team, date=None):
+        """
+        Retrospecto do confronto antes de date (None = todas as partidas já indexadas), do ponto de vista
+        de home_team. Retorna um dicionário com as colunas de HEAD_TO_HEAD_FEATURES.
+        """
+        home_is_first = home_team <= away_team
+        pair = (home_team, away_team) if home_is_first else (away_team, home_team)
+        day = None if date is None else (pd.Timestamp(date) - pd.Timestamp(0)).days
+        first_wins, draws, second_wins, first_goals, second_goals = self.totals_before(pair, day)
+        if home_is_first:
+            values = (first_wins + draws + second_wins, first_wins, draws, second_wins, first_goals - second_goals)
+        else:
+            values = (first_wins + draws + second_wins, second_wins, draws, first_wins, second_goals - first_goals)
+        return dict(zip(HEAD_TO_HEAD_FEATURES, values))
+
+    def fixture_features(self, home_teams, away_teams, dates=None):
+        """
+        Features de confronto direto para várias partidas (antes das datas informadas, ou com todo o
+        histórico indexado se dates for None).
+        """
+        home = np.asarray(home_teams, dtype=object)
+        away = np.asarray(away_teams, dtype=object)
+        home_is_first = home <= away
+        pairs = zip(np.where(home_is_first, home, away).tolist(), np.where(home_is_first, away, home).tolist())
+        positions = np.fromiter((self.pairs.get(pair, -1) for pair in pairs), dtype=np.int64, count=len(home))
+        totals = self._totals_before(positions, None if dates is None else _to_days(dates))
+        return pd.DataFrame(_home_perspective(totals, home_is_first).astype(_FEATURE_DTYPE),
+                            columns=HEAD_TO_HEAD_FEATURES)
+
+    def update(self, df):
+        """
+        Calcula as features de confronto direto de antes de cada partida de df (colunas date, home_team,
+        away_team, home_score, away_score) e acrescenta as partidas ao índice. Partidas do mesmo par no
+        mesmo dia não contam umas para as outras. As partidas não podem ser anteriores à última data
+        já indexada. Retorna um DataFrame com as colunas de HEAD_TO_HEAD_FEATURES, alinhado ao índice de df.
+        As partidas são agregadas por (par, dia) antes de qualquer ordenação, então a memória temporária
+        por linha se limita a alguns arrays de inteiros.
+        """
+        if len(df) == 0:
+            return pd.DataFrame({col: np.empty(0, dtype=_FEATURE_DTYPE) for col in HEAD_TO_HEAD_FEATURES},
+                                index=df.index)
+        days = _to_days(df['date'])
+        if self.last_day is not None and days.min() < self.last_day:
+            raise ValueError("Partidas anteriores à última data já indexada no confronto direto.")
+        last_day = int(days.max())
+
+        # Times como posições na lista ordenada dos nomes: comparar posições equivale a comparar os nomes
+        home_codes, home_names = _team_codes(df['home_team'])
+        away_codes, away_names = _team_codes(df['away_team'])
+        teams = np.sort(pd.unique(np.concatenate([np.asarray(home_names, dtype=object),
+                                                  np.asarray(away_names, dtype=object)])))
+        home_rank = pd.Index(teams).get_indexer(home_names).astype(np.int32)[home_codes]
+        away_rank = pd.Index(teams).get_indexer(away_names).astype(np.int32)[away_codes]
+        home_is_first = home_rank <= away_rank
+        # Um grupo por (par, dia), com a chave (código do par, dia) montada no mesmo array; cada bloco de
+        # linhas é fatorado à parte e as chaves distintas dos blocos são fatoradas de novo em grupos globais
+        groups = np.empty(len(df), dtype=np.int32)
+        block_keys = []
+        num_block_keys = 0
+        for start in range(0, len(df), _GROUP_BLOCK_ROWS):
+            block = slice(start, start + _GROUP_BLOCK_ROWS)
+            keys = np.minimum(home_rank[block], away_rank[block]).astype(np.int64)
+            keys *= len(teams)
+            keys += np.maximum(home_rank[block], away_rank[block])
+            keys *= 2**32
+            keys += days[block]
+            keys += _KEY_DAY_OFFSET
+            codes, unique_keys = pd.factorize(keys)
+            groups[block] = codes + num_block_keys
+            block_keys.append(unique_keys)
+            num_block_keys += len(unique_keys)
+        del home_rank, away_rank, days
+        block_groups, group_keys = pd.factorize(np.concatenate(block_keys))
+        groups = block_groups.astype(np.int32)[groups]
+
+        # Placares na largura da coluna (ex.: int16), sem cópia
+        home_goals = df['home_score'].to_numpy()
+        away_goals = df['away_score'].to_numpy()
+        first_margin = home_goals - away_goals
+        first_margin[~home_is_first] *= -1
+        count = lambda weights: np.bincount(groups, weights=weights, minlength=len(group_keys)).astype(np.int64)
+        group_totals = np.column_stack([count(first_margin > 0), count(first_margin == 0), count(first_margin < 0),
+                                        count(np.where(home_is_first, home_goals, away_goals)),
+                                        count(np.where(home_is_first, away_goals, home_goals))])
+        del first_margin
+
+        # Grupos em ordem de (par, dia): soma acumulada inclusiva dentro de cada par e exclusiva (até o dia anterior)
+        order = np.argsort(group_keys)
+        sorted_keys = group_keys[order]
+        group_pairs, group_days = sorted_keys // 2**32, sorted_keys % 2**32 - _KEY_DAY_OFFSET
+        pair_starts = np.flatnonzero(np.r_[True, group_pairs[1:] != group_pairs[:-1]])
+        run_lengths = np.diff(np.r_[pair_starts, len(order)])
+        inclusive = np.cumsum(group_totals[order], axis=0)
+        inclusive -= np.repeat(np.vstack([np.zeros((1, len(_TOTALS)), dtype=np.int64), inclusive])[pair_starts],
+                               run_lengths, axis=0)
+        exclusive = inclusive - group_totals[order]
+
+        # Pares já indexados: soma o histórico anterior a cada dia (features) e o histórico completo
+        # (base dos novos totais acumulados); pares novos recebem as próximas posições
+        pair_names = zip(teams[group_pairs[pair_starts] // len(teams)].tolist(),
+                         teams[group_pairs[pair_starts] % len(teams)].tolist())
+        pair_positions = np.array([self.pairs.get(pair, -1) for pair in pair_names], dtype=np.int64)
+        positions = np.repeat(pair_positions, run_lengths)
+        exclusive += self._totals_before(positions, group_days)
+        inclusive += self._totals_before(positions)
+        new_pairs = np.flatnonzero(pair_positions < 0)
+        pair_positions[new_pairs] = len(self.pairs) + np.arange(len(new_pairs))
+        for i in new_pairs.tolist():
+            first, second = group_pairs[pair_starts[i]] // len(teams), group_pairs[pair_starts[i]] % len(teams)
+            self.pairs[(teams[first], teams[second])] = int(pair_positions[i])
+        positions = np.repeat(pair_positions, run_lengths)
+
+        # Acrescenta um total acumulado por par e dia; o de um dia já indexado (o último) é substituído
+        new_keys = _search_keys(positions, group_days)
+        keep = ~np.isin(self._keys, new_keys)
+        keys = np.concatenate([self._keys[keep], new_keys])
+        key_order = np.argsort(keys, kind='stable')
+        self._keys = keys[key_order]
+        self.days = self._keys % 2**32 - _KEY_DAY_OFFSET
+        self.totals = np.concatenate([self.totals[keep], inclusive])[key_order]
+        pair_sizes = np.bincount(self._keys // 2**32, minlength=len(self.pairs))
+        self.offsets = np.concatenate([[0], np.cumsum(pair_sizes)])
+        self.last_day = last_day
+
+        # Features de cada linha a partir dos totais do seu grupo: cada grupo tem um par de valores (mandante
+        # como primeiro ou como segundo time do par), e cada linha indexa o seu com um único gather
+        before = np.empty_like(exclusive)
+        before[order] = exclusive
+        first_wins, draws, second_wins, first_goals, second_goals = before.astype(_FEATURE_DTYPE).T
+        oriented = groups
+        oriented *= 2
+        oriented += ~home_is_first
+        del groups, home_is_first
+        matches = first_wins + draws + second_wins
+        features = {col: np.column_stack(values).ravel()[oriented] for col, values in [
+            ('h2h_matches', (matches, matches)),
+            ('h2h_home_wins', (first_wins, second_wins)),
+            ('h2h_draws', (draws, draws)),
+            ('h2h_away_wins', (second_wins, first_wins)),
+            ('h2h_goal_difference', (first_goals - second_goals, second_goals - first_goals)),
+        ]}
+        return pd.DataFrame(features, index=df.index, copy=False)[HEAD_TO_HEAD_FEATURES]
+
+    def save(self, path=HEAD_TO_HEAD_INDEX_PATH):
+        """
+        Salva o índice num arquivo .npz: pares, deslocamentos de cada par e os arrays planos de dias e totais.
+        """
+        pairs = sorted(self.pairs, key=self.pairs.get)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, first=np.array([pair[0] for pair in pairs], dtype=str),
+                     second=np.array([pair[1] for pair in pairs], dtype=str),
+                     offsets=self.offsets, days=self.days, totals=self.totals,
+                     last_day=np.array(-1 if self.last_day is None else self.last_day))
+        print(f"Índice de confrontos diretos salvo em: {path} ({len(pairs)} pares, {len(self.days)} datas).")
+        return path
+
+    @classmethod
+    def load(cls, path=HEAD_TO_HEAD_INDEX_PATH):
+        index = cls()
+        with np.load(path, allow_pickle=False) as state:
+            index.pairs = {pair: i for i, pair in enumerate(zip(state['first'].tolist(), state['second'].tolist()))}
+            index.offsets = state['offsets'].astype(np.int64)
+            index.days = state['days'].astype(np.int64)
+            index.totals = state['totals'].astype(np.int64).reshape(-1, len(_TOTALS))
+            last_day = int(state['last_day'])
+        positions = np.repeat(np.arange(len(index.pairs)), np.diff(index.offsets))
+        index._keys = _search_keys(positions, index.days)
+        index.last_day = None if last_day < 0 else last_day
+        return index
+
+def load_head_to_head_index(path=HEAD_TO_HEAD_INDEX_PATH):
+    """
+    Carrega o índice de confrontos diretos salvo, ou None se ele ainda não existir.
+    """
+    if not os.path.exists(path):
+        return None
+    return HeadToHeadIndex.load(path)
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Retrospecto do confronto direto entre dois times.")
+    parser.add_argument('home_team')
+    parser.add_argument('away_team')
+    parser.add_argument('--date', default=None, help="Considera apenas partidas anteriores a esta data.")
+    args = parser.parse_args()
+
+    index = load_head_to_head_index()
+    if index is None:
+        print(f"Índice de confrontos diretos não encontrado em {HEAD_TO_HEAD_INDEX_PATH}. Execute o pipeline antes.")
+    else:
+        start = time.perf_counter()
+        record = index.query(args.home_team, args.away_team, args.date)
+        print(f"{args.home_team} x {args.away_team}: {record} (consulta em {(time.perf_counter() - start) * 1e6:.0f} µs)")
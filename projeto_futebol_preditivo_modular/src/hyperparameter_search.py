@@ -0,0 +1,263 @@
+# src/hyperparameter_search.py
+#
+# Busca de hiperparâmetros dos modelos candidatos com successive halving (fase Improve, main.py --search).
+# Para cada modelo, todos os candidatos da grade (SEARCH_PARAM_GRIDS) são avaliados com pouco recurso
+# (poucas árvores, ou poucas partidas de treino); só o melhor 1/SEARCH_HALVING_FACTOR segue para a rodada
+# seguinte, com SEARCH_HALVING_FACTOR vezes mais recurso, até o recurso máximo. Assim a maior parte do
+# custo vai para os candidatos promissores, em vez de treinar a grade inteira com o recurso máximo.
+#
+# - As dobras (SEARCH_FOLDS, estratificadas) de cada candidato são avaliadas em paralelo.
+# - As matrizes pré-processadas das dobras são calculadas uma vez por codificação categórica e guardadas
+#   no cache (CACHE_DIR), endereçadas pelo conteúdo dos dados e pelas configurações: nenhum candidato
+#   reajusta o preprocessor, e uma nova busca sobre os mesmos dados nem mesmo recalcula as matrizes.
+# - Cada avaliação (modelo, parâmetros, recurso, dobra) é gravada em SEARCH_RESULTS_PATH assim que termina;
+#   uma busca interrompida retoma do ponto em que parou, reaproveitando as avaliações já gravadas.
+# A busca usa apenas a parte de treino de split_train_test: o teste de train_models fica de fora.
+
+import functools
+import hashlib
+import inspect
+import json
+import math
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from src.config import (CACHE_DIR, CATEGORICAL_ENCODING, MODEL_ENCODINGS, SEARCH_PARAM_GRIDS, SEARCH_RESOURCES,
+                        SEARCH_MIN_RESOURCES, SEARCH_MAX_RESOURCES, SEARCH_HALVING_FACTOR, SEARCH_FOLDS,
+                        SEARCH_METRIC, SEARCH_MAX_WORKERS, SEARCH_RESULTS_PATH)
+from src.categorical_encoding import OrdinalCodeEncoder
+from src.model_training import MODEL_CANDIDATES, get_preprocessor, split_train_test
+from src.stage_cache import file_fingerprint, stage_cache_key, evict_cache
+from src.vocabulary import load_vocabulary, VocabularyEncoder
+
+def _data_key(X, y):
+    """
+    Hash do conteúdo dos dados de treino (valores e índice), usado nas chaves do cache e dos resultados.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(X, index=True).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def fold_matrices(X, y, encoding, data_key, cache_dir=CACHE_DIR):
+    """
+    Matrizes pré-processadas das dobras para uma codificação categórica: uma lista de
+    (X_treino, X_validação, y_treino, y_validação, ordem), em que ordem é uma permutação fixa das linhas de
+    treino (as primeiras n formam a amostra de n partidas). Carregadas do cache quando disponíveis.
+    Retorna (matrizes, chave do cache).
+    """
+    vocabulary = load_vocabulary()
+    upstream = f'{data_key}-{encoding}-vocabulary{vocabulary.version}-{len(vocabulary)}'
+    key = stage_cache_key('search', upstream, [get_preprocessor, OrdinalCodeEncoder, VocabularyEncoder])
+    path = os.path.join(cache_dir, f'search-{key}.pkl')
+    if os.path.exists(path):
+        os.utime(path) # Uso recente, para a política de remoção (LRU) do cache
+        print(f"Matrizes das dobras ({encoding}) carregadas do cache (chave {key[:12]}).")
+        return joblib.load(path, mmap_mode='r'), key
+
+    start = time.perf_counter()
+    folds = []
+    splitter = StratifiedKFold(n_splits=SEARCH_FOLDS, shuffle=True, random_state=42)
+    for fold_id, (train_rows, valid_rows) in enumerate(splitter.split(X, y)):
+        preprocessor = get_preprocessor(vocabulary, encoding)
+        X_train = preprocessor.fit_transform(X.iloc[train_rows], y.iloc[train_rows])
+        X_valid = preprocessor.transform(X.iloc[valid_rows])
+        order = np.random.default_rng(fold_id).permutation(len(train_rows))
+        folds.append((X_train, X_valid, y.iloc[train_rows].to_numpy(), y.iloc[valid_rows].to_numpy(), order))
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(folds, f'{path}.tmp')
+    os.replace(f'{path}.tmp', path)
+    print(f"Matrizes das dobras ({encoding}) calculadas em {time.perf_counter() - start:.1f}s "
+          f"e armazenadas no cache (chave {key[:12]}).")
+    evict_cache(cache_dir)
+    return folds, key
+
+def make_estimator(name, params):
+    """
+    Cria o classificador candidato name (MODEL_CANDIDATES) com os parâmetros informados.
+    """
+    return MODEL_CANDIDATES[name]().set_params(**params)
+
+def _evaluate_candidate(name, params, resource_name, resource, fold_id, fold):
+    """
+    Executada nos processos da busca: treina um candidato numa dobra com o recurso informado (None = o
+    do classificador sem alterações, com todas as partidas) e mede acurácia e log loss na validação.
+    """
+    X_train, X_valid, y_train, y_valid, order = fold
+    estimator = make_estimator(name, params)
+    if estimator.get_params().get('n_jobs') not in (None, 1):
+        estimator.set_params(n_jobs=1) # O paralelismo da busca já é entre avaliações
+    if resource is not None and resource_name == 'n_samples':
+        rows = np.sort(order[:resource])
+        X_train, y_train = X_train[rows], y_train[rows]
+    elif resource is not None:
+        estimator.set_params(**{resource_name: resource})
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    probabilities = estimator.predict_proba(X_valid)
+    return {'model': name, 'params': params, 'resource': resource, 'fold': fold_id,
+            'accuracy': accuracy_score(y_valid, estimator.classes_[probabilities.argmax(axis=1)]),
+            'log_loss': log_loss(y_valid, probabilities, labels=estimator.classes_),
+            'fit_seconds': fit_seconds}
+
+def _result_key(name, params, resource, fold_id):
+    return (name, json.dumps(params, sort_keys=True), resource, fold_id)
+
+def load_search_results(search_keys, path=SEARCH_RESULTS_PATH):
+    """
+    Avaliações já gravadas em path para as chaves de busca informadas ({modelo: chave}).
+    Linhas de outras buscas (outros dados ou configurações) e uma última linha incompleta são ignoradas.
+    """
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if search_keys.get(record['model']) == record['search_key']:
+                results[_result_key(record['model'], record['params'], record['resource'], record['fold'])] = record
+    return results
+
+def _mean_scores(results, name, candidates, resource):
+    """
+    Média das dobras de SEARCH_METRIC (e da acurácia) para cada candidato; ordenada do melhor para o pior.
+    """
+    rows = []
+    for params in candidates:
+        records = [record for (model, params_json, record_resource, _), record in results.items()
+                   if model == name and record_resource == resource
+                   and params_json == json.dumps(params, sort_keys=True)]
+        rows.append({'params': params, 'log_loss': np.mean([record['log_loss'] for record in records]),
+                     'accuracy': np.mean([record['accuracy'] for record in records])})
+    return sorted(rows, key=lambda row: row[SEARCH_METRIC] * (1 if SEARCH_METRIC == 'log_loss' else -1))
+
+class _ResultsWriter:
+    """
+    Acrescenta cada avaliação ao arquivo de resultados assim que ela termina (uma linha JSON por avaliação).
+    """
+
+    def __init__(self, path, results):
+        self.path = path
+        self.results = results
+        self.evaluated = 0
+
+    def evaluate(self, tasks, search_key, n_jobs):
+        if not tasks:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Uma interrupção pode ter deixado a última linha pela metade: a próxima começa numa linha nova
+        incomplete = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                incomplete = f.read(1) != b'\n'
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if incomplete:
+                f.write('\n')
+            outputs = Parallel(n_jobs=n_jobs, return_as='generator_unordered')(
+                delayed(_evaluate_candidate)(*task) for task in tasks)
+            for record in outputs:
+                record['search_key'] = search_key
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                self.results[_result_key(record['model'], record['params'], record['resource'], record['fold'])] = record
+                self.evaluated += 1
+
+def successive_halving(name, folds, search_key, writer, n_jobs=SEARCH_MAX_WORKERS):
+    """
+    Successive halving sobre a grade de um modelo. Retorna um dicionário com os parâmetros escolhidos
+    (já com o recurso máximo, se ele for um parâmetro do classificador), as pontuações do melhor candidato e
+    do classificador atual (MODEL_CANDIDATES, sem alterações) e o resumo de cada rodada.
+    """
+    resource_name = SEARCH_RESOURCES[name]
+    max_resource = SEARCH_MAX_RESOURCES[resource_name]
+    if max_resource is None:
+        max_resource = min(len(fold[4]) for fold in folds)
+    resource = min(SEARCH_MIN_RESOURCES[resource_name], max_resource)
+    candidates = list(ParameterGrid(SEARCH_PARAM_GRIDS[name]))
+
+    # Classificador atual, como referência (avaliado nas mesmas dobras)
+    baseline_tasks = [(name, {}, resource_name, None, fold_id, fold) for fold_id, fold in enumerate(folds)
+                      if _result_key(name, {}, None, fold_id) not in writer.results]
+    writer.evaluate(baseline_tasks, search_key, n_jobs)
+    baseline = _mean_scores(writer.results, name, [{}], None)[0]
+
+    rungs = []
+    while True:
+        tasks = [(name, params, resource_name, resource, fold_id, fold)
+                 for params in candidates for fold_id, fold in enumerate(folds)
+                 if _result_key(name, params, resource, fold_id) not in writer.results]
+        writer.evaluate(tasks, search_key, n_jobs)
+        ranked = _mean_scores(writer.results, name, candidates, resource)
+        rungs.append({'resource': resource, 'candidates': len(candidates), 'best': ranked[0]})
+        print(f"  {name} | {resource_name}={resource}: {len(candidates)} candidato(s), melhor "
+              f"{SEARCH_METRIC}={ranked[0][SEARCH_METRIC]:.4f} com {ranked[0]['params']}")
+        if resource >= max_resource:
+            break
+        candidates = [row['params'] for row in ranked[:math.ceil(len(candidates) / SEARCH_HALVING_FACTOR)]]
+        resource = min(resource * SEARCH_HALVING_FACTOR, max_resource)
+
+    best = ranked[0]
+    params = dict(best['params'])
+    if resource_name in make_estimator(name, {}).get_params():
+        params[resource_name] = max_resource
+    return {'params': params, 'score': best[SEARCH_METRIC], 'accuracy': best['accuracy'],
+            'baseline_score': baseline[SEARCH_METRIC], 'baseline_accuracy': baseline['accuracy'], 'rungs': rungs}
+
+def run_hyperparameter_search(df, models=None, results_path=SEARCH_RESULTS_PATH, cache_dir=CACHE_DIR,
+                              n_jobs=SEARCH_MAX_WORKERS):
+    """
+    Executa a busca para os modelos informados (por padrão, todos de SEARCH_PARAM_GRIDS) sobre a parte de
+    treino de df. Retorna {modelo: resultado de successive_halving}.
+    """
+    models = list(SEARCH_PARAM_GRIDS) if models is None else models
+    print(f"\n--- Busca de Hiperparâmetros (successive halving, {SEARCH_FOLDS} dobras, métrica {SEARCH_METRIC}) ---")
+    X_train, _, y_train, _ = split_train_test(df)
+    data_key = _data_key(X_train, y_train)
+
+    folds_by_encoding, search_keys = {}, {}
+    for name in models:
+        encoding = MODEL_ENCODINGS.get(name, CATEGORICAL_ENCODING)
+        if encoding not in folds_by_encoding:
+            folds_by_encoding[encoding] = fold_matrices(X_train, y_train, encoding, data_key, cache_dir)
+        folds_key = folds_by_encoding[encoding][1]
+        search_keys[name] = hashlib.sha256(
+            f'{folds_key}-{name}-{file_fingerprint(inspect.getsourcefile(_evaluate_candidate))}'.encode()).hexdigest()
+
+    writer = _ResultsWriter(results_path, load_search_results(search_keys, results_path))
+    if writer.results:
+        print(f"Retomando a busca: {len(writer.results)} avaliações já gravadas em {results_path}.")
+    start = time.perf_counter()
+    summary = {}
+    for name in models:
+        folds = folds_by_encoding[MODEL_ENCODINGS.get(name, CATEGORICAL_ENCODING)][0]
+        summary[name] = successive_halving(name, folds, search_keys[name], writer, n_jobs)
+    print(f"Busca concluída em {time.perf_counter() - start:.1f}s ({writer.evaluated} avaliações novas).")
+
+    for name, result in summary.items():
+        print(f"{name}: {SEARCH_METRIC} {result['baseline_score']:.4f} (atual) -> {result['score']:.4f} "
+              f"(acurácia {result['baseline_accuracy']:.4f} -> {result['accuracy']:.4f}) com {result['params']}")
+    return summary
+
+def tuned_candidates(summary):
+    """
+    Candidatos para train_models/fit_candidates com os parâmetros escolhidos pela busca.
+    """
+    return {name: functools.partial(make_estimator, name, result['params']) for name, result in summary.items()}
+
+if __name__ == '__main__':
+    from src.config import ANALYZED_DATA_PATH
+    from src.data_ingestion import load_data
+
+    df = load_data(ANALYZED_DATA_PATH)
+    if df is not None:
+        run_hyperparameter_search(df)
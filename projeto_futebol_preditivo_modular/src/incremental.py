@@ -0,0 +1,186 @@
+# src/incremental.py
+
+import hashlib
+import json
+import os
+import pandas as pd
+from src.config import (RAW_DATA_PATH, CLEANED_DATA_PATH, ANALYZED_DATA_PATH, INGESTION_STATE_PATH,
+                        RATING_STATE_PATH, HEAD_TO_HEAD_ENABLED, HEAD_TO_HEAD_INDEX_PATH, VOCABULARY_PATH)
+from src.data_ingestion import load_raw_data, read_raw_csv, save_data, load_data, concat_preserving_categories
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.ratings import RatingEngine, load_rating_state
+from src.head_to_head import HeadToHeadIndex, load_head_to_head_index
+from src.vocabulary import update_vocabulary
+from src.stage_cache import stage_cache_key
+
+# Quantidade de bytes lidos do fim da região processada para localizar a última linha
+_LAST_LINE_WINDOW = 64 * 1024
+
+def pipeline_fingerprint():
+    """
+    Identifica as configurações e o código de Measure/Analyze. Se mudarem, a marca d'água
+    deixa de valer e a ingestão incremental faz uma reconstrução completa.
+    """
+    measure_key = stage_cache_key('measure', 'incremental', [load_raw_data, preprocess_data])
+    return stage_cache_key('analyze', measure_key, [engineer_features, RatingEngine, HeadToHeadIndex])
+
+def _hash_prefix(path, num_bytes, block_size=1024 * 1024):
+    """
+    Calcula o SHA-256 dos primeiros num_bytes do arquivo.
+    """
+    digest = hashlib.sha256()
+    remaining = num_bytes
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+def _last_line_fingerprint(path, end_offset):
+    """
+    Calcula o SHA-256 da última linha completa antes de end_offset, sem ler o arquivo inteiro.
+    """
+    with open(path, 'rb') as f:
+        start = max(0, end_offset - _LAST_LINE_WINDOW)
+        f.seek(start)
+        window = f.read(end_offset - start).rstrip(b'\r\n')
+    return hashlib.sha256(window.rsplit(b'\n', 1)[-1]).hexdigest()
+
+def _read_header(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readline().strip().split(',')
+
+def load_ingestion_state(state_path=INGESTION_STATE_PATH):
+    """
+    Lê a marca d'água da ingestão incremental, ou None se ainda não existir.
+    """
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_ingestion_state(raw_path, df_analyzed, state_path=INGESTION_STATE_PATH):
+    """
+    Registra até onde o CSV bruto foi processado: posição em bytes, número de linhas, última data,
+    fingerprint da última linha e hash de todo o trecho já processado.
+    """
+    raw_bytes = os.path.getsize(raw_path)
+    state = {
+        'pipeline': pipeline_fingerprint(),
+        'columns': _read_header(raw_path),
+        'raw_bytes': raw_bytes,
+        'rows': int(len(df_analyzed)),
+        'last_date': str(pd.to_datetime(df_analyzed['date']).max().date()),
+        'last_row_sha256': _last_line_fingerprint(raw_path, raw_bytes),
+        'prefix_sha256': _hash_prefix(raw_path, raw_bytes),
+    }
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    print(f"Marca d'água da ingestão atualizada: {state['rows']} linhas até {state['last_date']}.")
+    return state
+
+def _state_rebuild_reason(state, raw_path, cleaned_path, analyzed_path):
+    """
+    Retorna o motivo pelo qual a marca d'água não pode ser usada, ou None se ela for válida.
+    """
+    if state is None:
+        return "nenhuma marca d'água encontrada"
+    if not (os.path.exists(cleaned_path) and os.path.exists(analyzed_path)):
+        return "dados processados ausentes"
+    if state['pipeline'] != pipeline_fingerprint():
+        return "configurações ou código do pipeline alterados"
+    if _read_header(raw_path) != state['columns']:
+        return "cabeçalho do CSV bruto alterado"
+    if os.path.getsize(raw_path) < state['raw_bytes']:
+        return "CSV bruto menor que o já processado"
+    # Verificação barata primeiro (última linha), depois a completa (todo o histórico já processado)
+    if _last_line_fingerprint(raw_path, state['raw_bytes']) != state['last_row_sha256']:
+        return "última linha processada foi alterada"
+    if _hash_prefix(raw_path, state['raw_bytes']) != state['prefix_sha256']:
+        return "linhas históricas foram alteradas"
+    return None
+
+def _full_rebuild(raw_path, cleaned_path, analyzed_path, state_path, rating_state_path, head_to_head_path,
+                  vocabulary_path):
+    df_raw = read_raw_csv(raw_path)
+    df_cleaned = preprocess_data(df_raw, vocabulary=update_vocabulary(df_raw, vocabulary_path))
+    save_data(df_cleaned, cleaned_path)
+    ratings, head_to_head = RatingEngine(), HeadToHeadIndex()
+    df_analyzed = engineer_features(df_cleaned, ratings=ratings, head_to_head=head_to_head)
+    save_data(df_analyzed, analyzed_path)
+    ratings.save(rating_state_path)
+    if HEAD_TO_HEAD_ENABLED:
+        head_to_head.save(head_to_head_path)
+    save_ingestion_state(raw_path, df_analyzed, state_path)
+    return df_analyzed
+
+def run_incremental_ingestion(raw_path=RAW_DATA_PATH, cleaned_path=CLEANED_DATA_PATH,
+                              analyzed_path=ANALYZED_DATA_PATH, state_path=INGESTION_STATE_PATH,
+                              rating_state_path=RATING_STATE_PATH, head_to_head_path=HEAD_TO_HEAD_INDEX_PATH,
+                              vocabulary_path=VOCABULARY_PATH):
+    """
+    Ingestão incremental: o CSV bruto só cresce com partidas de datas posteriores, então apenas os bytes
+    adicionados após a marca d'água são lidos, pré-processados e transformados em features, e o resultado
+    é anexado aos dados limpos e analisados. O vocabulário global (vocabulary_path) é estendido com os
+    valores novos; os ratings e o índice de confrontos diretos continuam dos estados salvos em
+    rating_state_path e head_to_head_path. Se o histórico tiver sido editado (ou se a
+    marca d'água ou esses estados não existirem ou não valerem mais), faz uma reconstrução completa.
+    Retorna o DataFrame analisado completo.
+    """
+    print("\n--- Ingestão Incremental ---")
+    state = load_ingestion_state(state_path)
+    reason = _state_rebuild_reason(state, raw_path, cleaned_path, analyzed_path)
+    if reason is not None:
+        print(f"Reconstrução completa necessária: {reason}.")
+        return _full_rebuild(raw_path, cleaned_path, analyzed_path, state_path, rating_state_path, head_to_head_path,
+                             vocabulary_path)
+
+    if os.path.getsize(raw_path) == state['raw_bytes']:
+        print(f"Nenhuma partida nova desde {state['last_date']}; dados processados já atualizados.")
+        return load_data(analyzed_path)
+
+    with open(raw_path, 'rb') as f:
+        f.seek(state['raw_bytes'])
+        df_new = read_raw_csv(f, names=state['columns'], header=None)
+
+    if df_new.empty:
+        print(f"Nenhuma partida nova desde {state['last_date']}; dados processados já atualizados.")
+        save_ingestion_state(raw_path, load_data(analyzed_path, columns=['date']), state_path)
+        return load_data(analyzed_path)
+    if pd.to_datetime(df_new['date']).min() < pd.Timestamp(state['last_date']):
+        print("Reconstrução completa necessária: partidas novas anteriores à última data processada.")
+        return _full_rebuild(raw_path, cleaned_path, analyzed_path, state_path, rating_state_path, head_to_head_path,
+                             vocabulary_path)
+    ratings = load_rating_state(rating_state_path)
+    if ratings is None or str(pd.Timestamp(ratings.last_date).date()) != state['last_date']:
+        print("Reconstrução completa necessária: estado dos ratings ausente ou fora de sincronia.")
+        return _full_rebuild(raw_path, cleaned_path, analyzed_path, state_path, rating_state_path, head_to_head_path,
+                             vocabulary_path)
+    head_to_head = load_head_to_head_index(head_to_head_path) if HEAD_TO_HEAD_ENABLED else None
+    if HEAD_TO_HEAD_ENABLED and (head_to_head is None or
+                                 str(pd.Timestamp(head_to_head.last_day, unit='D').date()) != state['last_date']):
+        print("Reconstrução completa necessária: índice de confrontos diretos ausente ou fora de sincronia.")
+        return _full_rebuild(raw_path, cleaned_path, analyzed_path, state_path, rating_state_path, head_to_head_path,
+                             vocabulary_path)
+
+    print(f"{len(df_new)} partidas novas após {state['last_date']}; processando apenas o delta.")
+    df_new_cleaned = preprocess_data(df_new, verbose=False, vocabulary=update_vocabulary(df_new, vocabulary_path))
+    save_data(concat_preserving_categories([load_data(cleaned_path), df_new_cleaned]), cleaned_path)
+    df_new_analyzed = engineer_features(df_new_cleaned, verbose=False, ratings=ratings, head_to_head=head_to_head)
+    df_analyzed = concat_preserving_categories([load_data(analyzed_path), df_new_analyzed])
+    save_data(df_analyzed, analyzed_path)
+    ratings.save(rating_state_path)
+    if HEAD_TO_HEAD_ENABLED:
+        head_to_head.save(head_to_head_path)
+
+    save_ingestion_state(raw_path, df_analyzed, state_path)
+    return df_analyzed
+
+if __name__ == '__main__':
+    df_analyzed = run_incremental_ingestion()
+    print(f"\nTotal de partidas nos dados analisados: {len(df_analyzed)}")
@@ -1,16 +1,49 @@
 # src/model_evaluation.py
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from src.config import FEATURES, TARGET, NUMERICAL_COLS, CATEGORICAL_COLS
-from src.model_training import get_preprocessor # Para obter o preprocessor para nomes de features
+from src.config import FEATURES, TARGET
+from src.model_training import get_feature_names
+from src.reporting import show_figure
+from src.profiling import traced
 
-def evaluate_model(model, X_test, y_test):
+def _plot_confusion_matrix(matrix, class_names):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(matrix, annot=True, fmt='d', cmap='Blues',
+                xticklabels=class_names, yticklabels=class_names)
+    plt.title('Matriz de Confusão')
+    plt.xlabel('Previsto')
+    plt.ylabel('Real')
+
+def _plot_coefficients(coefficients, color, title):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 8))
+    coefficients.plot(kind='barh', color=color)
+    plt.title(title)
+    plt.xlabel('Valor do Coeficiente')
+    plt.ylabel('Feature')
+    plt.tight_layout()
+
+def _plot_feature_importances(importances, title):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(12, 8))
+    sns.barplot(x=importances.values, y=importances.index, palette='viridis')
+    plt.title(title)
+    plt.xlabel('Importância')
+    plt.ylabel('Feature')
+
+@traced('Improve')
+def evaluate_model(model, X_test, y_test, report=None):
     """
     Avalia o desempenho do modelo em um conjunto de teste.
     Imprime métricas de classificação e gera uma matriz de confusão.
+    - report: se informado (src.reporting.Report), a figura é salva em arquivo e as métricas vão para o resumo.
     """
     if model is None:
         print("Modelo é None. Não é possível avaliar.")
@@ -19,25 +52,30 @@ def evaluate_model(model, X_test, y_test):
     print("\n--- Avaliando o Desempenho do Modelo ---")
     y_pred = model.predict(X_test)
     accuracy = accuracy_score(y_test, y_pred)
+    matrix = confusion_matrix(y_test, y_pred)
     print(f"Acurácia: {accuracy:.4f}")
     print("\nRelatório de Classificação:")
     print(classification_report(y_test, y_pred, zero_division=0))
     print("\nMatriz de Confusão:")
-    print(confusion_matrix(y_test, y_pred))
+    print(matrix)
 
     # Plotar Matriz de Confusão
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt='d', cmap='Blues',
-                xticklabels=model.classes_, yticklabels=model.classes_)
-    plt.title('Matriz de Confusão')
-    plt.xlabel('Previsto')
-    plt.ylabel('Real')
-    plt.show()
-
-def interpret_model(model, model_name, X_train_original, y_train_original):
+    show_figure(report, 'evaluate_confusion_matrix', _plot_confusion_matrix,
+                matrix=matrix, class_names=list(model.classes_))
+
+    if report is not None:
+        report.add_summary('evaluate', {
+            'accuracy': accuracy,
+            'classification_report': classification_report(y_test, y_pred, zero_division=0, output_dict=True),
+            'confusion_matrix': matrix,
+            'classes': list(model.classes_),
+        })
+
+def interpret_model(model, model_name, X_train_original, y_train_original, report=None):
     """
     Interpreta o modelo para identificar as features mais importantes.
     Gera gráficos de importância de features para Random Forest ou coeficientes para Regressão Logística.
+    - report: se informado (src.reporting.Report), os gráficos são salvos em arquivo e os rankings vão para o resumo.
     """
     if model is None:
         print("Modelo é None. Não é possível interpretar.")
@@ -45,19 +83,8 @@ def interpret_model(model, model_name, X_train_original, y_train_original):
 
     print(f"\n--- Interpretação do Modelo ({model_name}) ---")
 
-    # Re-fit do preprocessor no X_train_original para obter todos os nomes das features transformadas
-    # Isso é necessário para garantir que o preprocessor do modelo tenha todas as categorias
-    # vistas no treino, para mapear corretamente os coeficientes/importâncias.
-    preprocessor_loaded = model.named_steps['preprocessor']
-    
-    # Nomes das colunas numéricas
-    numerical_cols_for_coef = NUMERICAL_COLS
-    # Nomes das colunas categóricas após OneHotEncoding
-    categorical_cols_for_coef = CATEGORICAL_COLS
-
-    ohe_feature_names = preprocessor_loaded.named_transformers_['cat'].get_feature_names_out(categorical_cols_for_coef)
-    all_feature_names = numerical_cols_for_coef + list(ohe_feature_names)
-
+    # Nomes das colunas transformadas (numéricas e one-hot), na ordem dos coeficientes/importâncias
+    all_feature_names = get_feature_names(model)
 
     if model_name == 'Logistic Regression':
         print("\nAnálise dos Coeficientes da Regressão Logística (para insights):")
@@ -74,22 +101,19 @@ def interpret_model(model, model_name, X_train_original, y_train_original):
         print("\nTop 10 Coeficientes Negativos (aumentam a chance de vitória do time visitante/empate):")
         print(coefficients.nsmallest(10))
 
-        plt.figure(figsize=(12, 8))
-        coefficients.nlargest(10).plot(kind='barh', color='skyblue')
-        plt.title('Top 10 Coeficientes Positivos (Regressão Logística)')
-        plt.xlabel('Valor do Coeficiente')
-        plt.ylabel('Feature')
-        plt.tight_layout()
-        plt.show()
-
-        plt.figure(figsize=(12, 8))
-        coefficients.nsmallest(10).plot(kind='barh', color='lightcoral')
-        plt.title('Top 10 Coeficientes Negativos (Regressão Logística)')
-        plt.xlabel('Valor do Coeficiente')
-        plt.ylabel('Feature')
-        plt.tight_layout()
-        plt.show()
+        show_figure(report, 'interpret_top_positive_coefficients', _plot_coefficients,
+                    coefficients=coefficients.nlargest(10), color='skyblue',
+                    title='Top 10 Coeficientes Positivos (Regressão Logística)')
+        show_figure(report, 'interpret_top_negative_coefficients', _plot_coefficients,
+                    coefficients=coefficients.nsmallest(10), color='lightcoral',
+                    title='Top 10 Coeficientes Negativos (Regressão Logística)')
 
+        if report is not None:
+            report.add_summary('interpret', {
+                'model_name': model_name,
+                'top_positive_coefficients': coefficients.nlargest(10).to_dict(),
+                'top_negative_coefficients': coefficients.nsmallest(10).to_dict(),
+            })
 
     elif model_name == 'Random Forest':
         print("\n--- Importância das Features (Random Forest) ---")
@@ -100,27 +124,30 @@ def interpret_model(model, model_name, X_train_original, y_train_original):
         top_n = 15
         print(feature_importances.nlargest(top_n))
 
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x=feature_importances.nlargest(top_n).values, y=feature_importances.nlargest(top_n).index, palette='viridis')
-        plt.title(f'Top {top_n} Features Mais Importantes (Random Forest)')
-        plt.xlabel('Importância')
-        plt.ylabel('Feature')
-        plt.show()
+        show_figure(report, 'interpret_feature_importances', _plot_feature_importances,
+                    importances=feature_importances.nlargest(top_n),
+                    title=f'Top {top_n} Features Mais Importantes (Random Forest)')
+
+        if report is not None:
+            report.add_summary('interpret', {
+                'model_name': model_name,
+                'top_feature_importances': feature_importances.nlargest(top_n).to_dict(),
+            })
     else:
         print("Interpretação de features não implementada para este tipo de modelo.")
 
 if __name__ == '__main__':
-    from src.data_ingestion import load_raw_data
+    from src.data_ingestion import load_raw_data, load_data
     from src.data_preprocessing import preprocess_data
     from src.feature_engineering import engineer_features
     from src.model_training import train_models
     from src.config import ANALYZED_DATA_PATH
 
     # Carregar dados processados
-    df = pd.read_csv(ANALYZED_DATA_PATH)
+    df = load_data(ANALYZED_DATA_PATH)
     
     # Re-treinar para obter X_test e y_test
-    best_model, best_model_name, X_test_df, y_test_df = train_models(df.copy())
+    best_model, best_model_name, X_test_df, y_test_df = train_models(df)
     
     if best_model is not None:
         evaluate_model(best_model, X_test_df, y_test_df)
@@ -1,68 +1,153 @@
 # src/model_training.py
 
-import pandas as pd
+import copy
+import os
+import shutil
 import joblib
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, TargetEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from src.config import FEATURES, TARGET, NUMERICAL_COLS, CATEGORICAL_COLS, MODELS_DIR
-
-def get_preprocessor():
+from src.config import (FEATURES, TARGET, NUMERICAL_COLS, CATEGORICAL_COLS, MODELS_DIR, TRAINING_MAX_WORKERS,
+                        LOGISTIC_REGRESSION_MODEL_NAME, RANDOM_FOREST_MODEL_NAME, COMPILED_SCORER_NAME,
+                        RANDOM_FOREST_ARRAYS_DIR, CATEGORICAL_ENCODINGS, CATEGORICAL_ENCODING, MODEL_ENCODINGS,
+                        ENCODING_HASH_FEATURES, ENCODING_TARGET_FOLDS)
+from src.categorical_encoding import OrdinalCodeEncoder, FrequencyEncoder, HashingEncoder
+from src.shared_model import export_forest_arrays
+from src.vocabulary import load_vocabulary, VocabularyEncoder
+from src.profiling import traced
+
+def get_categorical_encoder(encoding=CATEGORICAL_ENCODING, vocabulary=None):
+    """
+    Cria o codificador das colunas categóricas para a estratégia encoding (CATEGORICAL_ENCODINGS).
+    - vocabulary: Vocabulary com as categorias (por padrão, o vocabulário salvo). Com vocabulário, o one-hot
+      usa o VocabularyEncoder (colunas na ordem do vocabulário) e o ordinal usa os códigos do vocabulário;
+      sem vocabulário salvo, as categorias são descobertas no ajuste.
+    """
+    if encoding not in CATEGORICAL_ENCODINGS:
+        raise ValueError(f"Codificação desconhecida: {encoding!r} (opções: {', '.join(CATEGORICAL_ENCODINGS)}).")
+    if encoding == 'frequency':
+        return FrequencyEncoder()
+    if encoding == 'target':
+        # No ajuste (fit_transform), cada linha recebe as médias calculadas sem a sua dobra
+        folds = StratifiedKFold(n_splits=ENCODING_TARGET_FOLDS, shuffle=True, random_state=42)
+        return TargetEncoder(target_type='multiclass', cv=folds)
+    if encoding == 'hashing':
+        return HashingEncoder(n_features=ENCODING_HASH_FEATURES)
+
+    vocabulary = load_vocabulary() if vocabulary is None else vocabulary
+    categories = [vocabulary.categories(col) for col in CATEGORICAL_COLS] if len(vocabulary) else None
+    if encoding == 'ordinal':
+        return OrdinalCodeEncoder(categories if categories is not None else 'auto')
+    if categories is not None:
+        return VocabularyEncoder(categories)
+    return OneHotEncoder(handle_unknown='ignore')
+
+def get_preprocessor(vocabulary=None, encoding=CATEGORICAL_ENCODING, exclude_features=()):
     """
     Retorna um ColumnTransformer para pré-processamento de dados.
+    - vocabulary: Vocabulary com as categorias (por padrão, o vocabulário salvo).
+    - encoding: codificação das colunas categóricas (ver get_categorical_encoder). A codificação por alvo
+      precisa do alvo no ajuste: use fit(X, y)/fit_transform(X, y).
+    - exclude_features: colunas numéricas deixadas de fora (ex.: BACKTEST_EXCLUDE_FEATURES).
     """
     preprocessor = ColumnTransformer(
         transformers=[
-            ('num', StandardScaler(), NUMERICAL_COLS),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_COLS)
+            ('num', StandardScaler(), [col for col in NUMERICAL_COLS if col not in exclude_features]),
+            ('cat', get_categorical_encoder(encoding, vocabulary), CATEGORICAL_COLS)
         ])
     return preprocessor
 
-def train_models(df):
+def get_feature_names(model):
+    """
+    Nomes das colunas da matriz transformada de um Pipeline ajustado (numéricas e depois as categóricas
+    codificadas), na ordem dos coeficientes/importâncias do classificador.
+    """
+    encoder = model.named_steps['preprocessor'].named_transformers_['cat']
+    return list(NUMERICAL_COLS) + list(encoder.get_feature_names_out(CATEGORICAL_COLS))
+
+# Modelos candidatos: nome -> função que cria o classificador (sem o preprocessor).
+# Para avaliar um novo modelo basta registrá-lo aqui; todos são treinados em paralelo.
+MODEL_CANDIDATES = {
+    'Logistic Regression': lambda: LogisticRegression(solver='lbfgs', random_state=42, max_iter=1000),
+    'Random Forest': lambda: RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1),
+}
+
+def _fit_candidate(name, estimator, X_train_transformed, y_train):
+    """
+    Executada nos processos de treino: ajusta um classificador candidato sobre a matriz já pré-processada.
+    """
+    estimator.fit(X_train_transformed, y_train)
+    return name, estimator
+
+def fit_candidates(X_train, y_train, candidates=None, n_jobs=TRAINING_MAX_WORKERS, encodings=None):
+    """
+    Ajusta um preprocessor por codificação categórica usada pelos candidatos (encodings: {nome: codificação},
+    por padrão MODEL_ENCODINGS; os demais usam CATEGORICAL_ENCODING) e treina os classificadores candidatos
+    em paralelo, em processos separados. Candidatos com a mesma codificação compartilham a mesma matriz
+    transformada (somente para leitura). O tempo total fica próximo ao do candidato mais lento, e não à
+    soma dos tempos de todos.
+    Retorna um dicionário {nome: Pipeline}, cada Pipeline autossuficiente (preprocessor + classificador).
+    """
+    candidates = MODEL_CANDIDATES if candidates is None else candidates
+    encodings = MODEL_ENCODINGS if encodings is None else encodings
+
+    preprocessors, matrices = {}, {}
+    for name in candidates:
+        encoding = encodings.get(name, CATEGORICAL_ENCODING)
+        if encoding not in preprocessors:
+            preprocessors[encoding] = get_preprocessor(encoding=encoding)
+            matrices[encoding] = preprocessors[encoding].fit_transform(X_train, y_train)
+            print(f"Matriz de treino pré-processada ({encoding}): "
+                  f"{matrices[encoding].shape[0]} x {matrices[encoding].shape[1]}")
+
+    for name in candidates:
+        print(f"Treinando {name}...")
+    fitted = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_candidate)(name, make_estimator(), matrices[encodings.get(name, CATEGORICAL_ENCODING)], y_train)
+        for name, make_estimator in candidates.items()
+    )
+
+    models = {}
+    for name, estimator in fitted:
+        # Cópia do preprocessor já ajustado para cada Pipeline, evitando estado compartilhado entre os modelos salvos
+        preprocessor = preprocessors[encodings.get(name, CATEGORICAL_ENCODING)]
+        models[name] = Pipeline(steps=[('preprocessor', copy.deepcopy(preprocessor)),
+                                       ('classifier', estimator)])
+        print(f"{name} treinada!")
+    return models
+
+def split_train_test(df):
+    """
+    Divisão treino/teste da seleção de modelos (estratificada pelo alvo, 20% para teste). A busca de
+    hiperparâmetros usa apenas a parte de treino, para que o teste continue fora de qualquer escolha.
+    """
+    return train_test_split(df[FEATURES], df[TARGET], test_size=0.2, random_state=42, stratify=df[TARGET])
+
+@traced('Improve')
+def train_models(df, candidates=None):
     """
     Prepara os dados, treina e avalia modelos de Machine Learning.
+    - candidates: dicionário {nome: função que cria o classificador}; por padrão, MODEL_CANDIDATES.
     Retorna o melhor modelo treinado e seu nome.
     """
     if df is None:
         print("DataFrame de entrada é None. Não é possível treinar modelos.")
-        return None, None
+        return None, None, None, None
 
     print("\n--- Treinando Modelos de Machine Learning ---")
 
-    X = df[FEATURES]
-    y = df[TARGET]
-
     # Divisão do dataset em conjuntos de treino e teste
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train, X_test, y_train, y_test = split_train_test(df)
 
     print(f"Tamanho do conjunto de treino: {X_train.shape[0]} amostras")
     print(f"Tamanho do conjunto de teste: {X_test.shape[0]} amostras")
 
-    preprocessor = get_preprocessor()
-
-    # Modelo 1: Regressão Logística
-    pipeline_lr = Pipeline(steps=[('preprocessor', preprocessor),
-                                  ('classifier', LogisticRegression(solver='liblinear', random_state=42, max_iter=1000))])
-
-    print("\nTreinando Regressão Logística...")
-    pipeline_lr.fit(X_train, y_train)
-    print("Regressão Logística treinada!")
-
-    # Modelo 2: Random Forest Classifier
-    pipeline_rf = Pipeline(steps=[('preprocessor', get_preprocessor()), # Nova instância do preprocessor para evitar side effects
-                                  ('classifier', RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1))])
-
-    print("\nTreinando Random Forest...")
-    pipeline_rf.fit(X_train, y_train)
-    print("Random Forest treinada!")
-
-    models = {
-        'Logistic Regression': pipeline_lr,
-        'Random Forest': pipeline_rf
-    }
+    models = fit_candidates(X_train, y_train, candidates)
 
     best_model_name = None
     best_accuracy = 0
@@ -86,7 +171,12 @@ def train_models(df):
 
 def save_model(model, model_name, path=MODELS_DIR):
     """
-    Salva o modelo treinado em um arquivo .joblib.
+    Salva o modelo treinado em um arquivo .joblib (sem compressão, para permitir memória mapeada).
+    Florestas também são exportadas em arrays planos, que vários processos carregam com memória
+    mapeada compartilhando uma única cópia (ver src/shared_model.py).
+    Os artefatos de um melhor modelo anterior são removidos, para que os carregadores (src/scoring.py)
+    não os prefiram a este: o arquivo do outro modelo, os arrays da floresta e o pontuador compilado
+    (exportado de novo, a partir deste modelo, quando ele é uma Regressão Logística).
     """
     if model is None:
         print("Modelo é None. Não é possível salvar.")
@@ -94,18 +184,29 @@ def save_model(model, model_name, path=MODELS_DIR):
 
     os.makedirs(path, exist_ok=True) # Cria o diretório se não existir
     filename = os.path.join(path, f'{model_name.replace(" ", "_").lower()}_model.joblib')
+    for stale_name in (LOGISTIC_REGRESSION_MODEL_NAME, RANDOM_FOREST_MODEL_NAME, COMPILED_SCORER_NAME):
+        stale_path = os.path.join(path, stale_name)
+        if stale_path != filename and os.path.exists(stale_path):
+            os.remove(stale_path)
+            print(f"Artefato de um modelo anterior removido: {stale_path}")
     joblib.dump(model, filename)
     print(f"Modelo '{model_name}' salvo em: {filename}")
+    forest_arrays_dir = os.path.join(path, RANDOM_FOREST_ARRAYS_DIR)
+    if hasattr(model.named_steps['classifier'], 'estimators_'):
+        export_forest_arrays(model, forest_arrays_dir)
+    elif os.path.isdir(forest_arrays_dir):
+        shutil.rmtree(forest_arrays_dir)
+        print(f"Artefato de um modelo anterior removido: {forest_arrays_dir}")
 
 if __name__ == '__main__':
-    from src.data_ingestion import load_raw_data
+    from src.data_ingestion import load_raw_data, load_data
     from src.data_preprocessing import preprocess_data
     from src.feature_engineering import engineer_features
     from src.config import ANALYZED_DATA_PATH
 
     # Carregar dados processados
-    df = pd.read_csv(ANALYZED_DATA_PATH)
+    df = load_data(ANALYZED_DATA_PATH)
     
-    best_model, best_model_name, X_test_df, y_test_df = train_models(df.copy())
+    best_model, best_model_name, X_test_df, y_test_df = train_models(df)
     if best_model is not None:
         save_model(best_model, best_model_name)
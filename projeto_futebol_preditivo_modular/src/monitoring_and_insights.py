@@ -2,85 +2,88 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-import joblib
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from src.config import MODELS_DIR, LOGISTIC_REGRESSION_MODEL_NAME, RANDOM_FOREST_MODEL_NAME, NUM_SIMULATED_GAMES, FEATURES, TARGET, NUMERICAL_COLS, CATEGORICAL_COLS
-
-def load_model():
+from src.config import NUM_SIMULATED_GAMES, SIMULATION_RECENT_YEARS, FEATURES, TARGET, HEAD_TO_HEAD_ENABLED
+from src.reporting import show_figure
+from src.model_training import get_feature_names
+from src.ratings import RatingEngine, load_rating_state
+from src.head_to_head import HeadToHeadIndex, load_head_to_head_index
+from src.drift_monitor import log_alerts
+from src.synthetic_data import MATCH_COLUMNS, SyntheticMatchGenerator, add_match_features
+from src.profiling import traced
+from src.scoring import load_model # Mantido aqui para compatibilidade com quem importa deste módulo
+
+def _fallback_matches():
     """
-    Tenta carregar o melhor modelo salvo (Regressão Logística ou Random Forest).
+    Pequeno histórico de exemplo para a simulação quando não há dados base.
     """
-    model_filename_lr = os.path.join(MODELS_DIR, LOGISTIC_REGRESSION_MODEL_NAME)
-    model_filename_rf = os.path.join(MODELS_DIR, RANDOM_FOREST_MODEL_NAME)
-
-    best_model = None
-    best_model_name = None
-
-    if os.path.exists(model_filename_lr):
-        best_model = joblib.load(model_filename_lr)
-        best_model_name = 'Logistic Regression'
-        print(f"\nModelo '{LOGISTIC_REGRESSION_MODEL_NAME}' carregado com sucesso!")
-    elif os.path.exists(model_filename_rf):
-        best_model = joblib.load(model_filename_rf)
-        best_model_name = 'Random Forest'
-        print(f"\nModelo '{RANDOM_FOREST_MODEL_NAME}' carregado com sucesso!")
-    else:
-        print(f"\nErro: Nenhum modelo foi encontrado em '{MODELS_DIR}'.")
-        print("Por favor, verifique se o notebook '04_model_training_evaluation.ipynb' foi executado para salvar o modelo.")
-    
-    return best_model, best_model_name
-
-def simulate_new_data(df_base):
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-06-15', '2024-06-18', '2024-06-21']),
+        'home_team': ['Brazil', 'Argentina', 'Germany'],
+        'away_team': ['France', 'Italy', 'Brazil'],
+        'home_score': [2, 1, 0],
+        'away_score': [1, 1, 2],
+        'tournament': ['Friendly', 'FIFA World Cup', 'Copa America'],
+        'city': ['Rio de Janeiro', 'Buenos Aires', 'Berlin'],
+        'country': ['Brazil', 'Argentina', 'Germany'],
+        'neutral': [False, True, False],
+    })
+
+def simulate_new_data(df_base, ratings=None, head_to_head=None, num_games=NUM_SIMULATED_GAMES, seed=None):
     """
-    Simula novos dados de jogos para monitoramento.
-    Usa dados existentes para garantir compatibilidade de categorias.
+    Simula novos dados de jogos para monitoramento com o gerador sintético (src/synthetic_data.py):
+    confrontos, torneios, locais, placares e datas seguem as frequências dos últimos
+    SIMULATION_RECENT_YEARS anos de df_base.
+    - ratings: RatingEngine com o estado atual; se None, usa o estado salvo ou o recalcula a partir de df_base.
+    - head_to_head: HeadToHeadIndex atual (com HEAD_TO_HEAD_ENABLED); se None, idem.
+    - seed: semente do gerador (None = jogos diferentes a cada execução).
     """
     print("\n--- Simulando Novos Dados de Jogos para Monitoramento ---")
 
     if df_base.empty:
         print("DataFrame base para simulação está vazio. Usando fallback para amostras.")
-        sample_teams = ['Brazil', 'Argentina', 'Germany', 'France', 'Italy']
-        sample_tournaments = ['Friendly', 'FIFA World Cup', 'Copa America']
-        sample_cities = ['Rio de Janeiro', 'Buenos Aires', 'Berlin']
-        sample_countries = ['Brazil', 'Argentina', 'Germany']
+        df_base = _fallback_matches()
+    since = pd.to_datetime(df_base['date']).max() - pd.DateOffset(years=SIMULATION_RECENT_YEARS)
+    generator = SyntheticMatchGenerator.from_matches(df_base, since=since)
+    df_new_games = generator.generate(num_games, np.random.default_rng(seed))
+
+    # Ratings e confronto direto de antes de cada jogo simulado, a partir do estado atual dos times
+    if ratings is None:
+        ratings = load_rating_state()
+    if ratings is None:
+        ratings = RatingEngine()
+        ratings.update(df_base)
+    if HEAD_TO_HEAD_ENABLED:
+        if head_to_head is None:
+            head_to_head = load_head_to_head_index()
+        if head_to_head is None:
+            head_to_head = HeadToHeadIndex()
+            head_to_head.update(df_base)
     else:
-        sample_teams = df_base['home_team'].unique()
-        sample_tournaments = df_base['tournament'].unique()
-        sample_cities = df_base['city'].unique()
-        sample_countries = df_base['country'].unique()
-
-        # Garantir que há dados suficientes para amostrar
-        if len(sample_teams) > 5: sample_teams = sample_teams[:5]
-        if len(sample_tournaments) > 3: sample_tournaments = sample_tournaments[:3]
-        if len(sample_cities) > 3: sample_cities = sample_cities[:3]
-        if len(sample_countries) > 3: sample_countries = sample_countries[:3]
-
-    new_data = {
-        'home_team': [np.random.choice(sample_teams) for _ in range(NUM_SIMULATED_GAMES)],
-        'away_team': [np.random.choice(sample_teams) for _ in range(NUM_SIMULATED_GAMES)],
-        'tournament': [np.random.choice(sample_tournaments) for _ in range(NUM_SIMULATED_GAMES)],
-        'city': [np.random.choice(sample_cities) for _ in range(NUM_SIMULATED_GAMES)],
-        'country': [np.random.choice(sample_countries) for _ in range(NUM_SIMULATED_GAMES)],
-        'neutral': [np.random.choice([True, False]) for _ in range(NUM_SIMULATED_GAMES)],
-        'year': [2024 for _ in range(NUM_SIMULATED_GAMES)],
-        'month': [np.random.randint(1, 13) for _ in range(NUM_SIMULATED_GAMES)],
-        'day_of_week': [np.random.randint(0, 7) for _ in range(NUM_SIMULATED_GAMES)],
-        'is_home_game': [np.random.choice([0, 1]) for _ in range(NUM_SIMULATED_GAMES)],
-        'goal_difference': [np.random.randint(-3, 4) for _ in range(NUM_SIMULATED_GAMES)],
-        'total_goals': [np.random.randint(0, 6) for _ in range(NUM_SIMULATED_GAMES)],
-        'result': [np.random.choice(['Home Win', 'Away Win', 'Draw']) for _ in range(NUM_SIMULATED_GAMES)]
-    }
-    df_new_games = pd.DataFrame(new_data)
+        head_to_head = None
+    df_new_games = add_match_features(df_new_games, ratings, head_to_head)
     print("\nNovos dados de jogos simulados:")
     print(df_new_games.head())
     return df_new_games
 
-def monitor_and_insight(model, model_name, df_new_games):
+def _plot_real_vs_predicted(results_melted):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    sns.countplot(x='Resultado do Jogo', hue='Tipo de Resultado', data=results_melted, palette={'Real': 'skyblue', 'Previsto': 'lightcoral'})
+    plt.title('Comparação de Resultados Reais vs. Previstos em Novos Jogos')
+    plt.xlabel('Resultado do Jogo')
+    plt.ylabel('Contagem')
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+@traced('Control')
+def monitor_and_insight(model, model_name, df_new_games, report=None, drift_monitor=None):
     """
     Realiza previsões em novos dados, avalia o desempenho e gera insights acionáveis.
+    - report: se informado (src.reporting.Report), a figura é salva em arquivo e as métricas vão para o resumo.
+    - drift_monitor: se informado (src.drift_monitor.DriftMonitor), os novos jogos são acrescentados aos seus
+      histogramas, os alertas de drift são emitidos e o estado é salvo.
     """
     if model is None or df_new_games is None or df_new_games.empty:
         print("\nNão foi possível realizar previsões ou gerar insights, pois o modelo ou os dados são inválidos.")
@@ -99,26 +102,36 @@ def monitor_and_insight(model, model_name, df_new_games):
     print("\nMatriz de Confusão (novos dados):")
     print(confusion_matrix(y_new, y_pred_new))
 
+    if drift_monitor is not None:
+        print("\n--- Monitor de Drift ---")
+        log_alerts(drift_monitor.update(X_new, y_pred_new, y_new))
+        drift_monitor.print_summary()
+        drift_monitor.save()
+
     print("\n--- Gerando Visualizações para Monitoramento ---")
     results_comparison = pd.DataFrame({'Real': y_new, 'Previsto': y_pred_new})
     results_melted = results_comparison.melt(var_name='Tipo de Resultado', value_name='Resultado do Jogo')
 
-    plt.figure(figsize=(10, 6))
-    sns.countplot(x='Resultado do Jogo', hue='Tipo de Resultado', data=results_melted, palette={'Real': 'skyblue', 'Previsto': 'lightcoral'})
-    plt.title('Comparação de Resultados Reais vs. Previstos em Novos Jogos')
-    plt.xlabel('Resultado do Jogo')
-    plt.ylabel('Contagem')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    show_figure(report, 'control_real_vs_predicted', _plot_real_vs_predicted, results_melted=results_melted)
+
+    if report is not None:
+        report.add_summary('control', {
+            'model_name': model_name,
+            'games': len(df_new_games),
+            'accuracy': accuracy_new,
+            'classification_report': classification_report(y_new, y_pred_new, zero_division=0, output_dict=True),
+        })
+        if drift_monitor is not None:
+            report.add_summary('drift', {'rows_seen': drift_monitor.rows_seen,
+                                         'rolling_accuracy': drift_monitor.rolling_accuracy()[0],
+                                         'active_alerts': sorted(drift_monitor.active_alerts),
+                                         'scores': drift_monitor.scores()})
 
     print("\n--- Insights Acionáveis e Conclusões para o 'Filho' ---")
     if model_name == 'Logistic Regression':
         print("\nAnálise dos Coeficientes da Regressão Logística (para insights):")
         
-        preprocessor_loaded = model.named_steps['preprocessor']
-        feature_names_transformed = list(NUMERICAL_COLS)
-        ohe_feature_names = preprocessor_loaded.named_transformers_['cat'].get_feature_names_out(CATEGORICAL_COLS)
-        feature_names_transformed.extend(ohe_feature_names)
+        feature_names_transformed = get_feature_names(model)
 
         if hasattr(model.named_steps['classifier'], 'coef_') and len(model.named_steps['classifier'].coef_.shape) > 1:
             coefficients = pd.Series(model.named_steps['classifier'].coef_[0], index=feature_names_transformed)
@@ -134,7 +147,7 @@ def monitor_and_insight(model, model_name, df_new_games):
         print("1. **Diferença de Gols (goal_difference):** Este é um dos fatores mais fortes. Quanto maior a diferença de gols a favor, maior a chance de vitória. Focar em marcar mais e sofrer menos é crucial.")
         print("2. **Total de Gols (total_goals):** O número total de gols na partida também tem um impacto. Jogos com mais gols podem indicar um estilo de jogo mais ofensivo, que pode ser benéfico para a vitória.")
         print("3. **Mando de Campo (is_home_game):** Jogar em casa geralmente confere uma vantagem significativa. O apoio da torcida e a familiaridade com o campo podem influenciar o desempenho.")
-        print("4. **Times Específicos:** Alguns times têm um impacto muito grande no resultado, seja por serem muito fortes (coeficientes positivos para 'home_team_Brazil', 'home_team_Germany') ou fracos (coeficientes negativos para 'away_team_Brazil', 'away_team_Germany'). Observar a qualidade do adversário é fundamental.")
+        print("4. **Força dos Times (ratings Elo e forma recente):** A diferença de Elo entre os times (elo_difference) e a forma nas últimas partidas (home_form, away_form) resumem a qualidade de cada seleção antes do jogo. Observar a qualidade do adversário é fundamental.")
         print("5. **Torneio:** O tipo de torneio também pode influenciar. Jogos de Copa do Mundo podem ter dinâmicas diferentes de amistosos.")
         print("\nLembre-se, esses são insights baseados em dados históricos. O futebol é dinâmico, mas entender esses padrões pode te dar uma vantagem na leitura do jogo e no seu próprio desenvolvimento!")
 
@@ -142,9 +155,7 @@ def monitor_and_insight(model, model_name, df_new_games):
         print("\n--- Recomendações para o 'Filho' (Baseado no Random Forest): ---")
         rf_classifier = model.named_steps['classifier']
         
-        preprocessor_loaded = model.named_steps['preprocessor']
-        ohe_feature_names = preprocessor_loaded.named_transformers_['cat'].get_feature_names_out(CATEGORICAL_COLS)
-        all_feature_names = NUMERICAL_COLS + list(ohe_feature_names)
+        all_feature_names = get_feature_names(model)
 
         feature_importances = pd.Series(rf_classifier.feature_importances_, index=all_feature_names)
         
@@ -164,13 +175,13 @@ def monitor_and_insight(model, model_name, df_new_games):
         print("Recomendações gerais: Foco em performance ofensiva (gols marcados), defensiva (gols sofridos) e a vantagem de jogar em casa.")
 
 if __name__ == '__main__':
-    from src.data_ingestion import load_raw_data
+    from src.data_ingestion import load_raw_data, load_data
     from src.data_preprocessing import preprocess_data
     from src.feature_engineering import engineer_features
     from src.config import ANALYZED_DATA_PATH
 
-    # Carregar dados base para simulação de novos dados
-    df_base_for_simulation = pd.read_csv(ANALYZED_DATA_PATH)
+    # Carregar dados base para simulação de novos dados (apenas as colunas usadas na amostragem)
+    df_base_for_simulation = load_data(ANALYZED_DATA_PATH, columns=MATCH_COLUMNS)
 
     best_model, best_model_name = load_model()
     df_new_games = simulate_new_data(df_base_for_simulation)
@@ -0,0 +1,240 @@
+# src/online_learning.py
+#
+# Modo de aprendizado online: em vez de retreinar tudo (train_models + save_model) a cada rodada de
+# partidas, um classificador linear (SGDClassifier com log loss) é atualizado com partial_fit apenas com as
+# partidas novas. O custo de uma atualização depende do tamanho do lote, não do histórico:
+# - as features são as mesmas dos modelos completos (NUMERICAL_COLS padronizadas e one-hot de
+#   CATEGORICAL_COLS); a padronização é ajustada uma vez, no ajuste inicial;
+# - as categorias crescem: valores novos (um torneio, uma cidade) ganham colunas com coeficiente zero, e os
+#   coeficientes já aprendidos continuam nas colunas das suas categorias;
+# - cada atualização grava um snapshot versionado em ONLINE_MODEL_DIR e passa a ser a versão atual;
+#   rollback volta a uma versão anterior sem apagar as demais.
+# Antes de aprender com um lote, o modelo é avaliado nele (avaliação prequencial: prever e depois treinar).
+#
+# Uso (a partir de projeto_futebol_preditivo_modular/):
+#     python -m src.online_learning update        # ajuste inicial, ou atualização com as partidas novas
+#     python -m src.online_learning status
+#     python -m src.online_learning rollback [--version N]
+
+import json
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import StandardScaler
+from src.config import (TARGET, NUMERICAL_COLS, CATEGORICAL_COLS, ONLINE_MODEL_DIR, ONLINE_ALPHA,
+                        ONLINE_BOOTSTRAP_EPOCHS, ONLINE_UPDATE_EPOCHS, ONLINE_MAX_SNAPSHOTS)
+from src.vocabulary import Vocabulary, VocabularyEncoder
+
+_STATE_FILE = 'online_state.json'
+
+def _match_key(df, row):
+    """
+    Identifica uma partida (data, mandante, visitante), para conferir onde o modelo parou.
+    """
+    return [str(pd.Timestamp(df['date'].iat[row]).date()), str(df['home_team'].iat[row]), str(df['away_team'].iat[row])]
+
+class OnlineModel:
+    """
+    Classificador linear atualizável com lotes de partidas (colunas de NUMERICAL_COLS, CATEGORICAL_COLS e
+    TARGET). Oferece predict, predict_proba e classes_, como os Pipelines dos modelos completos.
+    """
+
+    def __init__(self, alpha=ONLINE_ALPHA):
+        self.vocabulary = Vocabulary()
+        self.scaler = None
+        self.classifier = SGDClassifier(loss='log_loss', alpha=alpha, random_state=42)
+        self.feature_names = []
+        self.rows_seen = 0
+        self.last_match = None
+
+    @property
+    def classes_(self):
+        return self.classifier.classes_
+
+    def _encoder(self):
+        encoder = VocabularyEncoder([self.vocabulary.categories(col) for col in CATEGORICAL_COLS])
+        return encoder.fit(pd.DataFrame(columns=CATEGORICAL_COLS))
+
+    def _grow(self, df):
+        """
+        Acrescenta as categorias novas de df. Os coeficientes já aprendidos são levados para as posições
+        das suas colunas, e as colunas novas começam com coeficiente zero. Retorna quantas foram acrescentadas.
+        """
+        added = self.vocabulary.extend(df[CATEGORICAL_COLS])
+        if not added and self.feature_names:
+            return 0
+        feature_names = list(NUMERICAL_COLS) + list(self._encoder().get_feature_names_out(CATEGORICAL_COLS))
+        if hasattr(self.classifier, 'coef_'):
+            position = {name: i for i, name in enumerate(feature_names)}
+            old_positions = [position[name] for name in self.feature_names]
+            coef = np.zeros((self.classifier.coef_.shape[0], len(feature_names)))
+            coef[:, old_positions] = self.classifier.coef_
+            self.classifier.coef_ = coef
+            self.classifier.n_features_in_ = len(feature_names)
+        self.feature_names = feature_names
+        return added
+
+    def transform(self, df):
+        numerical = sp.csr_matrix(self.scaler.transform(df[NUMERICAL_COLS].to_numpy(dtype=np.float64)))
+        return sp.hstack([numerical, self._encoder().transform(df[CATEGORICAL_COLS])], format='csr')
+
+    def predict_proba(self, df):
+        return self.classifier.predict_proba(self.transform(pd.DataFrame(df)))
+
+    def predict(self, df):
+        return self.classifier.predict(self.transform(pd.DataFrame(df)))
+
+    def partial_fit(self, df, epochs=ONLINE_UPDATE_EPOCHS):
+        """
+        Atualiza o modelo com um lote de partidas (epochs passagens sobre o lote). No primeiro lote ajusta
+        também a padronização das colunas numéricas. Retorna o número de categorias novas.
+        """
+        added = self._grow(df)
+        if self.scaler is None:
+            self.scaler = StandardScaler().fit(df[NUMERICAL_COLS].to_numpy(dtype=np.float64))
+        X, y = self.transform(df), df[TARGET].to_numpy()
+        classes = None if hasattr(self.classifier, 'classes_') else np.unique(y)
+        for _ in range(epochs):
+            self.classifier.partial_fit(X, y, classes=classes)
+            classes = None
+        self.rows_seen += len(df)
+        self.last_match = _match_key(df, len(df) - 1)
+        return added
+
+    def new_rows(self, df):
+        """
+        Partidas de df (dados analisados, que só crescem no fim) ainda não vistas pelo modelo. Se o histórico
+        tiver mudado, usa as partidas posteriores à data da última partida vista.
+        """
+        if self.last_match is None:
+            return df
+        if self.rows_seen <= len(df) and _match_key(df, self.rows_seen - 1) == self.last_match:
+            return df.iloc[self.rows_seen:]
+        print("Histórico diferente do visto pelo modelo online; usando as partidas posteriores à última data vista.")
+        return df[pd.to_datetime(df['date']) > pd.Timestamp(self.last_match[0])]
+
+def _read_state(model_dir):
+    path = os.path.join(model_dir, _STATE_FILE)
+    if not os.path.exists(path):
+        return {'current': None, 'versions': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_state(model_dir, state):
+    path = os.path.join(model_dir, _STATE_FILE)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+def _snapshot_path(model_dir, version):
+    return os.path.join(model_dir, f'online_model_v{version:04d}.joblib')
+
+def save_snapshot(model, info, model_dir=ONLINE_MODEL_DIR):
+    """
+    Grava o modelo como uma nova versão e a torna a atual. Remove os snapshots mais antigos além de
+    ONLINE_MAX_SNAPSHOTS. Retorna o número da versão.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    state = _read_state(model_dir)
+    version = max([entry['version'] for entry in state['versions']], default=0) + 1
+    path = _snapshot_path(model_dir, version)
+    joblib.dump(model, f'{path}.tmp')
+    os.replace(f'{path}.tmp', path)
+    state['versions'].append({'version': version, 'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+                              'rows_seen': model.rows_seen, 'last_match': model.last_match, **info})
+    state['current'] = version
+    while len(state['versions']) > ONLINE_MAX_SNAPSHOTS:
+        oldest = next(entry for entry in state['versions'] if entry['version'] != state['current'])
+        state['versions'].remove(oldest)
+        if os.path.exists(_snapshot_path(model_dir, oldest['version'])):
+            os.remove(_snapshot_path(model_dir, oldest['version']))
+    _write_state(model_dir, state)
+    print(f"Modelo online salvo como versão {version} em: {path}")
+    return version
+
+def load_online_model(model_dir=ONLINE_MODEL_DIR, version=None):
+    """
+    Carrega a versão informada do modelo online (por padrão, a atual), ou None se não houver modelo.
+    """
+    version = _read_state(model_dir)['current'] if version is None else version
+    if version is None or not os.path.exists(_snapshot_path(model_dir, version)):
+        return None
+    return joblib.load(_snapshot_path(model_dir, version))
+
+def rollback(model_dir=ONLINE_MODEL_DIR, version=None):
+    """
+    Torna atual uma versão anterior do modelo online (por padrão, a anterior à atual). As versões mais novas
+    continuam gravadas. Retorna a versão atual após o rollback, ou None se não houver para onde voltar.
+    """
+    state = _read_state(model_dir)
+    versions = [entry['version'] for entry in state['versions']]
+    if version is None:
+        older = [v for v in versions if state['current'] is not None and v < state['current']]
+        version = older[-1] if older else None
+    if version not in versions:
+        print(f"Versão do modelo online indisponível para rollback (versões: {versions}).")
+        return None
+    state['current'] = version
+    _write_state(model_dir, state)
+    print(f"Modelo online revertido para a versão {version}.")
+    return version
+
+def update_online_model(df, model_dir=ONLINE_MODEL_DIR):
+    """
+    Atualiza o modelo online com as partidas de df (dados analisados) que ele ainda não viu, ou faz o
+    ajuste inicial com df inteiro se não houver modelo. Grava um snapshot se algo mudou.
+    Retorna o modelo atualizado.
+    """
+    print("\n--- Aprendizado Online ---")
+    model = load_online_model(model_dir)
+    if model is None:
+        model = OnlineModel()
+        start = time.perf_counter()
+        model.partial_fit(df, epochs=ONLINE_BOOTSTRAP_EPOCHS)
+        print(f"Ajuste inicial com {len(df)} partidas ({ONLINE_BOOTSTRAP_EPOCHS} passagens) "
+              f"em {time.perf_counter() - start:.2f}s.")
+        save_snapshot(model, {'batch_rows': len(df), 'bootstrap': True}, model_dir)
+        return model
+
+    batch = model.new_rows(df)
+    if batch.empty:
+        print(f"Nenhuma partida nova para o modelo online (última vista: {' '.join(model.last_match)}).")
+        return model
+    start = time.perf_counter()
+    # Avaliação prequencial: o lote é previsto antes de o modelo aprender com ele
+    batch_accuracy = accuracy_score(batch[TARGET], model.predict(batch))
+    added = model.partial_fit(batch)
+    print(f"Modelo online atualizado com {len(batch)} partidas em {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(acurácia no lote antes da atualização: {batch_accuracy:.4f}; {added} categorias novas).")
+    save_snapshot(model, {'batch_rows': len(batch), 'batch_accuracy': batch_accuracy, 'new_categories': added},
+                  model_dir)
+    return model
+
+if __name__ == '__main__':
+    import argparse
+    from src.config import ANALYZED_DATA_PATH
+    from src.data_ingestion import load_data
+
+    parser = argparse.ArgumentParser(description="Modelo online: atualização com partidas novas e rollback.")
+    parser.add_argument('command', choices=['update', 'status', 'rollback'])
+    parser.add_argument('--version', type=int, default=None, help="Versão de destino do rollback.")
+    parser.add_argument('--model-dir', default=ONLINE_MODEL_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'update':
+        df = load_data(ANALYZED_DATA_PATH)
+        if df is not None:
+            update_online_model(df, args.model_dir)
+    elif args.command == 'rollback':
+        rollback(args.model_dir, args.version)
+    else:
+        state = _read_state(args.model_dir)
+        for entry in state['versions']:
+            marker = '*' if entry['version'] == state['current'] else ' '
+            print(f"{marker} v{entry['version']:<4} {entry['created']}  {entry['rows_seen']:>7} partidas vistas, "
+                  f"lote de {entry['batch_rows']}, última: {' '.join(entry['last_match'])}")
@@ -0,0 +1,318 @@
+# src/prediction_service.py
+#
+# Serviço local de previsões (asyncio, HTTP sobre TCP ou socket Unix). O modelo é carregado uma única vez
+# e as requisições concorrentes são agrupadas em micro-lotes: o custo fixo de cada chamada ao modelo
+# (montagem do DataFrame, validação, pré-processamento) é pago uma vez por lote, e não por requisição.
+#
+# Endpoints:
+#   POST /predict  corpo JSON com uma partida (objeto) ou uma lista de partidas, com as colunas de FEATURES
+#                  (as de rating e de confronto direto podem faltar: vêm dos estados salvos pelo pipeline)
+#   GET  /metrics  contadores de requisições, partidas e lotes, latência p50/p99 e vazão
+#   GET  /health   verificação simples de disponibilidade
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.config import (FEATURES, NUMERICAL_COLS, CATEGORICAL_COLS, MODELS_DIR, SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_BATCH_SIZE, SERVICE_MAX_WAIT_MS,
+                        SERVICE_LATENCY_WINDOW)
+from src.scoring import load_scoring_model, predict, HistoryFeatures
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+def validate_matches(matches, optional=()):
+    """
+    Verifica as partidas de uma requisição antes de entrarem num lote: todas as colunas de FEATURES presentes,
+    numéricas conversíveis para float finito (NaN e infinito, aceitos pelo json do Python, são rejeitados) e
+    categóricas escalares JSON (texto, número, booleano ou null).
+    - optional: colunas que podem faltar ou ser null (as de histórico completadas por HistoryFeatures).
+    Levanta ValueError com a primeira partida inválida.
+    """
+    missing = sorted({col for match in matches for col in FEATURES if col not in match and col not in optional})
+    if missing:
+        raise ValueError(f"colunas ausentes: {missing}")
+    for i, match in enumerate(matches):
+        for col in NUMERICAL_COLS:
+            if col in optional and match.get(col) is None:
+                continue
+            try:
+                value = float(match[col])
+            except (TypeError, ValueError):
+                raise ValueError(f"partida {i}: '{col}' deve ser numérica, recebido {match[col]!r}") from None
+            if not math.isfinite(value):
+                raise ValueError(f"partida {i}: '{col}' deve ser um número finito, recebido {match[col]!r}")
+        for col in CATEGORICAL_COLS:
+            if match[col] is not None and not isinstance(match[col], (str, int, float, bool)):
+                raise ValueError(f"partida {i}: '{col}' deve ser um valor escalar, recebido {match[col]!r}")
+
+class ServiceMetrics:
+    """
+    Contadores do serviço. As latências (em ms, da chegada da requisição à resposta) ficam numa janela
+    das últimas SERVICE_LATENCY_WINDOW requisições, usada para calcular p50 e p99.
+    """
+
+    def __init__(self, latency_window=SERVICE_LATENCY_WINDOW):
+        self.started_at = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.matches = 0
+        self.batches = 0
+        self.latencies_ms = deque(maxlen=latency_window)
+
+    def record_request(self, num_matches, latency_ms):
+        self.requests += 1
+        self.matches += num_matches
+        self.latencies_ms.append(latency_ms)
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started_at
+        latencies = np.fromiter(self.latencies_ms, dtype=np.float64)
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (None, None)
+        return {
+            'uptime_seconds': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'matches': self.matches,
+            'batches': self.batches,
+            'mean_batch_size': self.matches / self.batches if self.batches else None,
+            'latency_p50_ms': p50,
+            'latency_p99_ms': p99,
+            'requests_per_second': self.requests / uptime if uptime else None,
+            'matches_per_second': self.matches / uptime if uptime else None,
+        }
+
+class MicroBatcher:
+    """
+    Agrupa as partidas de requisições concorrentes em lotes de até max_batch_size partidas.
+    Um lote é fechado quando atinge o tamanho máximo ou quando max_wait_ms se passou desde a chegada
+    da primeira requisição do lote. O modelo roda numa thread separada, então o loop de eventos continua
+    recebendo requisições (e montando o próximo lote) enquanto o lote atual é pontuado.
+    """
+
+    def __init__(self, model, metrics, max_batch_size=SERVICE_MAX_BATCH_SIZE, max_wait_ms=SERVICE_MAX_WAIT_MS,
+                 history=None):
+        self.model = model
+        self.metrics = metrics
+        self.history = history
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._worker = None
+
+    def start(self):
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._executor.shutdown()
+
+    async def submit(self, matches):
+        """
+        Enfileira as partidas de uma requisição e aguarda as suas previsões.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((matches, future))
+        return await future
+
+    def _score(self, matches):
+        return predict(self.model, matches, self.history).to_dict(orient='records')
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            batch_size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while batch_size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                pending.append(item)
+                batch_size += len(item[0])
+
+            matches = [match for request_matches, _ in pending for match in request_matches]
+            try:
+                predictions = await loop.run_in_executor(self._executor, self._score, matches)
+            except Exception as e:
+                # Lote com erro: cada requisição é pontuada sozinha, para que só a inválida receba a exceção
+                if len(pending) == 1:
+                    self._set_exception(pending[0][1], e)
+                else:
+                    await self._score_separately(pending)
+                continue
+            self.metrics.batches += 1
+
+            start = 0
+            for request_matches, future in pending:
+                end = start + len(request_matches)
+                if not future.done():
+                    future.set_result(predictions[start:end])
+                start = end
+
+    async def _score_separately(self, pending):
+        loop = asyncio.get_running_loop()
+        for request_matches, future in pending:
+            try:
+                predictions = await loop.run_in_executor(self._executor, self._score, request_matches)
+            except Exception as e:
+                self._set_exception(future, e)
+                continue
+            self.metrics.batches += 1
+            if not future.done():
+                future.set_result(predictions)
+
+    @staticmethod
+    def _set_exception(future, exception):
+        if not future.done():
+            future.set_exception(exception)
+
+def _parse_head(head):
+    """
+    Linha de requisição e cabeçalhos de uma requisição HTTP. Levanta ValueError se estiverem malformados.
+    """
+    request_line, *header_lines = head.decode('latin-1').split('\r\n')
+    parts = request_line.split(' ', 2)
+    if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+        raise ValueError(f"linha de requisição inválida: {request_line[:100]!r}")
+    headers = {}
+    for line in header_lines:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    content_length = headers.get('content-length', '0')
+    if not (content_length.isascii() and content_length.isdigit()):
+        raise ValueError(f"Content-Length inválido: {content_length[:100]!r}")
+    return (*parts, headers)
+
+def _write_response(writer, status, response, keep_alive):
+    payload = json.dumps(response).encode('utf-8')
+    writer.write(f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+                 f'Content-Type: application/json\r\n'
+                 f'Content-Length: {len(payload)}\r\n'
+                 f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1')
+                 + payload)
+
+class PredictionService:
+    """
+    Servidor HTTP/1.1 mínimo (com keep-alive) sobre asyncio, que encaminha as requisições ao MicroBatcher.
+    - history: HistoryFeatures com os estados salvos, para aceitar partidas sem as features de histórico.
+    """
+
+    def __init__(self, model, max_batch_size=SERVICE_MAX_BATCH_SIZE, max_wait_ms=SERVICE_MAX_WAIT_MS, history=None):
+        self.metrics = ServiceMetrics()
+        self.history = history
+        self.batcher = MicroBatcher(model, self.metrics, max_batch_size, max_wait_ms, history)
+
+    async def _handle_predict(self, body):
+        payload = json.loads(body)
+        matches = [payload] if isinstance(payload, dict) else payload
+        if not isinstance(matches, list) or not matches or not all(isinstance(m, dict) for m in matches):
+            raise ValueError("o corpo deve ser uma partida (objeto JSON) ou uma lista não vazia de partidas")
+        # Validado antes de entrar no lote, para que uma requisição inválida não derrube as demais do mesmo lote
+        validate_matches(matches, self.history.columns if self.history is not None else ())
+        predictions = await self.batcher.submit(matches)
+        return matches, {'predictions': predictions}
+
+    async def _dispatch(self, method, path, body):
+        if path == '/predict':
+            if method != 'POST':
+                return 405, {'error': 'use POST'}, 0
+            try:
+                matches, response = await self._handle_predict(body)
+            except (ValueError, KeyError) as e:
+                return 400, {'error': str(e)}, 0
+            return 200, response, len(matches)
+        if path == '/metrics' and method == 'GET':
+            return 200, self.metrics.snapshot(), 0
+        if path == '/health' and method == 'GET':
+            return 200, {'status': 'ok'}, 0
+        return 404, {'error': f'rota desconhecida: {method} {path}'}, 0
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                received_at = time.perf_counter()
+                try:
+                    method, path, version, headers = _parse_head(head)
+                except ValueError as e:
+                    # Requisição malformada: responde 400 e fecha, pois o fim do corpo é desconhecido
+                    self.metrics.errors += 1
+                    _write_response(writer, 400, {'error': str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                try:
+                    body = await reader.readexactly(int(headers.get('content-length', 0)))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                try:
+                    status, response, num_matches = await self._dispatch(method, path, body)
+                except Exception as e:
+                    status, response, num_matches = 500, {'error': str(e)}, 0
+                if status == 200 and path == '/predict':
+                    self.metrics.record_request(num_matches, (time.perf_counter() - received_at) * 1000)
+                elif status != 200:
+                    self.metrics.errors += 1
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                _write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT, unix_socket=None):
+        """
+        Inicia o serviço em host:port ou, se unix_socket for informado, no socket Unix indicado.
+        """
+        self.batcher.start()
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+            address = unix_socket
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            address = f'http://{host}:{port}'
+        print(f"Serviço de previsões disponível em {address} "
+              f"(lotes de até {self.batcher.max_batch_size} partidas, espera máxima de {self.batcher.max_wait * 1000:g} ms).")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serviço local de previsões com micro-lotes.")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--unix-socket', help="Escuta num socket Unix em vez de TCP.")
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="Diretório dos modelos salvos.")
+    parser.add_argument('--max-batch-size', type=int, default=SERVICE_MAX_BATCH_SIZE,
+                        help="Número máximo de partidas por lote.")
+    parser.add_argument('--max-wait-ms', type=float, default=SERVICE_MAX_WAIT_MS,
+                        help="Tempo máximo (ms) de espera para completar um lote.")
+    parser.add_argument('--mmap', action='store_true', help="Carrega o modelo com memória mapeada.")
+    args = parser.parse_args()
+
+    model = load_scoring_model(args.models_dir, mmap_mode='r' if args.mmap else None)
+    if model is not None:
+        service = PredictionService(model, args.max_batch_size, args.max_wait_ms, HistoryFeatures.load())
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+        except KeyboardInterrupt:
+            print("\nServiço encerrado.")
@@ -0,0 +1,244 @@
+# src/profiling.py
+#
+# Instrumentação dos estágios do projeto (load_raw_data, preprocess_data, engineer_features, train_models,
+# evaluate_model, monitor_and_insight), para encontrar regressões de desempenho e dimensionar workers.
+# - Os estágios são decorados com @traced(fase). Sem rastreamento ativo, o decorador só verifica uma
+#   variável global e chama a função: o custo é desprezível.
+# - Com enable_tracing, cada chamada gera um registro JSON (anexado a PROFILE_TRACE_PATH) com o tempo de
+#   parede, o tempo de CPU do processo, a memória residente no início, no fim e no pico (amostrada a cada
+#   PROFILE_SAMPLE_INTERVAL segundos por uma thread) e as linhas de entrada e saída (DataFrames).
+#   Estágios aninhados (ex.: preprocess_data por bloco no streaming) registram o estágio pai e a profundidade.
+# - Com profile_path, a mesma thread amostra a pilha Python da thread rastreada e, ao final, grava as pilhas
+#   agregadas no formato "folded" (a;b;c contagem), lido por flamegraph.pl, speedscope ou inferno.
+# Os estágios só são rastreados na thread que ativou o rastreamento; em outras threads e em processos de
+# trabalho, a função é chamada diretamente.
+#
+# Uso: python main.py --trace [arquivo.jsonl] [--profile]
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+import pandas as pd
+from src.config import PROFILE_TRACE_PATH, PROFILE_SAMPLE_INTERVAL
+
+_tracer = None
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def current_rss_bytes():
+    """
+    Memória residente atual do processo (Linux: /proc/self/statm). Em outros sistemas POSIX, o pico até
+    agora (ru_maxrss), que é o melhor disponível sem dependências extras; sem o módulo resource (Windows), 0.
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+def _count_rows(value):
+    """
+    Linhas de um DataFrame/Series (None para outros valores).
+    """
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+class Tracer:
+    """
+    Registra as chamadas dos estágios (ver traced) em trace_path e, com profile_path, amostra as pilhas
+    para um flame graph. Use enable_tracing/disable_tracing.
+    """
+
+    def __init__(self, trace_path=PROFILE_TRACE_PATH, profile_path=None, sample_interval=PROFILE_SAMPLE_INTERVAL):
+        self.trace_path = trace_path
+        self.profile_path = profile_path
+        self.sample_interval = sample_interval
+        self.run_id = pd.Timestamp.now().isoformat(timespec='seconds')
+        self.thread_id = threading.get_ident()
+        self.records = []
+        self.stacks = Counter()
+        self._open_stages = [] # Pilha de estágios em execução: [nome, pico de memória]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._file = None
+        self._start = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.trace_path) or '.', exist_ok=True)
+        self._file = open(self.trace_path, 'a', encoding='utf-8')
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name='profiling-sampler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def _sample(self):
+        """
+        Executada na thread de amostragem: atualiza o pico de memória dos estágios abertos e, com o perfil
+        ativado, conta a pilha atual da thread rastreada.
+        """
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss_bytes()
+            with self._lock:
+                for stage in self._open_stages:
+                    stage[1] = max(stage[1], rss)
+                stage_names = [stage[0] for stage in self._open_stages]
+            if self.profile_path is None:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                if code not in _WRAPPER_CODES: # O wrapper de traced não aparece no flame graph
+                    frames.append(f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(frames[::-1])] += 1
+            elif stage_names:
+                self.stacks[';'.join(stage_names)] += 1
+
+    def call(self, func, phase, args, kwargs):
+        """
+        Executa um estágio registrando tempo, CPU, memória e linhas.
+        """
+        name = func.__qualname__
+        rss_start = current_rss_bytes()
+        with self._lock:
+            parent = self._open_stages[-1][0] if self._open_stages else None
+            depth = len(self._open_stages)
+            stage = [name, rss_start]
+            self._open_stages.append(stage)
+        rows_in = next((rows for rows in map(_count_rows, (*args, *kwargs.values())) if rows is not None), None)
+        started = pd.Timestamp.now().isoformat(timespec='milliseconds')
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result, error = None, None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except BaseException as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_end = current_rss_bytes()
+            with self._lock:
+                self._open_stages.remove(stage)
+                peak = max(stage[1], rss_end)
+                # O pico do estágio também é pico do estágio pai
+                if self._open_stages:
+                    self._open_stages[-1][1] = max(self._open_stages[-1][1], peak)
+            rows_out = _count_rows(result)
+            rows = rows_in if rows_in is not None else rows_out
+            self._write({'run_id': self.run_id, 'stage': name, 'phase': phase, 'parent': parent, 'depth': depth,
+                         'start': started, 'wall_s': wall, 'cpu_s': cpu, 'rows_in': rows_in, 'rows_out': rows_out,
+                         'rows_per_s': rows / wall if rows and wall > 0 else None,
+                         'rss_start_mb': rss_start / 2**20, 'rss_end_mb': rss_end / 2**20,
+                         'peak_rss_mb': peak / 2**20, 'peak_delta_mb': (peak - rss_start) / 2**20,
+                         'error': error})
+
+    def _write(self, record):
+        self.records.append(record)
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush() # Execuções interrompidas mantêm os estágios já concluídos
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self._file.close()
+        if self.profile_path is not None:
+            os.makedirs(os.path.dirname(self.profile_path) or '.', exist_ok=True)
+            with open(self.profile_path, 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f'{stack} {count}\n')
+        return self
+
+    def summary(self):
+        """
+        Totais por estágio: chamadas, tempo de parede e de CPU, maior pico de memória e vazão.
+        """
+        if not self.records:
+            return pd.DataFrame()
+        records = pd.DataFrame(self.records)
+        # Estágios sem DataFrame de entrada (ex.: load_raw_data) contam as linhas produzidas
+        records['rows'] = records['rows_in'].fillna(records['rows_out'])
+        summary = records.groupby(['phase', 'stage'], sort=False).agg(
+            calls=('stage', 'size'), wall_s=('wall_s', 'sum'), cpu_s=('cpu_s', 'sum'),
+            peak_rss_mb=('peak_rss_mb', 'max'), peak_delta_mb=('peak_delta_mb', 'max'),
+            rows=('rows', 'sum'))
+        summary['rows_per_s'] = summary['rows'] / summary['wall_s']
+        return summary
+
+    def print_summary(self):
+        print(f"\n--- Instrumentação dos Estágios ({time.perf_counter() - self._start:.2f}s no total) ---")
+        summary = self.summary()
+        if summary.empty:
+            print("Nenhum estágio instrumentado foi executado.")
+        else:
+            print(summary.to_string(float_format=lambda value: f'{value:,.2f}'))
+        print(f"Registros dos estágios anexados em: {self.trace_path}")
+        if self.profile_path is not None:
+            print(f"Perfil (pilhas agregadas, {sum(self.stacks.values())} amostras) salvo em: {self.profile_path}")
+
+def enable_tracing(trace_path=PROFILE_TRACE_PATH, profile_path=None, sample_interval=PROFILE_SAMPLE_INTERVAL):
+    """
+    Ativa o rastreamento dos estágios na thread atual. Com profile_path (ex.: PROFILE_FOLDED_PATH),
+    também amostra as pilhas para um flame graph. Retorna o Tracer.
+    """
+    global _tracer
+    if _tracer is not None:
+        disable_tracing()
+    _tracer = Tracer(trace_path, profile_path, sample_interval).start()
+    return _tracer
+
+def disable_tracing(verbose=True):
+    """
+    Desativa o rastreamento, grava o perfil (se ativado) e imprime o resumo. Retorna o Tracer (ou None).
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.stop()
+        if verbose:
+            tracer.print_summary()
+    return tracer
+
+def traced(phase):
+    """
+    Decorador dos estágios: registra cada chamada quando o rastreamento está ativo (fase DMAIC em phase).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def traced_call(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None or threading.get_ident() != tracer.thread_id:
+                return func(*args, **kwargs)
+            return tracer.call(func, phase, args, kwargs)
+        return traced_call
+    return decorator
+
+_WRAPPER_CODES = {traced(None)(lambda: None).__code__, Tracer.call.__code__}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resumo de um arquivo de registros dos estágios.")
+    parser.add_argument('trace', nargs='?', default=PROFILE_TRACE_PATH)
+    parser.add_argument('--run', default=None, help="run_id da execução (padrão: a última).")
+    args = parser.parse_args()
+
+    records = pd.read_json(args.trace, lines=True, dtype={'run_id': str})
+    run_id = args.run or records['run_id'].iloc[-1]
+    run = records[records['run_id'] == run_id]
+    print(f"Execução {run_id}: {len(run)} chamadas de estágios")
+    columns = ['phase', 'stage', 'depth', 'wall_s', 'cpu_s', 'rows_in', 'rows_out', 'rows_per_s', 'peak_rss_mb',
+               'peak_delta_mb']
+    print(run[columns].to_string(index=False, float_format=lambda value: f'{value:,.2f}'))
@@ -0,0 +1,249 @@
+# src/ratings.py
+#
+# Ratings das seleções (Elo e forma recente) calculados antes de cada partida, numa única passagem
+# cronológica. O estado de cada time fica em arrays compactos indexados pelo id do time (rating Elo,
+# pontos das últimas RATING_FORM_WINDOW partidas num buffer circular e número de partidas jogadas),
+# então o motor pode ser salvo e retomado quando novas partidas chegam, sem reprocessar o histórico.
+#
+# Features geradas (RATING_FEATURES), sempre com o estado anterior à partida (sem vazamento do resultado):
+#   home_elo, away_elo: rating Elo de cada time
+#   elo_difference:     home_elo - away_elo, mais a vantagem de mando quando o jogo não é em campo neutro
+#   home_form, away_form: média de pontos (3/1/0) nas últimas RATING_FORM_WINDOW partidas de cada time
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.config import (RATING_STATE_PATH, RATING_INITIAL, RATING_K_FACTOR, RATING_HOME_ADVANTAGE,
+                        RATING_FORM_WINDOW, RATING_FORM_DEFAULT, RATING_FEATURES)
+
+def _margin_multiplier(goal_margin):
+    """
+    Peso da diferença de gols na atualização do Elo (como no World Football Elo Ratings).
+    """
+    if goal_margin <= 1:
+        return 1.0
+    if goal_margin == 2:
+        return 1.5
+    return (11 + goal_margin) / 8
+
+def _team_codes(teams):
+    """
+    Códigos das linhas de uma coluna de times, os nomes indexados pelos códigos e os nomes presentes na
+    ordem de aparição, sem criar um objeto Python por linha (as categorias, quando a coluna é categórica).
+    """
+    if isinstance(teams.dtype, pd.CategoricalDtype):
+        codes = teams.cat.codes.to_numpy()
+        present = pd.unique(codes)
+        names = np.asarray(teams.cat.categories, dtype=object)
+        return codes, names, names[present[present >= 0]]
+    codes, names = pd.factorize(teams)
+    names = np.asarray(names, dtype=object)
+    return codes, names, names
+
+class RatingEngine:
+    """
+    Motor incremental de ratings. update() processa partidas em ordem cronológica, devolvendo as features
+    de antes de cada partida e atualizando o estado; fixture_features() consulta o estado atual para
+    partidas futuras, sem alterá-lo.
+    """
+
+    def __init__(self, initial_rating=RATING_INITIAL, k_factor=RATING_K_FACTOR,
+                 home_advantage=RATING_HOME_ADVANTAGE, form_window=RATING_FORM_WINDOW):
+        self.initial_rating = float(initial_rating)
+        self.k_factor = float(k_factor)
+        self.home_advantage = float(home_advantage)
+        self.form_window = int(form_window)
+        self.teams = []
+        self.team_ids = {}
+        self.elo = np.empty(0, dtype=np.float64)
+        self.form_points = np.empty((0, self.form_window), dtype=np.int8)
+        self.matches_played = np.empty(0, dtype=np.int32)
+        self.last_date = None
+
+    @property
+    def params(self):
+        return {'initial_rating': self.initial_rating, 'k_factor': self.k_factor,
+                'home_advantage': self.home_advantage, 'form_window': self.form_window}
+
+    def _register_teams(self, names):
+        """
+        Atribui ids aos times ainda não vistos (na ordem de aparição) e aumenta os arrays de estado.
+        """
+        new_teams = [team for team in pd.unique(np.asarray(names, dtype=object)) if team not in self.team_ids]
+        if not new_teams:
+            return
+        for team in new_teams:
+            self.team_ids[team] = len(self.teams)
+            self.teams.append(team)
+        num_new = len(new_teams)
+        self.elo = np.concatenate([self.elo, np.full(num_new, self.initial_rating)])
+        self.form_points = np.vstack([self.form_points, np.zeros((num_new, self.form_window), dtype=np.int8)])
+        self.matches_played = np.concatenate([self.matches_played, np.zeros(num_new, dtype=np.int32)])
+
+    def _ids(self, names):
+        return pd.Index(self.teams).get_indexer(np.asarray(names, dtype=object))
+
+    @property
+    def _id_dtype(self):
+        """
+        Tipo dos ids por partida: int16 enquanto couberem.
+        """
+        return np.int16 if len(self.teams) < 2**15 else np.int32
+
+    def _form(self, team_ids):
+        """
+        Média de pontos nas últimas partidas de cada time (RATING_FORM_DEFAULT sem partidas anteriores).
+        """
+        played = np.minimum(self.matches_played[team_ids], self.form_window)
+        total = self.form_points[team_ids].sum(axis=1)
+        return np.divide(total, played, out=np.full(len(team_ids), RATING_FORM_DEFAULT), where=played > 0)
+
+    def update(self, df):
+        """
+        Calcula as features de rating de antes de cada partida de df (colunas date, home_team, away_team,
+        home_score, away_score, neutral) e atualiza o estado com os resultados. As partidas são processadas
+        em ordem de data (estável); não podem ser anteriores à última data já processada.
+        Retorna um DataFrame com as colunas de RATING_FEATURES, alinhado ao índice de df.
+        """
+        dates = (df['date'] if pd.api.types.is_datetime64_dtype(df['date']) else pd.to_datetime(df['date'])).to_numpy()
+        if len(df) == 0:
+            return pd.DataFrame({col: np.empty(0, dtype=np.float32) for col in RATING_FEATURES}, index=df.index)
+        if self.last_date is not None and dates.min() < self.last_date:
+            raise ValueError(f"Partidas anteriores à última data processada pelos ratings ({self.last_date}).")
+
+        # Ordem cronológica estável; o histórico já costuma vir ordenado, e então nenhuma permutação é criada
+        rows = range(len(df)) if (dates[1:] >= dates[:-1]).all() else memoryview(np.argsort(dates, kind='stable'))
+        home_codes, home_names, home_present = _team_codes(df['home_team'])
+        away_codes, away_names, away_present = _team_codes(df['away_team'])
+        self._register_teams(np.concatenate([home_present, away_present]))
+        # Código -1 (time ausente) -> id -1
+        home_ids = np.append(self._ids(home_names), -1).astype(self._id_dtype)[home_codes]
+        away_ids = np.append(self._ids(away_names), -1).astype(self._id_dtype)[away_codes]
+        margins = df['home_score'].to_numpy() - df['away_score'].to_numpy() # Na largura dos placares (ex.: int16)
+        neutral = df['neutral'].to_numpy(bool)
+
+        # O laço lê e escreve os arrays tipados por memoryview (acesso escalar rápido, sem criar um objeto
+        # Python por partida) e grava as features direto na posição da linha em df
+        window = self.form_window
+        self.form_points = np.ascontiguousarray(self.form_points)
+        form_sum = self.form_points.sum(axis=1, dtype=np.int64)
+        features = {col: np.empty(len(df), dtype=np.float32) for col in RATING_FEATURES}
+        elo, played, points_ring, form_total = (memoryview(self.elo), memoryview(self.matches_played),
+                                                memoryview(self.form_points.reshape(-1)), memoryview(form_sum))
+        out_home_elo, out_away_elo, out_home_form, out_away_form = (
+            memoryview(features[col]) for col in ('home_elo', 'away_elo', 'home_form', 'away_form'))
+        homes, aways, match_margins, is_neutral = map(memoryview, (home_ids, away_ids, margins, neutral))
+        k_factor, home_advantage = self.k_factor, self.home_advantage
+        for row in rows:
+            h, a, margin = homes[row], aways[row], match_margins[row]
+            elo_h, elo_a, played_h, played_a = elo[h], elo[a], played[h], played[a]
+            out_home_elo[row] = elo_h
+            out_away_elo[row] = elo_a
+            out_home_form[row] = form_total[h] / min(played_h, window) if played_h else RATING_FORM_DEFAULT
+            out_away_form[row] = form_total[a] / min(played_a, window) if played_a else RATING_FORM_DEFAULT
+
+            advantage = 0.0 if is_neutral[row] else home_advantage
+            expected_home = 1.0 / (1.0 + 10.0 ** ((elo_a - elo_h - advantage) / 400.0))
+            if margin > 0:
+                actual_home, home_points, away_points = 1.0, 3, 0
+            elif margin < 0:
+                actual_home, home_points, away_points = 0.0, 0, 3
+            else:
+                actual_home, home_points, away_points = 0.5, 1, 1
+            delta = k_factor * _margin_multiplier(abs(margin)) * (actual_home - expected_home)
+            elo[h] = elo_h + delta
+            elo[a] = elo_a - delta
+
+            # Forma: o ponto mais antigo do buffer circular de cada time dá lugar ao desta partida
+            slot = h * window + played_h % window
+            form_total[h] += home_points - points_ring[slot]
+            points_ring[slot] = home_points
+            played[h] = played_h + 1
+            slot = a * window + played_a % window
+            form_total[a] += away_points - points_ring[slot]
+            points_ring[slot] = away_points
+            played[a] = played_a + 1
+        self.last_date = dates[rows[-1]]
+
+        np.subtract(features['home_elo'], features['away_elo'], out=features['elo_difference'])
+        features['elo_difference'][~neutral] += home_advantage
+        return pd.DataFrame(features, index=df.index, copy=False)[RATING_FEATURES]
+
+    def fixture_features(self, home_teams, away_teams, neutral=True):
+        """
+        Features de rating para partidas futuras, a partir do estado atual (sem atualizá-lo).
+        Times desconhecidos recebem o rating inicial e a forma padrão.
+        """
+        home_ids, away_ids = self._ids(home_teams), self._ids(away_teams)
+
+        def lookup(ids):
+            known = ids >= 0
+            elo = np.full(len(ids), self.initial_rating)
+            form = np.full(len(ids), RATING_FORM_DEFAULT)
+            elo[known] = self.elo[ids[known]]
+            form[known] = self._form(ids[known])
+            return elo, form
+
+        home_elo, home_form = lookup(home_ids)
+        away_elo, away_form = lookup(away_ids)
+        advantage = np.where(np.broadcast_to(np.asarray(neutral, dtype=bool), home_elo.shape), 0.0, self.home_advantage)
+        return pd.DataFrame({'home_elo': home_elo, 'away_elo': away_elo,
+                             'elo_difference': home_elo - away_elo + advantage,
+                             'home_form': home_form, 'away_form': away_form})[RATING_FEATURES]
+
+    def save(self, path=RATING_STATE_PATH):
+        """
+        Salva o estado (arrays por time e parâmetros) num arquivo .npz.
+        """
+        metadata = {**self.params,
+                    'last_date': None if self.last_date is None else str(pd.Timestamp(self.last_date).date())}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, teams=np.array(self.teams, dtype=str), elo=self.elo, form_points=self.form_points,
+                     matches_played=self.matches_played, metadata=np.array(json.dumps(metadata)))
+        print(f"Estado dos ratings salvo em: {path} ({len(self.teams)} times, até {metadata['last_date']}).")
+        return path
+
+    @classmethod
+    def load(cls, path=RATING_STATE_PATH):
+        with np.load(path, allow_pickle=False) as state:
+            metadata = json.loads(str(state['metadata']))
+            engine = cls(metadata['initial_rating'], metadata['k_factor'], metadata['home_advantage'],
+                         metadata['form_window'])
+            engine.teams = state['teams'].tolist()
+            engine.elo = state['elo']
+            engine.form_points = state['form_points']
+            engine.matches_played = state['matches_played']
+        engine.team_ids = {team: i for i, team in enumerate(engine.teams)}
+        if metadata['last_date'] is not None:
+            engine.last_date = np.datetime64(metadata['last_date'], 'ns')
+        return engine
+
+def load_rating_state(path=RATING_STATE_PATH):
+    """
+    Carrega o motor de ratings salvo, ou None se o estado não existir ou tiver sido gerado com
+    parâmetros diferentes dos atuais de config.py.
+    """
+    if not os.path.exists(path):
+        return None
+    engine = RatingEngine.load(path)
+    if engine.params != RatingEngine().params:
+        print("Estado dos ratings gerado com parâmetros diferentes dos atuais; ignorado.")
+        return None
+    return engine
+
+if __name__ == '__main__':
+    import time
+    from src.config import CLEANED_DATA_PATH
+    from src.data_ingestion import load_data
+
+    df_cleaned = load_data(CLEANED_DATA_PATH)
+    engine = RatingEngine()
+    start = time.perf_counter()
+    engine.update(df_cleaned)
+    print(f"{len(df_cleaned)} partidas processadas em {time.perf_counter() - start:.3f}s.")
+    ranking = pd.Series(engine.elo, index=engine.teams).sort_values(ascending=False)
+    print("\nMaiores ratings Elo:")
+    print(ranking.head(10).round(1).to_string())
+    engine.save()
@@ -0,0 +1,112 @@
+# src/reporting.py
+#
+# Modo relatório (headless): em vez de abrir janelas com plt.show(), as figuras são renderizadas
+# fora da tela, em paralelo num pool de processos, e salvas como imagens; as estatísticas impressas
+# pelas fases são reunidas num resumo em JSON.
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from src.config import REPORT_DIR, REPORT_MAX_PLOT_ROWS, REPORT_MAX_WORKERS, REPORT_FIGURE_DPI
+
+def downsample_for_plot(df, max_rows=REPORT_MAX_PLOT_ROWS, random_state=42):
+    """
+    Retorna uma amostra aleatória de max_rows linhas quando o DataFrame é maior que isso,
+    para que o custo de desenhar histogramas e boxplots não cresça com o volume de dados.
+    """
+    if max_rows is None or len(df) <= max_rows:
+        return df
+    return df.sample(n=max_rows, random_state=random_state)
+
+def _render_to_file(path, draw_func, data, dpi):
+    """
+    Executada nos processos do pool: desenha a figura com o backend 'Agg' (sem tela) e a salva em disco.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    draw_func(**data)
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close('all')
+    return path
+
+def _to_json_compatible(value):
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return value.to_dict()
+    return str(value)
+
+class Report:
+    """
+    Coleta as figuras e estatísticas de uma execução e as grava em output_dir.
+    Cada figura é enviada ao pool de processos assim que é adicionada, então a renderização
+    acontece em paralelo com o restante do pipeline e nunca o bloqueia.
+    """
+
+    def __init__(self, output_dir=REPORT_DIR, max_workers=REPORT_MAX_WORKERS, dpi=REPORT_FIGURE_DPI):
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.dpi = dpi
+        self.summary = {}
+        self._futures = {}
+        self._executor = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def add_figure(self, name, draw_func, **data):
+        """
+        Agenda a renderização de uma figura. draw_func deve ser uma função de módulo (serializável)
+        que desenha a figura corrente a partir dos argumentos em data.
+        """
+        if self._executor is None:
+            # 'spawn' evita herdar threads (BLAS, joblib) do processo principal via fork
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        path = os.path.join(self.output_dir, f'{name}.png')
+        self._futures[name] = self._executor.submit(_render_to_file, path, draw_func, data, self.dpi)
+
+    def add_summary(self, section, values):
+        """
+        Registra estatísticas de uma seção (ex.: 'analyze', 'evaluate') no resumo em JSON.
+        """
+        self.summary.setdefault(section, {}).update(values)
+
+    def render(self):
+        """
+        Aguarda a renderização de todas as figuras e grava o resumo. Retorna o caminho do resumo.
+        """
+        figures = {}
+        for name, future in self._futures.items():
+            try:
+                figures[name] = os.path.relpath(future.result(), self.output_dir)
+            except Exception as e:
+                print(f"Erro ao renderizar a figura '{name}': {e}")
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        summary_path = os.path.join(self.output_dir, 'summary.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump({'figures': figures, **self.summary}, f, indent=2, ensure_ascii=False,
+                      default=_to_json_compatible)
+        print(f"\nRelatório gravado em '{self.output_dir}': {len(figures)} figuras e resumo em {os.path.basename(summary_path)}.")
+        return summary_path
+
+def show_figure(report, name, draw_func, **data):
+    """
+    No modo interativo (report=None) desenha a figura e a exibe com plt.show();
+    no modo relatório, agenda sua renderização em arquivo.
+    """
+    if report is not None:
+        report.add_figure(name, draw_func, **data)
+        return
+    import matplotlib.pyplot as plt
+
+    draw_func(**data)
+    plt.show()
@@ -0,0 +1,153 @@
+# src/scoring.py
+#
+# Ponto de entrada leve para previsões: carrega o modelo salvo e pontua partidas sem importar
+# as bibliotecas de visualização (matplotlib/seaborn) nem as de EDA (scipy.stats) no import do módulo.
+
+import os
+import joblib
+import pandas as pd
+from src.config import (MODELS_DIR, LOGISTIC_REGRESSION_MODEL_NAME, RANDOM_FOREST_MODEL_NAME, RANDOM_FOREST_ARRAYS_DIR,
+                        FEATURES, RATING_FEATURES, HEAD_TO_HEAD_ENABLED, HEAD_TO_HEAD_FEATURES)
+from src.compiled_scorer import load_compiled_scorer
+from src.shared_model import load_forest_arrays
+from src.ratings import load_rating_state
+from src.head_to_head import load_head_to_head_index
+
+# Features de confronto direto usadas pelo modelo (nenhuma com HEAD_TO_HEAD_ENABLED desligado)
+_HEAD_TO_HEAD_MODEL_FEATURES = [col for col in HEAD_TO_HEAD_FEATURES if col in FEATURES]
+
+class HistoryFeatures:
+    """
+    Completa as features de histórico (RATING_FEATURES e as de confronto direto) que as partidas a pontuar
+    não trazem (coluna inexistente ou valor nulo) a partir dos estados salvos pelo pipeline, como na
+    simulação de torneios: os ratings atuais dos times e todo o retrospecto indexado do confronto.
+    """
+
+    def __init__(self, ratings=None, head_to_head=None):
+        self.ratings = ratings
+        self.head_to_head = head_to_head
+
+    @classmethod
+    def load(cls):
+        """
+        Carrega os estados salvos; as features de um estado inexistente precisam vir nas partidas.
+        """
+        return cls(load_rating_state(), load_head_to_head_index() if HEAD_TO_HEAD_ENABLED else None)
+
+    @property
+    def columns(self):
+        """
+        Features que podem ser completadas com os estados carregados.
+        """
+        return ((RATING_FEATURES if self.ratings is not None else [])
+                + (_HEAD_TO_HEAD_MODEL_FEATURES if self.head_to_head is not None else []))
+
+    def _fixture_features(self, state, fixtures):
+        if state is self.ratings:
+            return state.fixture_features(fixtures['home_team'], fixtures['away_team'],
+                                          fixtures['neutral'].to_numpy(dtype=bool))
+        return state.fixture_features(fixtures['home_team'], fixtures['away_team'])
+
+    def fill(self, X):
+        """
+        Retorna X com as features de histórico ausentes preenchidas (só as linhas com algum valor ausente
+        são consultadas nos estados).
+        """
+        for state, columns in ((self.ratings, RATING_FEATURES), (self.head_to_head, _HEAD_TO_HEAD_MODEL_FEATURES)):
+            if state is None or not columns:
+                continue
+            given = X.reindex(columns=columns)
+            rows = given.isna().any(axis=1).to_numpy()
+            if not rows.any():
+                continue
+            computed = self._fixture_features(state, X.loc[rows]).set_axis(X.index[rows])
+            X = X.assign(**{col: given[col].fillna(computed[col].astype(given[col].dtype))
+                            for col in columns if given[col].isna().any()})
+        return X
+
+def load_model(models_dir=MODELS_DIR, mmap_mode=None):
+    """
+    Tenta carregar o melhor modelo salvo (Regressão Logística ou Random Forest).
+    - mmap_mode: se informado (ex.: 'r'), os arrays do modelo são mapeados do arquivo em vez de copiados
+      para a memória do processo, e vários processos compartilham uma única cópia física. Para o
+      Random Forest são usados os arrays planos exportados por save_model (src/shared_model.py).
+    """
+    model_filename_lr = os.path.join(models_dir, LOGISTIC_REGRESSION_MODEL_NAME)
+    model_filename_rf = os.path.join(models_dir, RANDOM_FOREST_MODEL_NAME)
+    forest_arrays_dir = os.path.join(models_dir, RANDOM_FOREST_ARRAYS_DIR)
+
+    best_model = None
+    best_model_name = None
+
+    if os.path.exists(model_filename_lr):
+        best_model = joblib.load(model_filename_lr, mmap_mode=mmap_mode)
+        best_model_name = 'Logistic Regression'
+        print(f"\nModelo '{LOGISTIC_REGRESSION_MODEL_NAME}' carregado com sucesso!")
+    elif mmap_mode and os.path.isdir(forest_arrays_dir):
+        best_model = load_forest_arrays(forest_arrays_dir, mmap_mode)
+        best_model_name = 'Random Forest'
+        print(f"\nModelo Random Forest carregado com memória mapeada de '{forest_arrays_dir}'.")
+    elif os.path.exists(model_filename_rf):
+        best_model = joblib.load(model_filename_rf, mmap_mode=mmap_mode)
+        best_model_name = 'Random Forest'
+        print(f"\nModelo '{RANDOM_FOREST_MODEL_NAME}' carregado com sucesso!")
+    else:
+        print(f"\nErro: Nenhum modelo foi encontrado em '{models_dir}'.")
+        print("Por favor, verifique se o notebook '04_model_training_evaluation.ipynb' foi executado para salvar o modelo.")
+
+    return best_model, best_model_name
+
+def load_scoring_model(models_dir=MODELS_DIR, mmap_mode=None):
+    """
+    Carrega o modelo usado para pontuar partidas: o pontuador compilado, se tiver sido exportado,
+    ou o modelo salvo (com memória mapeada se mmap_mode for informado, para vários processos
+    compartilharem o modelo).
+    """
+    scorer = load_compiled_scorer(models_dir)
+    if scorer is not None:
+        print("Usando o pontuador compilado (NumPy).")
+        return scorer
+    model, _ = load_model(models_dir, mmap_mode)
+    return model
+
+def predict(model, matches, history=None):
+    """
+    Pontua partidas com o modelo carregado.
+    - matches: DataFrame (ou lista de dicionários / dicionário único) com as colunas de FEATURES.
+    - history: HistoryFeatures para completar as features de histórico ausentes em matches (se None,
+      todas as colunas de FEATURES precisam vir preenchidas).
+    Retorna um DataFrame com a previsão ('prediction') e, se o modelo suportar, a probabilidade
+    de cada classe ('proba_<classe>').
+    """
+    if isinstance(matches, dict):
+        matches = [matches]
+    X = pd.DataFrame(matches)
+    if history is not None:
+        X = history.fill(X)
+    X = X[FEATURES]
+
+    predictions = pd.DataFrame({'prediction': model.predict(X)}, index=X.index)
+    if hasattr(model, 'predict_proba'):
+        probabilities = model.predict_proba(X)
+        for i, class_name in enumerate(model.classes_):
+            predictions[f'proba_{class_name}'] = probabilities[:, i]
+    return predictions
+
+if __name__ == '__main__':
+    import argparse
+    from src.data_ingestion import load_data, save_data
+
+    parser = argparse.ArgumentParser(description="Pontua partidas com o modelo salvo.")
+    parser.add_argument('input', help="Arquivo (csv ou parquet) com as colunas de FEATURES (as de histórico, "
+                                      "se ausentes, vêm dos estados salvos).")
+    parser.add_argument('--output', help="Arquivo de saída para as previsões (csv ou parquet).")
+    parser.add_argument('--mmap', action='store_true', help="Carrega o modelo com memória mapeada.")
+    args = parser.parse_args()
+
+    model, model_name = load_model(mmap_mode='r' if args.mmap else None)
+    if model is not None:
+        df_predictions = predict(model, load_data(args.input), HistoryFeatures.load())
+        if args.output:
+            save_data(df_predictions, args.output)
+        else:
+            print(df_predictions.to_string())
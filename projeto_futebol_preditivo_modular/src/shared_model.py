@@ -0,0 +1,113 @@
+# src/shared_model.py
+#
+# Armazenamento de florestas (Random Forest) em arrays planos .npy, carregáveis com memória mapeada.
+# O joblib.load(mmap_mode='r') não basta para árvores do sklearn: ao ser desserializado, cada Tree copia
+# os seus nós para memória própria do processo. Aqui todas as árvores são concatenadas em poucos arrays
+# (filhos, feature, limiar e probabilidades de cada nó), que N processos mapeiam do mesmo arquivo e,
+# portanto, compartilham uma única cópia física no cache de páginas do sistema operacional.
+
+import json
+import os
+import joblib
+import numpy as np
+from src.config import FOREST_PREDICT_CHUNK_SIZE
+
+_ARRAY_NAMES = ['children_left', 'children_right', 'feature', 'threshold', 'value', 'roots']
+
+def export_forest_arrays(pipeline, directory):
+    """
+    Exporta um Pipeline (preprocessor + floresta de árvores de classificação) para directory:
+    um .npy por array da floresta, o preprocessor (pequeno) em joblib e os metadados em JSON.
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    forest = pipeline.named_steps['classifier']
+    if not hasattr(forest, 'estimators_'):
+        raise ValueError(f"Apenas florestas de árvores podem ser exportadas (recebido: {type(forest).__name__}).")
+
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    sizes = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+    def global_children(children, offset):
+        # Índices locais de cada árvore viram índices no array concatenado; folhas continuam em -1
+        return np.where(children < 0, -1, children + offset).astype(np.int64)
+
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees]).astype(np.float64)
+    value_sum = value.sum(axis=1, keepdims=True)
+    arrays = {
+        'children_left': np.concatenate([global_children(t.children_left, o) for t, o in zip(trees, roots)]),
+        'children_right': np.concatenate([global_children(t.children_right, o) for t, o in zip(trees, roots)]),
+        'feature': np.concatenate([np.maximum(t.feature, 0) for t in trees]).astype(np.int64),
+        'threshold': np.concatenate([t.threshold for t in trees]).astype(np.float64),
+        # Probabilidade de cada classe em cada nó, como em DecisionTreeClassifier.predict_proba
+        'value': np.divide(value, value_sum, out=np.zeros_like(value), where=value_sum > 0),
+        'roots': roots,
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), array)
+    joblib.dump(preprocessor, os.path.join(directory, 'preprocessor.joblib'))
+    with open(os.path.join(directory, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump({'classes': forest.classes_.tolist(), 'n_trees': len(trees), 'n_nodes': int(sizes.sum())}, f)
+    print(f"Floresta exportada em arrays planos para memória mapeada: {directory} "
+          f"({len(trees)} árvores, {int(sizes.sum())} nós)")
+    return directory
+
+class SharedForestModel:
+    """
+    Floresta carregada a partir dos arrays planos (em geral com memória mapeada), com a mesma interface
+    de previsão do Pipeline: classes_, predict e predict_proba sobre um DataFrame com as colunas de FEATURES.
+    Todas as árvores são percorridas ao mesmo tempo para um bloco de linhas, um nível por iteração;
+    os pares (linha, árvore) que já chegaram a uma folha saem do conjunto ativo, então o custo de
+    árvores profundas fica concentrado nos poucos caminhos longos.
+    """
+
+    def __init__(self, preprocessor, arrays, classes, chunk_size=FOREST_PREDICT_CHUNK_SIZE):
+        self.preprocessor = preprocessor
+        self.classes_ = np.asarray(classes)
+        self.chunk_size = chunk_size
+        for name in _ARRAY_NAMES:
+            # np.asarray cria uma view ndarray sobre o mesmo buffer (sem cópia): a indexação de np.memmap
+            # tem um custo fixo alto por chamada
+            setattr(self, name, np.asarray(arrays[name]))
+
+    def _predict_proba_dense(self, X):
+        # As árvores do sklearn comparam as features em float32
+        X = np.asarray(X, dtype=np.float32)
+        num_rows, num_trees = len(X), len(self.roots)
+        row = np.repeat(np.arange(num_rows), num_trees)
+        node = np.tile(self.roots, num_rows)
+        active = np.arange(len(node))
+        while len(active):
+            current = node[active]
+            left = self.children_left[current]
+            is_internal = left >= 0
+            active, current, left = active[is_internal], current[is_internal], left[is_internal]
+            go_left = X[row[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, left, self.children_right[current])
+        return self.value[node].reshape(num_rows, num_trees, -1).mean(axis=1)
+
+    def predict_proba(self, X):
+        X_transformed = self.preprocessor.transform(X)
+        probabilities = []
+        for start in range(0, X_transformed.shape[0], self.chunk_size):
+            block = X_transformed[start:start + self.chunk_size]
+            probabilities.append(self._predict_proba_dense(block.toarray() if hasattr(block, 'toarray') else block))
+        if not probabilities:
+            return np.empty((0, len(self.classes_)))
+        return np.vstack(probabilities)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def load_forest_arrays(directory, mmap_mode='r'):
+    """
+    Carrega uma floresta exportada por export_forest_arrays. Com mmap_mode='r' os arrays não são lidos
+    para a memória do processo: as páginas são carregadas sob demanda e compartilhadas entre processos.
+    """
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode) for name in _ARRAY_NAMES}
+    preprocessor = joblib.load(os.path.join(directory, 'preprocessor.joblib'))
+    with open(os.path.join(directory, 'metadata.json'), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    return SharedForestModel(preprocessor, arrays, metadata['classes'])
@@ -0,0 +1,90 @@
+# src/stage_cache.py
+
+import hashlib
+import inspect
+import json
+import os
+import pandas as pd
+from src import config
+from src.config import CACHE_DIR, CACHE_MAX_BYTES, CACHE_STAGE_SETTINGS
+
+def file_fingerprint(path, block_size=1024 * 1024):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+    É bem mais barato que carregar e interpretar o CSV inteiro.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stage_cache_key(stage, upstream_key, stage_functions=()):
+    """
+    Gera a chave de cache de um estágio a partir de:
+    - a chave (ou fingerprint) dos dados de entrada do estágio;
+    - as configurações de config.py relevantes para o estágio (CACHE_STAGE_SETTINGS);
+    - o código-fonte dos módulos que implementam o estágio, para invalidar o cache quando eles mudam.
+    """
+    settings = {name: getattr(config, name) for name in CACHE_STAGE_SETTINGS.get(stage, [])}
+    digest = hashlib.sha256()
+    digest.update(stage.encode())
+    digest.update(upstream_key.encode())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    for stage_function in stage_functions:
+        digest.update(file_fingerprint(inspect.getsourcefile(inspect.unwrap(stage_function))).encode())
+    return digest.hexdigest()
+
+def _cache_entry_path(stage, key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f'{stage}-{key}.pkl')
+
+def load_cached_stage(stage, key, cache_dir=CACHE_DIR):
+    """
+    Retorna a saída armazenada de um estágio para a chave informada, ou None se não houver entrada válida.
+    """
+    path = _cache_entry_path(stage, key, cache_dir)
+    if not os.path.exists(path):
+        print(f"Cache do estágio '{stage}' não encontrado (chave {key[:12]}). O estágio será executado.")
+        return None
+    try:
+        df = pd.read_pickle(path)
+    except Exception as e:
+        print(f"Entrada de cache inválida para o estágio '{stage}' ({e}). O estágio será executado.")
+        os.remove(path)
+        return None
+    os.utime(path) # Marca a entrada como usada recentemente para a política de remoção (LRU)
+    print(f"Cache do estágio '{stage}' válido (chave {key[:12]}): saída carregada sem recomputar.")
+    return df
+
+def store_cached_stage(stage, key, df, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Armazena a saída de um estágio no cache e aplica a política de tamanho máximo.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_entry_path(stage, key, cache_dir)
+    tmp_path = f'{path}.tmp'
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path) # Escrita atômica: uma execução interrompida não deixa entradas corrompidas
+    print(f"Saída do estágio '{stage}' armazenada no cache (chave {key[:12]}).")
+    evict_cache(cache_dir, max_bytes)
+
+def evict_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Remove as entradas usadas há mais tempo até que o cache caiba em max_bytes.
+    """
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isfile(path) and name.endswith('.pkl'):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        os.remove(path)
+        total_bytes -= size
+        print(f"Entrada de cache removida para respeitar o limite de {max_bytes} bytes: {os.path.basename(path)}")
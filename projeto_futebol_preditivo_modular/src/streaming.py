@@ -0,0 +1,109 @@
+# src/streaming.py
+
+import numpy as np
+import pandas as pd
+from src.config import (RAW_DATA_PATH, CLEANED_DATA_PATH, ANALYZED_DATA_PATH, STREAM_CHUNK_SIZE, RATING_STATE_PATH,
+                        HEAD_TO_HEAD_ENABLED, HEAD_TO_HEAD_INDEX_PATH, VOCABULARY_PATH)
+from src.data_ingestion import iter_raw_data_chunks, ChunkedDataWriter
+from src.data_preprocessing import preprocess_data
+from src.feature_engineering import engineer_features
+from src.ratings import RatingEngine
+from src.head_to_head import HeadToHeadIndex
+from src.vocabulary import load_vocabulary
+
+def preprocess_chunks(chunks, vocabulary=None):
+    """
+    Aplica preprocess_data a cada bloco de um iterador de DataFrames, estendendo o mesmo vocabulário.
+    """
+    for chunk in chunks:
+        yield preprocess_data(chunk, verbose=False, vocabulary=vocabulary)
+
+def engineer_feature_chunks(chunks, ratings, head_to_head):
+    """
+    Aplica engineer_features a cada bloco de um iterador de DataFrames. O mesmo motor de ratings e o mesmo
+    índice de confrontos diretos atravessam todos os blocos, que chegam em ordem cronológica.
+    """
+    for chunk in chunks:
+        yield engineer_features(chunk, verbose=False, ratings=ratings, head_to_head=head_to_head)
+
+def write_through(chunks, writer):
+    """
+    Grava cada bloco no writer informado e o repassa adiante no pipeline.
+    """
+    for chunk in chunks:
+        writer.write(chunk)
+        yield chunk
+
+def find_unordered_date(raw_path=RAW_DATA_PATH, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lê apenas a coluna de datas do CSV bruto, em blocos, e retorna o número (a partir de 1, sem o cabeçalho)
+    da primeira linha com data anterior à da linha precedente, ou None se o arquivo estiver em ordem.
+    """
+    previous, offset = None, 0
+    with pd.read_csv(raw_path, usecols=['date'], parse_dates=['date'], chunksize=chunk_size) as reader:
+        for chunk in reader:
+            dates = chunk['date'].to_numpy()
+            if previous is not None:
+                dates = np.concatenate([[previous], dates])
+            unordered = np.flatnonzero(dates[1:] < dates[:-1])
+            if len(unordered):
+                return offset + int(unordered[0]) + (1 if previous is None else 0) + 1
+            offset += len(chunk)
+            previous = dates[-1]
+    return None
+
+def run_streaming_pipeline(raw_path=RAW_DATA_PATH, cleaned_path=CLEANED_DATA_PATH,
+                           analyzed_path=ANALYZED_DATA_PATH, chunk_size=STREAM_CHUNK_SIZE,
+                           rating_state_path=RATING_STATE_PATH, head_to_head_path=HEAD_TO_HEAD_INDEX_PATH,
+                           vocabulary_path=VOCABULARY_PATH):
+    """
+    Executa Measure (pré-processamento) e Analyze (engenharia de features) em modo streaming:
+    o arquivo bruto é lido em blocos de chunk_size linhas, cada bloco atravessa o pipeline de geradores
+    e é gravado incrementalmente nos armazenamentos de dados limpos e analisados.
+    O pico de memória é limitado pelo tamanho do bloco, e não pelo tamanho do arquivo.
+    O vocabulário global (vocabulary_path) é estendido bloco a bloco. Ao final, ele, o estado dos ratings
+    e o índice de confrontos diretos são salvos em vocabulary_path, rating_state_path e head_to_head_path.
+    Os ratings e o confronto direto atravessam os blocos em sequência, então o arquivo bruto precisa estar
+    em ordem de data: um arquivo fora de ordem é recusado (ValueError) antes de qualquer gravação.
+    Retorna um resumo com o número de linhas, de blocos e a contagem de cada resultado.
+    """
+    print(f"\n--- Pipeline em Streaming (blocos de {chunk_size} linhas) ---")
+    unordered_row = find_unordered_date(raw_path, chunk_size)
+    if unordered_row is not None:
+        raise ValueError(f"O arquivo bruto '{raw_path}' não está em ordem de data (linha {unordered_row} anterior "
+                         "à precedente). Ordene-o por data ou use o modo em memória.")
+    num_rows = 0
+    num_chunks = 0
+    result_counts = pd.Series(dtype='int64')
+    ratings, head_to_head = RatingEngine(), HeadToHeadIndex()
+    vocabulary = load_vocabulary(vocabulary_path)
+
+    with ChunkedDataWriter(cleaned_path) as cleaned_writer, ChunkedDataWriter(analyzed_path) as analyzed_writer:
+        chunks = iter_raw_data_chunks(chunk_size, path=raw_path)
+        cleaned_chunks = write_through(preprocess_chunks(chunks, vocabulary), cleaned_writer)
+        analyzed_chunks = write_through(engineer_feature_chunks(cleaned_chunks, ratings, head_to_head), analyzed_writer)
+
+        for df_chunk in analyzed_chunks:
+            num_rows += len(df_chunk)
+            num_chunks += 1
+            result_counts = result_counts.add(df_chunk['result'].value_counts(), fill_value=0)
+
+    vocabulary.save(vocabulary_path)
+    ratings.save(rating_state_path)
+    if HEAD_TO_HEAD_ENABLED:
+        head_to_head.save(head_to_head_path)
+    result_counts = result_counts.astype('int64').sort_values(ascending=False)
+    print(f"{num_rows} linhas processadas em {num_chunks} blocos.")
+    print("Contagem de cada tipo de resultado:")
+    print(result_counts)
+    return {'rows': num_rows, 'chunks': num_chunks, 'result_counts': result_counts.to_dict()}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Executa Measure e Analyze em streaming, bloco a bloco.")
+    parser.add_argument('--raw-path', default=RAW_DATA_PATH, help="CSV bruto de entrada.")
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE, help="Linhas por bloco.")
+    args = parser.parse_args()
+
+    run_streaming_pipeline(raw_path=args.raw_path, chunk_size=args.chunk_size)
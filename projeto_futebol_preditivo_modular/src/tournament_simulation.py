@@ -0,0 +1,230 @@
+# src/tournament_simulation.py
+#
+# Simulação de Monte Carlo de torneios (fase de grupos + mata-mata, ou apenas mata-mata) a partir das
+# probabilidades de um modelo treinado só com features conhecidas antes da partida (sem
+# BACKTEST_EXCLUDE_FEATURES, como goal_difference e total_goals). As probabilidades de cada confronto possível são calculadas uma única vez,
+# numa só chamada a predict_proba; depois, todas as simulações de um lote avançam juntas como operações
+# de arrays (uma rodada por vez), sem laço em Python sobre partidas ou simulações.
+#
+# Definição do torneio (dicionário ou arquivo JSON, ver data/tournaments/world_cup_2022.json):
+#   tournament, year, month, city, country, neutral: valores das features das partidas simuladas
+#   (os ratings de cada time e o retrospecto dos confrontos vêm dos estados salvos por src/ratings.py
+#   e src/head_to_head.py)
+#   groups: {nome do grupo: [times]} e advance_per_group (opcionais; sem grupos, só há mata-mata)
+#   bracket: chaveamento do mata-mata, em ordem; com grupos, usa posições como '1A' (1º do grupo A),
+#            sem grupos, usa os nomes dos times. O tamanho deve ser uma potência de 2.
+
+import json
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from src.config import (FEATURES, TARGET, SIMULATION_FEATURE_DEFAULTS, SIMULATION_NUM_TOURNAMENTS,
+                        SIMULATION_BATCH_SIZE, SIMULATION_RANDOM_SEED, SIMULATION_MIN_PROBABILITY_SPREAD,
+                        BACKTEST_EXCLUDE_FEATURES, RATING_FEATURES, HEAD_TO_HEAD_ENABLED, HEAD_TO_HEAD_FEATURES)
+from src.model_training import MODEL_CANDIDATES, get_preprocessor
+from src.ratings import load_rating_state
+from src.head_to_head import load_head_to_head_index
+
+# Features disponíveis para uma partida ainda não jogada
+SIMULATION_FEATURES = [col for col in FEATURES if col not in BACKTEST_EXCLUDE_FEATURES]
+
+# Nomes das colunas de resultado por número de times restantes no mata-mata
+_ROUND_NAMES = {64: 'round_of_64', 32: 'round_of_32', 16: 'round_of_16', 8: 'quarterfinal', 4: 'semifinal',
+                2: 'final', 1: 'champion'}
+
+def load_tournament_definition(path):
+    """
+    Lê uma definição de torneio em JSON.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def train_simulation_model(df):
+    """
+    Treina a Regressão Logística usada na simulação, apenas com as features conhecidas antes da partida
+    (SIMULATION_FEATURES). O modelo salvo pelo pipeline usa goal_difference e total_goals, que não
+    existem para confrontos futuros.
+    """
+    model = Pipeline(steps=[('preprocessor', get_preprocessor(exclude_features=BACKTEST_EXCLUDE_FEATURES)),
+                            ('classifier', MODEL_CANDIDATES['Logistic Regression']())])
+    return model.fit(df[SIMULATION_FEATURES], df[TARGET])
+
+def _model_columns(model):
+    """
+    Colunas de entrada usadas por um modelo (Pipeline, SharedForestModel ou CompiledScorer).
+    """
+    if hasattr(model, 'numerical_cols'):
+        return model.numerical_cols + model.categorical_cols
+    preprocessor = model.named_steps['preprocessor'] if hasattr(model, 'named_steps') else model.preprocessor
+    return [col for _, _, columns in preprocessor.transformers_ for col in columns if isinstance(col, str)]
+
+def _tournament_teams(definition):
+    if definition.get('groups'):
+        return [team for teams in definition['groups'].values() for team in teams]
+    return list(definition['bracket'])
+
+def _default_bracket(groups, advance_per_group):
+    """
+    Chaveamento padrão para 2 classificados por grupo: 1º de um grupo contra o 2º do grupo vizinho.
+    """
+    if advance_per_group != 2 or len(groups) % 2:
+        raise ValueError("Informe 'bracket' na definição: o chaveamento padrão exige 2 classificados "
+                         "por grupo e um número par de grupos.")
+    names = list(groups)
+    bracket = []
+    for first, second in zip(names[0::2], names[1::2]):
+        bracket += [f'1{first}', f'2{second}', f'1{second}', f'2{first}']
+    return bracket
+
+def pairwise_probabilities(model, teams, definition, ratings=None, head_to_head=None):
+    """
+    Pontua todos os confrontos possíveis entre os times (cada par ordenado uma única vez, numa só chamada
+    ao modelo) e retorna as matrizes (times x times) de probabilidade de vitória do primeiro time, de empate
+    e de vitória do segundo. Em campo neutro, os dois mandos de cada confronto são combinados.
+    - ratings: RatingEngine com o estado atual dos times (se None, usa o estado salvo).
+    - head_to_head: HeadToHeadIndex com os confrontos anteriores (se None, usa o índice salvo).
+    O modelo não pode usar features conhecidas só após a partida (ver train_simulation_model), e as
+    probabilidades de vitória precisam variar entre os confrontos.
+    """
+    post_match = [col for col in _model_columns(model) if col in BACKTEST_EXCLUDE_FEATURES]
+    if post_match:
+        raise ValueError(f"O modelo usa features conhecidas só após a partida ({', '.join(post_match)}): "
+                         "treine o modelo da simulação com train_simulation_model.")
+    num_teams = len(teams)
+    home, away = np.where(~np.eye(num_teams, dtype=bool))
+    neutral = bool(definition.get('neutral', True))
+    features = {**SIMULATION_FEATURE_DEFAULTS,
+                'tournament': definition.get('tournament', 'Friendly'),
+                'city': definition.get('city', ''),
+                'country': definition.get('country', ''),
+                'neutral': neutral,
+                'is_home_game': 0 if neutral else 1}
+    for key in ('year', 'month', 'day_of_week'):
+        if key in definition:
+            features[key] = definition[key]
+    if ratings is None:
+        ratings = load_rating_state()
+        if ratings is None:
+            raise ValueError("Estado dos ratings não encontrado: execute o pipeline (main.py) antes de simular.")
+    if HEAD_TO_HEAD_ENABLED and head_to_head is None:
+        head_to_head = load_head_to_head_index()
+        if head_to_head is None:
+            raise ValueError("Índice de confrontos diretos não encontrado: execute o pipeline (main.py) "
+                             "antes de simular.")
+    matches = pd.DataFrame({'home_team': np.asarray(teams)[home], 'away_team': np.asarray(teams)[away],
+                            **{col: features[col] for col in SIMULATION_FEATURES
+                               if col not in ['home_team', 'away_team'] + RATING_FEATURES + HEAD_TO_HEAD_FEATURES}})
+    matches = matches.join(ratings.fixture_features(matches['home_team'], matches['away_team'], neutral))
+    if HEAD_TO_HEAD_ENABLED:
+        matches = matches.join(head_to_head.fixture_features(matches['home_team'], matches['away_team']))
+    proba = model.predict_proba(matches[SIMULATION_FEATURES])
+    classes = list(model.classes_)
+
+    win, draw, loss = (np.zeros((num_teams, num_teams)) for _ in range(3))
+    win[home, away] = proba[:, classes.index('Home Win')]
+    draw[home, away] = proba[:, classes.index('Draw')]
+    loss[home, away] = proba[:, classes.index('Away Win')]
+    if neutral:
+        # Em campo neutro o mando é arbitrário: média entre (i mandante, j visitante) e (j mandante, i visitante)
+        win, draw, loss = (win + loss.T) / 2, (draw + draw.T) / 2, (loss + win.T) / 2
+    spread = np.ptp(win[home, away])
+    if spread < SIMULATION_MIN_PROBABILITY_SPREAD:
+        raise ValueError(f"Probabilidades de vitória praticamente uniformes entre os confrontos (amplitude "
+                         f"{spread:.4f}): o modelo não distingue os times.")
+    return win, draw, loss
+
+def _simulate_groups(groups, team_index, win, draw, num_sims, rng):
+    """
+    Simula a fase de grupos de num_sims torneios de uma vez. Retorna {grupo: array (num_sims, times do grupo)}
+    com os índices dos times na ordem de classificação (pontos; empates decididos por sorteio).
+    """
+    standings = {}
+    for name, teams in groups.items():
+        idx = np.array([team_index[team] for team in teams])
+        first, second = np.triu_indices(len(idx), k=1)
+        p_win, p_draw = win[idx[first], idx[second]], draw[idx[first], idx[second]]
+        u = rng.random((num_sims, len(first)))
+        first_points = np.where(u < p_win, 3, np.where(u < p_win + p_draw, 1, 0))
+        second_points = np.where(u < p_win, 0, np.where(u < p_win + p_draw, 1, 3))
+
+        points = np.zeros((num_sims, len(idx)))
+        np.add.at(points.T, first, first_points.T)
+        np.add.at(points.T, second, second_points.T)
+        # Sorteio como critério de desempate (sem simular placares, não há saldo de gols)
+        order = np.argsort(-(points + rng.random(points.shape)), axis=1)
+        standings[name] = idx[order]
+    return standings
+
+def _simulate_knockout(slots, win, draw, num_teams, rng, counts):
+    """
+    Simula o mata-mata a partir de slots (num_sims, tamanho do chaveamento) com os índices dos times.
+    Empates vão para os pênaltis, decididos com probabilidade 1/2. Acumula em counts quantas vezes cada
+    time chega a cada fase.
+    """
+    while slots.shape[1] > 1:
+        first, second = slots[:, 0::2], slots[:, 1::2]
+        p_advance = win[first, second] + draw[first, second] / 2
+        slots = np.where(rng.random(first.shape) < p_advance, first, second)
+        counts[_ROUND_NAMES.get(slots.shape[1], f'last_{slots.shape[1]}')] += np.bincount(slots.ravel(),
+                                                                                           minlength=num_teams)
+
+def simulate_tournament(model, definition, num_tournaments=SIMULATION_NUM_TOURNAMENTS,
+                        batch_size=SIMULATION_BATCH_SIZE, seed=SIMULATION_RANDOM_SEED, ratings=None,
+                        head_to_head=None):
+    """
+    Simula num_tournaments torneios (em lotes de batch_size) e retorna um DataFrame com, para cada time,
+    a probabilidade de passar da fase de grupos e de chegar a cada fase do mata-mata, até o título.
+    - ratings: RatingEngine com o estado dos times antes do torneio (se None, usa o estado salvo).
+    - head_to_head: HeadToHeadIndex com os confrontos anteriores ao torneio (se None, usa o índice salvo).
+    """
+    teams = _tournament_teams(definition)
+    team_index = {team: i for i, team in enumerate(teams)}
+    groups = definition.get('groups') or {}
+    advance_per_group = definition.get('advance_per_group', 2)
+    bracket = definition.get('bracket') or _default_bracket(groups, advance_per_group)
+    if len(bracket) & (len(bracket) - 1):
+        raise ValueError(f"O chaveamento deve ter uma potência de 2 de posições (recebido: {len(bracket)}).")
+
+    win, draw, _ = pairwise_probabilities(model, teams, definition, ratings, head_to_head)
+    rng = np.random.default_rng(seed)
+    counts = {'advance': np.zeros(len(teams))}
+    for size in sorted((s for s in _ROUND_NAMES if s < len(bracket)), reverse=True):
+        counts[_ROUND_NAMES[size]] = np.zeros(len(teams))
+
+    for start in range(0, num_tournaments, batch_size):
+        num_sims = min(batch_size, num_tournaments - start)
+        if groups:
+            standings = _simulate_groups(groups, team_index, win, draw, num_sims, rng)
+            # '1A' -> 1º colocado do grupo A
+            slots = np.stack([standings[slot[1:]][:, int(slot[0]) - 1] for slot in bracket], axis=1)
+        else:
+            slots = np.tile([team_index[team] for team in bracket], (num_sims, 1))
+        counts['advance'] += np.bincount(slots.ravel(), minlength=len(teams))
+        _simulate_knockout(slots, win, draw, len(teams), rng, counts)
+
+    results = pd.DataFrame({name: count / num_tournaments for name, count in counts.items()}, index=teams)
+    results.index.name = 'team'
+    return results.sort_values('champion', ascending=False)
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from src.config import ANALYZED_DATA_PATH
+    from src.data_ingestion import load_data
+
+    parser = argparse.ArgumentParser(description="Simulação de Monte Carlo de um torneio com as features "
+                                                 "conhecidas antes das partidas.")
+    parser.add_argument('definition', help="Arquivo JSON com a definição do torneio.")
+    parser.add_argument('--simulations', type=int, default=SIMULATION_NUM_TOURNAMENTS, help="Torneios simulados.")
+    parser.add_argument('--seed', type=int, default=SIMULATION_RANDOM_SEED)
+    args = parser.parse_args()
+
+    df = load_data(ANALYZED_DATA_PATH, columns=SIMULATION_FEATURES + [TARGET])
+    if df is not None:
+        model = train_simulation_model(df)
+        definition = load_tournament_definition(args.definition)
+        start = time.perf_counter()
+        results = simulate_tournament(model, definition, args.simulations, seed=args.seed)
+        print(f"\n--- {definition.get('name', args.definition)}: {args.simulations} simulações "
+              f"em {time.perf_counter() - start:.2f}s ---")
+        print(results.round(4).to_string())
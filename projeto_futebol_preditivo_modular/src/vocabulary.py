@@ -0,0 +1,166 @@
+# src/vocabulary.py
+#
+# Vocabulário global das colunas categóricas (times, torneios, cidades e países): cada valor recebe um
+# código inteiro estável (int32), atribuído na ordem em que é acrescentado. O vocabulário só cresce
+# (valores novos vão para o fim, os códigos existentes nunca mudam), é versionado e persistido em JSON,
+# e é compartilhado por todos os estágios:
+# - ingestão/pré-processamento: as colunas passam a ser categóricas com as categorias do vocabulário,
+#   então os códigos em memória são os mesmos em qualquer execução, bloco ou delta;
+# - codificação: VocabularyEncoder gera o one-hot a partir dos códigos inteiros (sem comparar strings)
+#   e com as colunas de cada variável na ordem do vocabulário, estáveis entre retreinos;
+# - pontuação: o encoder ajustado guarda as categorias em categories_, como o OneHotEncoder.
+# home_team e away_team compartilham o mesmo espaço de códigos ('team').
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.config import VOCABULARY_PATH, VOCABULARY_NAMESPACES, VOCABULARY_FIXED_CATEGORIES
+
+class Vocabulary:
+    """
+    Mapeamento valor -> código inteiro por espaço de nomes (VOCABULARY_NAMESPACES), apenas com acréscimos.
+    version aumenta a cada extensão.
+    """
+
+    def __init__(self, values=None, version=0):
+        self.values = {namespace: list((values or {}).get(namespace, []))
+                       for namespace in dict.fromkeys(VOCABULARY_NAMESPACES.values())}
+        self.index = {namespace: {value: code for code, value in enumerate(values)}
+                      for namespace, values in self.values.items()}
+        self.version = version
+
+    def __len__(self):
+        return sum(len(values) for values in self.values.values())
+
+    def extend(self, df):
+        """
+        Acrescenta ao vocabulário os valores ainda não vistos das colunas de df. Retorna quantos foram acrescentados.
+        """
+        added = 0
+        for col, namespace in VOCABULARY_NAMESPACES.items():
+            if col not in df.columns:
+                continue
+            column = df[col]
+            # Em colunas categóricas basta olhar as categorias efetivamente usadas, não cada linha
+            unique = column.cat.remove_unused_categories().cat.categories if isinstance(
+                column.dtype, pd.CategoricalDtype) else pd.unique(column.dropna())
+            index, values = self.index[namespace], self.values[namespace]
+            for value in unique:
+                if value not in index:
+                    index[value] = len(values)
+                    values.append(value)
+                    added += 1
+        if added:
+            self.version += 1
+        return added
+
+    def categories(self, col):
+        """
+        Categorias de uma coluna, na ordem dos códigos: as do vocabulário, ou as fixas de
+        VOCABULARY_FIXED_CATEGORIES (ex.: 'neutral', 'is_home_game').
+        """
+        if col in VOCABULARY_NAMESPACES:
+            return list(self.values[VOCABULARY_NAMESPACES[col]])
+        return list(VOCABULARY_FIXED_CATEGORIES[col])
+
+    def codes(self, values, col):
+        """
+        Códigos int32 dos valores de uma coluna (-1 para valores fora do vocabulário).
+        """
+        categorical = pd.Categorical(values, categories=self.categories(col))
+        return categorical.codes.astype(np.int32)
+
+    def apply(self, df):
+        """
+        Converte as colunas do vocabulário presentes em df para categóricas com as categorias do vocabulário
+        (os códigos em memória passam a ser os códigos do vocabulário). Valores fora do vocabulário viram
+        ausentes: chame extend antes.
+        """
+        return df.assign(**{col: pd.Categorical(df[col], categories=self.categories(col))
+                            for col in VOCABULARY_NAMESPACES if col in df.columns})
+
+    def save(self, path=VOCABULARY_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'values': self.values}, f, ensure_ascii=False)
+        print(f"Vocabulário salvo em: {path} (versão {self.version}, "
+              + ", ".join(f"{len(values)} {namespace}" for namespace, values in self.values.items()) + ").")
+        return path
+
+def load_vocabulary(path=VOCABULARY_PATH):
+    """
+    Carrega o vocabulário salvo, ou um vocabulário vazio se ele ainda não existir.
+    """
+    if not os.path.exists(path):
+        return Vocabulary()
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    return Vocabulary(state['values'], state['version'])
+
+def update_vocabulary(df, path=VOCABULARY_PATH, vocabulary=None):
+    """
+    Estende o vocabulário (o informado, ou o salvo em path) com os valores novos de df e o salva se mudou.
+    """
+    vocabulary = load_vocabulary(path) if vocabulary is None else vocabulary
+    if vocabulary.extend(df) or not os.path.exists(path):
+        vocabulary.save(path)
+    return vocabulary
+
+class VocabularyEncoder(BaseEstimator, TransformerMixin):
+    """
+    One-hot com categorias fixas (as do vocabulário), equivalente ao OneHotEncoder(categories=...,
+    handle_unknown='ignore'), mas que compara códigos inteiros: colunas categóricas são indexadas pelos
+    seus códigos (só as categorias, poucas, são mapeadas); as demais são convertidas com pd.Categorical.
+    As colunas de saída seguem a ordem do vocabulário, então continuam no mesmo lugar após retreinos
+    (valores novos entram no fim do bloco de cada coluna).
+    """
+
+    def __init__(self, categories):
+        self.categories = categories
+
+    def fit(self, X, y=None):
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self.categories_ = [np.asarray(categories, dtype=object) for categories in self.categories]
+        return self
+
+    def _column_positions(self, values, categories):
+        """
+        Posição de cada valor nas categorias (-1 se desconhecido), sem comparar strings linha a linha.
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            lookup = pd.Index(categories).get_indexer(values.cat.categories)
+            return np.append(lookup, -1)[values.cat.codes.to_numpy()]
+        return pd.Categorical(values, categories=categories).codes.astype(np.int64)
+
+    def transform(self, X):
+        X = pd.DataFrame(X, columns=self.feature_names_in_)
+        num_rows = len(X)
+        rows, cols = [], []
+        offset = 0
+        for col, categories in zip(self.feature_names_in_, self.categories_):
+            positions = self._column_positions(X[col], categories)
+            known = positions >= 0
+            rows.append(np.flatnonzero(known))
+            cols.append(positions[known] + offset)
+            offset += len(categories)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(num_rows, offset))
+
+    def get_feature_names_out(self, input_features=None):
+        input_features = self.feature_names_in_ if input_features is None else input_features
+        return np.asarray([f'{col}_{category}' for col, categories in zip(input_features, self.categories_)
+                           for category in categories], dtype=object)
+
+if __name__ == '__main__':
+    from src.data_ingestion import load_raw_data
+
+    df_raw = load_raw_data()
+    if df_raw is not None:
+        vocabulary = update_vocabulary(df_raw)
+        for namespace, values in vocabulary.values.items():
+            print(f"{namespace}: {len(values)} valores (ex.: {values[:3]})")